@@ -0,0 +1,72 @@
+"""users・todos・tags・todos_tags を作成する (マイグレーションの起点)
+
+id・外部キーは String(32) で作成し、後続の 6c1f0b9e2d4a で BINARY(16) に変換する
+既にテーブルが作成済みの DB は 適用せずに alembic stamp 1b7e4c2a9f05 で記録してから upgrade する
+
+Revision ID: 1b7e4c2a9f05
+Revises:
+Create Date: 2026-10-16 00:00:00.000000
+"""
+from typing import Any
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "1b7e4c2a9f05"
+down_revision: str | None = None
+branch_labels: Any = None
+depends_on: Any = None
+
+def _base_columns(with_deleted_at: bool = True) -> list[sa.Column]:
+    columns = [
+        sa.Column("id", sa.String(32), primary_key=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False, server_default=sa.func.current_timestamp()),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+    ]
+    if with_deleted_at:
+        columns.append(sa.Column("deleted_at", sa.DateTime()))
+    return columns
+
+def _create_table(table_name: str, *columns: Any) -> None:
+    op.create_table(table_name, *columns, mysql_charset="utf8mb4", mysql_collate="utf8mb4_unicode_ci")
+
+def upgrade() -> None:
+    _create_table(
+        "users",
+        *_base_columns(),
+        sa.Column("full_name", sa.String(64)),
+        sa.Column("email", sa.String(200), nullable=False),
+        sa.Column("email_verified", sa.Boolean(), nullable=False, server_default="0"),
+        sa.Column("hashed_password", sa.Text(), nullable=False),
+        sa.Column("scopes", sa.Text()),
+    )
+    op.create_index("ix_users_full_name", "users", ["full_name"])
+    op.create_index("ix_users_email", "users", ["email"], unique=True)
+
+    _create_table(
+        "todos",
+        *_base_columns(),
+        sa.Column("title", sa.String(100)),
+        sa.Column("description", sa.Text()),
+        sa.Column("completed_at", sa.DateTime()),
+    )
+    op.create_index("ix_todos_title", "todos", ["title"])
+
+    _create_table(
+        "tags",
+        *_base_columns(),
+        sa.Column("name", sa.String(100)),
+    )
+    op.create_index("ix_tags_name", "tags", ["name"], unique=True)
+
+    _create_table(
+        "todos_tags",
+        *_base_columns(with_deleted_at=False),
+        sa.Column("todo_id", sa.String(32), sa.ForeignKey("todos.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("tag_id", sa.String(32), sa.ForeignKey("tags.id", ondelete="CASCADE"), nullable=False),
+    )
+    op.create_index("ix_todos_tags_todo_id_tag_id", "todos_tags", ["todo_id", "tag_id"], unique=True)
+
+def downgrade() -> None:
+    for table_name in ["todos_tags", "tags", "todos", "users"]:
+        op.drop_table(table_name)
\ No newline at end of file
@@ -0,0 +1,86 @@
+"""論理削除後 保持期間を過ぎたデータの移動先 *_archive テーブル と deleted_at を先頭にした複合インデックスを作成する
+
+id・外部キーは この時点の型 String(32) で作成し、後続の 6c1f0b9e2d4a で BINARY(16) に変換する
+カラムは元のテーブルと同じ. unique 制約・外部キー制約は持たない (app/models/archives.py を参照)
+
+Revision ID: 2f5a8c3e1d70
+Revises: 1b7e4c2a9f05
+Create Date: 2026-10-17 00:00:00.000000
+"""
+from typing import Any
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "2f5a8c3e1d70"
+down_revision: str | None = "1b7e4c2a9f05"
+branch_labels: Any = None
+depends_on: Any = None
+
+# テーブル毎の deleted_at を先頭にした複合インデックス
+DELETED_AT_INDEXES = [
+    ("ix_todos_deleted_at_created_at", "todos", ["deleted_at", "created_at"]),
+    ("ix_tags_deleted_at_name", "tags", ["deleted_at", "name"]),
+    ("ix_users_deleted_at_created_at", "users", ["deleted_at", "created_at"]),
+]
+
+def _timestamp_columns(with_deleted_at: bool = True) -> list[sa.Column]:
+    columns = [
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+    ]
+    if with_deleted_at:
+        columns.append(sa.Column("deleted_at", sa.DateTime()))
+    return columns
+
+def _create_archive_table(table_name: str, *columns: sa.Column) -> None:
+    op.create_table(
+        f"{table_name}_archive",
+        sa.Column("id", sa.String(32), primary_key=True),
+        *columns,
+        sa.Column("archived_at", sa.DateTime(), nullable=False, server_default=sa.func.current_timestamp()),
+        mysql_charset="utf8mb4",
+        mysql_collate="utf8mb4_unicode_ci",
+    )
+    op.create_index(f"ix_{table_name}_archive_archived_at", f"{table_name}_archive", ["archived_at"])
+
+def upgrade() -> None:
+    _create_archive_table(
+        "todos",
+        *_timestamp_columns(),
+        sa.Column("title", sa.String(100)),
+        sa.Column("description", sa.Text()),
+        sa.Column("completed_at", sa.DateTime()),
+    )
+    _create_archive_table(
+        "tags",
+        *_timestamp_columns(),
+        sa.Column("name", sa.String(100)),
+    )
+    _create_archive_table(
+        "users",
+        *_timestamp_columns(),
+        sa.Column("full_name", sa.String(64)),
+        sa.Column("email", sa.String(200), nullable=False),
+        sa.Column("email_verified", sa.Boolean(), nullable=False),
+        sa.Column("hashed_password", sa.Text(), nullable=False),
+        sa.Column("scopes", sa.Text()),
+    )
+    _create_archive_table(
+        "todos_tags",
+        *_timestamp_columns(with_deleted_at=False),
+        sa.Column("todo_id", sa.String(32), nullable=False),
+        sa.Column("tag_id", sa.String(32), nullable=False),
+    )
+    # 6c1f0b9e2d4a で id を変換した後に同じ名前で再作成される
+    op.create_index("ix_todos_tags_archive_todo_id", "todos_tags_archive", ["todo_id"])
+    op.create_index("ix_todos_tags_archive_tag_id", "todos_tags_archive", ["tag_id"])
+
+    for name, table_name, columns in DELETED_AT_INDEXES:
+        op.create_index(name, table_name, columns)
+
+def downgrade() -> None:
+    for name, table_name, _ in DELETED_AT_INDEXES:
+        op.drop_index(name, table_name=table_name)
+    for table_name in ["todos_tags", "users", "tags", "todos"]:
+        op.drop_table(f"{table_name}_archive")
\ No newline at end of file
@@ -0,0 +1,127 @@
+"""ULID の id・外部キーを String(32) から BINARY(16) に変更する
+
+既存データは batch 毎に 文字列の ULID を 16バイトに変換してコピーした後、カラムを入れ替える
+ULID として不正な id が存在する場合は 変換せずに失敗する
+
+Revision ID: 6c1f0b9e2d4a
+Revises: 2f5a8c3e1d70
+Create Date: 2026-10-17 00:00:00.000000
+"""
+from collections.abc import Callable
+from typing import Any
+import sqlalchemy as sa
+import ulid
+from alembic import op
+from sqlalchemy.dialects import mysql
+
+# revision identifiers, used by Alembic.
+revision: str = "6c1f0b9e2d4a"
+down_revision: str | None = "2f5a8c3e1d70"
+branch_labels: Any = None
+depends_on: Any = None
+
+# テーブル毎の ULID カラム. 先頭は主キー
+ID_COLUMNS: dict[str, list[str]] = {
+    "todos": ["id"],
+    "tags": ["id"],
+    "users": ["id"],
+    "todos_tags": ["id", "todo_id", "tag_id"],
+    "todos_archive": ["id"],
+    "tags_archive": ["id"],
+    "users_archive": ["id"],
+    "todos_tags_archive": ["id", "todo_id", "tag_id"],
+}
+FOREIGN_KEYS = [
+    ("todos_tags", "todo_id", "todos"),
+    ("todos_tags", "tag_id", "tags"),
+]
+UNIQUE_INDEXES = [("ix_todos_tags_todo_id_tag_id", "todos_tags", ["todo_id", "tag_id"])]
+INDEXES = [
+    ("ix_todos_tags_archive_todo_id", "todos_tags_archive", ["todo_id"]),
+    ("ix_todos_tags_archive_tag_id", "todos_tags_archive", ["tag_id"]),
+]
+BATCH_SIZE = 5000
+
+def to_binary(value: str) -> bytes:
+    try:
+        return ulid.from_str(value).bytes
+    except (ValueError, OverflowError) as e:
+        raise ValueError(f"invalid ULID: {value!r}") from e
+
+def to_string(value: bytes) -> str:
+    return ulid.from_bytes(bytes(value)).str
+
+def _copy_converted(
+    conn: sa.engine.Connection,
+    table_name: str,
+    columns: list[str],
+    convert: Callable[[Any], Any],
+) -> None:
+    """columns の値を変換して <column>_new にコピーする. 主キー順に BATCH_SIZE 件毎に更新する"""
+    table = sa.table(table_name, *[sa.column(c) for c in columns], *[sa.column(f"{c}_new") for c in columns])
+    pk    = table.c[columns[0]]
+    stmt  = sa.update(table) \
+        .where(pk == sa.bindparam("_pk")) \
+        .values({f"{c}_new": sa.bindparam(f"_{c}") for c in columns})
+
+    last = None
+    while True:
+        select_stmt = sa.select(*[table.c[c] for c in columns]).order_by(pk).limit(BATCH_SIZE)
+        if last is not None:
+            select_stmt = select_stmt.where(pk > last)
+        rows = conn.execute(select_stmt).all()
+        if not rows:
+            break
+        conn.execute(stmt, [
+            {"_pk": row[0], **{f"_{c}": None if v is None else convert(v) for c, v in zip(columns, row)}}
+            for row in rows
+        ])
+        last = rows[-1][0]
+
+def _migrate(new_type: sa.types.TypeEngine[Any], convert: Callable[[Any], Any]) -> None:
+    conn      = op.get_bind()
+    inspector = sa.inspect(conn)
+    tables    = {name: columns for name, columns in ID_COLUMNS.items() if inspector.has_table(name)}
+
+    # 主キーのカラムを入れ替えるため 外部キー・複合 unique を先に削除する
+    # FOREIGN_KEYS には同一テーブルが複数含まれるため テーブル毎に1回だけ、キャッシュのない inspector で取得する
+    # (MySQL の DDL はロールバックできないため 削除済みの外部キーを再度削除して途中で失敗しないようにする)
+    fk_inspector = sa.inspect(conn)
+    for table_name in sorted({table_name for table_name, _, _ in FOREIGN_KEYS}):
+        for fk in fk_inspector.get_foreign_keys(table_name):
+            op.drop_constraint(fk["name"], table_name, type_="foreignkey")
+    for name, table_name, _ in UNIQUE_INDEXES:
+        op.drop_index(name, table_name=table_name)
+
+    for table_name, columns in tables.items():
+        for column in columns:
+            op.add_column(table_name, sa.Column(f"{column}_new", new_type, nullable=True))
+        _copy_converted(conn, table_name, columns, convert)
+
+        op.execute(f"ALTER TABLE {table_name} DROP PRIMARY KEY")
+        for column in columns:
+            op.drop_column(table_name, column)
+            op.alter_column(
+                table_name,
+                f"{column}_new",
+                new_column_name=column,
+                existing_type=new_type,
+                nullable=False,
+            )
+        op.create_primary_key(f"pk_{table_name}", table_name, [columns[0]])
+
+    for name, table_name, columns in UNIQUE_INDEXES:
+        op.create_index(name, table_name, columns, unique=True)
+    for name, table_name, columns in INDEXES:
+        if table_name in tables:
+            op.create_index(name, table_name, columns)
+    for table_name, column, referred_table in FOREIGN_KEYS:
+        op.create_foreign_key(
+            f"fk_{table_name}_{column}", table_name, referred_table, [column], ["id"], ondelete="CASCADE",
+        )
+
+def upgrade() -> None:
+    _migrate(mysql.BINARY(16), to_binary)
+
+def downgrade() -> None:
+    _migrate(sa.String(32), to_string)
\ No newline at end of file
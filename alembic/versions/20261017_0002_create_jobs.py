@@ -0,0 +1,45 @@
+"""バックグラウンドジョブのキュー (jobs) を作成する
+
+Revision ID: 9a4e7d2c5b13
+Revises: 6c1f0b9e2d4a
+Create Date: 2026-10-17 00:00:00.000000
+"""
+from typing import Any
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import mysql
+
+# revision identifiers, used by Alembic.
+revision: str = "9a4e7d2c5b13"
+down_revision: str | None = "6c1f0b9e2d4a"
+branch_labels: Any = None
+depends_on: Any = None
+
+def upgrade() -> None:
+    op.create_table(
+        "jobs",
+        sa.Column("id", sa.LargeBinary(16).with_variant(mysql.BINARY(16), "mysql"), primary_key=True),
+        sa.Column("job_type", sa.String(100), nullable=False),
+        sa.Column("status", sa.String(20), nullable=False, server_default="queued"),
+        sa.Column("payload", sa.JSON()),
+        sa.Column("result", sa.JSON()),
+        sa.Column("error", sa.Text()),
+        sa.Column("progress", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("max_attempts", sa.Integer(), nullable=False, server_default="1"),
+        sa.Column("unique_key", sa.String(191), unique=True),
+        sa.Column("run_at", sa.DateTime(), nullable=False),
+        sa.Column("locked_by", sa.String(100)),
+        sa.Column("locked_at", sa.DateTime()),
+        sa.Column("started_at", sa.DateTime()),
+        sa.Column("finished_at", sa.DateTime()),
+        sa.Column("created_at", sa.DateTime(), nullable=False, server_default=sa.func.current_timestamp()),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        mysql_charset="utf8mb4",
+        mysql_collate="utf8mb4_unicode_ci",
+    )
+    op.create_index("ix_jobs_job_type", "jobs", ["job_type"])
+    op.create_index("ix_jobs_status_run_at", "jobs", ["status", "run_at"])
+
+def downgrade() -> None:
+    op.drop_table("jobs")
\ No newline at end of file
@@ -0,0 +1,47 @@
+"""updated_at を マイクロ秒 (DATETIME(6)) で保持する
+
+ETag を id・updated_at から生成するため、同一秒内の更新を区別できるようにする
+既存データの秒未満は 0 として変換される
+
+Revision ID: 4d8b2e6f1a37
+Revises: 9a4e7d2c5b13
+Create Date: 2026-10-17 00:00:00.000000
+"""
+from typing import Any
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import mysql
+
+# revision identifiers, used by Alembic.
+revision: str = "4d8b2e6f1a37"
+down_revision: str | None = "9a4e7d2c5b13"
+branch_labels: Any = None
+depends_on: Any = None
+
+TABLES = [
+    "todos",
+    "tags",
+    "users",
+    "todos_tags",
+    "todos_archive",
+    "tags_archive",
+    "users_archive",
+    "todos_tags_archive",
+    "jobs",
+]
+
+def _alter_updated_at(type_: sa.types.TypeEngine[Any], existing_type: sa.types.TypeEngine[Any]) -> None:
+    for table_name in TABLES:
+        op.alter_column(
+            table_name,
+            "updated_at",
+            type_=type_,
+            existing_type=existing_type,
+            existing_nullable=False,
+        )
+
+def upgrade() -> None:
+    _alter_updated_at(mysql.DATETIME(fsp=6), sa.DateTime())
+
+def downgrade() -> None:
+    _alter_updated_at(sa.DateTime(), mysql.DATETIME(fsp=6))
\ No newline at end of file
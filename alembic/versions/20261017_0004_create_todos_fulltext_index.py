@@ -0,0 +1,29 @@
+"""todos の q 検索用の FULLTEXT インデックス (ngram parser) を作成する
+
+TODOS_SEARCH_BACKEND=fulltext の MATCH ... AGAINST で使用する
+既存データがある場合 インデックスの構築中は todos への書き込みがブロックされる
+
+Revision ID: 7e3a9c1d5f62
+Revises: 4d8b2e6f1a37
+Create Date: 2026-10-17 00:00:00.000000
+"""
+from typing import Any
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "7e3a9c1d5f62"
+down_revision: str | None = "4d8b2e6f1a37"
+branch_labels: Any = None
+depends_on: Any = None
+
+def upgrade() -> None:
+    op.create_index(
+        "ft_todos_title_description",
+        "todos",
+        ["title", "description"],
+        mysql_prefix="FULLTEXT",
+        mysql_with_parser="ngram",
+    )
+
+def downgrade() -> None:
+    op.drop_index("ft_todos_title_description", table_name="todos")
\ No newline at end of file
@@ -1,25 +1,27 @@
-from fastapi import APIRouter, Request
-from app import schemas
-from app.core import utils
-from app.core.logger import get_logger
-from app.exceptions.core import APIException
-from app.exceptions.error_message import ErrorMessage
-logger = get_logger(__name__)
-router = APIRouter()
-
-@router.get("/error")
-def exec_error() -> None:
-    logger.error("debug test")
-    print(1 / 0)
-    raise APIException(ErrorMessage.NOT_FOUND("デバックテストID"))
-
-@router.get("/error2")
-def exec_error2() -> None:
-    raise APIException(ErrorMessage.INTERNAL_SERVER_ERROR)
-
-@router.get("/request-info")
-def get_request_info(request: Request) -> schemas.RequestInfoResponse:
-    ip_address = utils.get_request_info(request)
-    host       = utils.get_host_by_ip_address(ip_address)
-
-    return schemas.RequestInfoResponse(ip_address=ip_address, host=host)
+from fastapi import APIRouter, Request
+from app import schemas
+from app.core import utils
+from app.core.logger import get_logger
+from app.core.resolver import host_resolver
+from app.exceptions.core import APIException
+from app.exceptions.error_message import ErrorMessage
+logger = get_logger(__name__)
+router = APIRouter()
+
+@router.get("/error")
+def exec_error() -> None:
+    logger.error("debug test")
+    print(1 / 0)
+    raise APIException(ErrorMessage.NOT_FOUND("デバックテストID"))
+
+@router.get("/error2")
+def exec_error2() -> None:
+    raise APIException(ErrorMessage.INTERNAL_SERVER_ERROR)
+
+@router.get("/request-info")
+async def get_request_info(request: Request) -> schemas.RequestInfoResponse:
+    """クライアントの IP・ホスト名. ホスト名は REVERSE_DNS_BUDGET_SECONDS 以内に逆引きできた場合のみ返却する"""
+    ip_address = utils.get_request_info(request)
+    host       = await host_resolver.resolve(ip_address)
+
+    return schemas.RequestInfoResponse(ip_address=ip_address, host=host)
@@ -0,0 +1,16 @@
+from fastapi import APIRouter
+from app import schemas
+from app.core.language_analyzer import language_analyzer
+router = APIRouter()
+
+@router.post("/analyze", operation_id="analyze_language")
+async def analyze_language(data_in: schemas.LanguageAnalyzeIn) -> schemas.AnalyzedLanguagesResponse:
+    """
+    テキストを形態素解析する. texts 指定時は batch で解析する
+    同じテキストの結果はキャッシュし、解析は worker の process pool で実行する
+    """
+    texts   = [data_in.text] if data_in.texts is None else data_in.texts
+    results = await language_analyzer.analyze(texts)
+    return schemas.AnalyzedLanguagesResponse(
+        data=[language_analyzer.to_schema(text, tokens, elapsed) for text, (tokens, elapsed) in zip(texts, results)],
+    )
\ No newline at end of file
@@ -0,0 +1,45 @@
+from typing import Any
+from fastapi import APIRouter, Security
+from fastapi.responses import PlainTextResponse
+from app.core.auth import get_current_user, get_principal_cache_stats
+from app.core.database import replica_router
+from app.core.db_pool import get_pool_stats
+from app.core.language_analyzer import language_analyzer
+from app.core.metrics import render_metrics
+from app.core.password_hasher import password_hasher
+from app.core.query_detector import query_detector
+from app.core.resolver import host_resolver
+from app.crud.tag import get_tag_cache_stats
+# プール・キャッシュの状態や route 一覧を含むため 管理者のみ取得できる. Prometheus は admin の token で取得する
+router = APIRouter(dependencies=[Security(get_current_user, scopes=["admin"])])
+
+# Prometheus のテキスト形式 (charset は PlainTextResponse が付与する)
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4"
+
+@router.get("", operation_id="get_metrics", response_class=PlainTextResponse)
+def get_metrics() -> PlainTextResponse:
+    """
+    route 毎のレイテンシ・ステータス毎の件数・リクエスト毎のクエリ数/DB 時間、
+    コネクションプール・キャッシュ等の統計情報を Prometheus のテキスト形式で取得する (ワーカープロセス毎の値)
+    """
+    components = {
+        "principal_cache": get_principal_cache_stats(),
+        "tag_id_cache": get_tag_cache_stats(),
+        "password_hasher": password_hasher.stats(),
+        "language_analyzer": language_analyzer.stats(),
+        "reverse_dns": host_resolver.stats(),
+        "query_detector": query_detector.stats(),
+    }
+    content = render_metrics([
+        ("db_pool", "pool", get_pool_stats()),
+        ("app_component", "component", components),
+    ])
+    return PlainTextResponse(content, media_type=PROMETHEUS_CONTENT_TYPE)
+
+@router.get("/pool", operation_id="get_pool_metrics")
+def get_pool_metrics() -> dict[str, Any]:
+    """
+    コネクションプールの統計情報を取得する (ワーカープロセス毎の値)
+    checkout 待機時間のヒストグラムや 接続の生成/破棄数から プールサイズを調整する
+    """
+    return {"pools": get_pool_stats(), "replicas": replica_router.stats()}
\ No newline at end of file
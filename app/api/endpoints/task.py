@@ -1,24 +1,30 @@
-import asyncio
-import time
-from fastapi import APIRouter, BackgroundTasks
-from app.core.logger import get_logger
-logger = get_logger(__name__)
-router = APIRouter()
-
-def long_process_thread(id: str) -> None:
-    for i in range(100):
-        logger.info(f"[long_process_thread(id={id})] {i + 1}sec")
-        time.sleep(1)
-
-async def log_process_async(id: str) -> None:
-    for i in range(100):
-        logger.info(f"[long_process_asyncio(id={id})] {i+1}sec")
-        await asyncio.sleep(1)
-
-@router.post("/long-process/thread")
-def exec_long_process_thread(id: str, background_tasks: BackgroundTasks) -> None:
-    background_tasks.add_tasks(long_process_thread, id)
-
-@router.post("/long-process/async")
-async def exec_long_process_async(id: str, background_tasks: BackgroundTasks) -> None:
-    background_tasks.add_task(log_process_async, id)
\ No newline at end of file
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+from app import crud, schemas
+from app.core.jobs import enqueue_job, get_job_db, load_jobs
+from app.core.logger import get_logger
+from app.exceptions.core import APIException
+from app.exceptions.error_message import ErrorMessage
+logger = get_logger(__name__)
+router = APIRouter()
+
+# enqueue 時に ジョブ種別の登録を確認するため 定義を読み込む
+load_jobs()
+
+@router.post("/long-process/thread", operation_id="exec_long_process_thread")
+async def exec_long_process_thread(id: str, db: AsyncSession = Depends(get_job_db)) -> schemas.JobResponse:
+    """worker の thread pool で実行するジョブを登録する"""
+    return await enqueue_job(db, "long_process_thread", {"id": id})
+
+@router.post("/long-process/async", operation_id="exec_long_process_async")
+async def exec_long_process_async(id: str, db: AsyncSession = Depends(get_job_db)) -> schemas.JobResponse:
+    """worker の event loop で実行するジョブを登録する"""
+    return await enqueue_job(db, "long_process_async", {"id": id})
+
+@router.get("/{id}", operation_id="get_task_by_id")
+async def get_task(id: str, db: AsyncSession = Depends(get_job_db)) -> schemas.JobResponse:
+    """ジョブの状態・進捗・結果を取得する"""
+    job = await crud.job.get_db_obj_by_id(db, id)
+    if not job:
+        raise APIException(ErrorMessage.ID_NOT_FOUND)
+    return job
\ No newline at end of file
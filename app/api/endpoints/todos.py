@@ -1,68 +1,187 @@
-from fastapi import APIRouter, Depends, status
-from sqlalchemy.ext.asyncio import AsyncSession
-from app import crud, schemas
-from app.core.database import get_async_db
-from app.core.logger import get_logger
-from app.exceptions.core import APIException
-from app.exceptions.error_message import ErrorMessage
-from app.schemas.core import PagingQueryIn
-logger = get_logger(__name__)
-router = APIRouter()
-
-@router.get("/{id}", operation_id="get_todo_by_id")
-async def get_job(id: str, with_trashed: bool = False, db: AsyncSession = Depends(get_async_db)) -> schemas.TodoResponse:
-    """ todo データを取得する """
-    todo = await crud.todo.get_db_obj_by_id(db, id=id, include_deleted=with_trashed)
-    print(todo)
-
-    if not todo:
-        raise APIException(ErrorMessage.ID_NOT_FOUND)
-    return todo
-
-@router.get("", operation_id="get_paged_todos")
-async def get_paged_todos(
-    q: str | None = None,
-    paging_query_in: PagingQueryIn = Depends(),
-    sort_query_in: schemas.TodoSortQueryIn = Depends(),
-    with_trashed: bool = False,
-    db: AsyncSession = Depends(get_async_db)
-) -> schemas.TodosPagedResponse:
-    """ページネート一覧を取得する"""
-    data = crud.todo.get_paged_list(
-        db,
-        q=q,
-        paging_query_in=paging_query_in,
-        sort_query_in=sort_query_in,
-        include_deleted=with_trashed
-    )
-
-    return data
-
-@router.post("", operation_id="create_todo")
-async def create_todo(data_in: schemas.TodoCreate, db: AsyncSession = Depends(get_async_db)) -> schemas.TodoResponse:
-    """todo 新規作成"""
-    return await crud.todo.create(db, data_in)
-
-@router.patch("/{id}", operation_id="update_todo")
-async def update_todo(id: str, data_in: schemas.TodoUpdate, db: AsyncSession = Depends(get_async_db)) -> schemas.TodoResponse:
-    """todo 更新"""
-    todo = await crud.todo.get_db_obj_by_id(db, id=id)
-    if not todo:
-        raise APIException(ErrorMessage.ID_NOT_FOUND)
-    return await crud.todo.update(db, db_obj=todo, update_schema=data_in)
-
-@router.post("/{id}/tags", operation_id="add_tags_to_todo")
-async def add_tags_to_todo(id: str, tags_in: list[schemas.TagCreate], db: AsyncSession = Depends(get_async_db)) -> schemas.TodoResponse:
-    """ Todo に紐づく Tags TodoTag  を生成する"""
-    todo = await crud.todo.get_db_obj_by_id(db, id=id)
-    if not todo:
-        raise APIException(ErrorMessage.ID_NOT_FOUND)
-    return await crud.todo.add_tags_to_todo(db, todo=todo, tags_in=tags_in)
-
-@router.delete("/{id}", status_code=status.HTTP_204_NO_CONTENT, operation_id="delete_todo")
-async def delete_todo(id: str, db: AsyncSession = Depends(get_async_db)) -> None:
-    """todo を削除する"""
-    todo = await crud.todo.get_db_obj_by_id(db, id=id)
-    if not todo:
-        raise APIException(ErrorMessage.ID_NOT_FOUND)
+from collections.abc import AsyncIterator
+from typing import Any
+from fastapi import APIRouter, Depends, Request, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from app import crud, schemas
+from app.core.config import settings
+from app.core.database import get_async_db, get_async_session_factory, get_read_db
+from app.core.etag import is_not_modified, not_modified_response
+from app.core.export import iter_csv, iter_ndjson
+from app.core.logger import get_logger
+from app.core.serializer import ModelJSONResponse
+from app.exceptions.core import APIException
+from app.exceptions.error_message import ErrorMessage
+from app.schemas.core import CursorPagingQueryIn, ExportFormatEnum
+logger = get_logger(__name__)
+router = APIRouter()
+
+# NOTE: /bulk, /tags, /export は /{id} より先に定義する
+@router.post("/bulk", operation_id="create_todos_bulk")
+async def create_todos_bulk(
+    data_in: list[schemas.TodoCreate],
+    db: AsyncSession = Depends(get_async_db),
+) -> schemas.BulkResponse:
+    """todo 一括新規作成"""
+    return await crud.todo.create_many(db, data_in)
+
+@router.patch("/bulk", operation_id="update_todos_bulk")
+async def update_todos_bulk(
+    data_in: list[schemas.TodoBulkUpdate],
+    db: AsyncSession = Depends(get_async_db),
+) -> schemas.BulkResponse:
+    """todo 一括更新"""
+    return await crud.todo.update_many(db, [(item.id, item) for item in data_in])
+
+@router.delete("/bulk", operation_id="delete_todos_bulk")
+async def delete_todos_bulk(
+    data_in: schemas.BulkDeleteIn,
+    db: AsyncSession = Depends(get_async_db),
+) -> schemas.BulkResponse:
+    """todo を一括で削除する"""
+    return await crud.todo.delete_many(db, ids=data_in.ids)
+
+@router.post("/tags", operation_id="add_tags_to_todos")
+async def add_tags_to_todos(
+    data_in: list[schemas.TodoTagsIn],
+    db: AsyncSession = Depends(get_async_db),
+) -> list[schemas.TodoResponse]:
+    """複数の Todo に Tags を一括で紐付ける"""
+    if len(data_in) > settings.BULK_MAX_ITEMS: # todo の存在確認より先に件数を確認する
+        raise APIException(ErrorMessage.BULK_LIMIT_EXCEEDED)
+    todo_ids = {item.todo_id for item in data_in}
+    if todo_ids - await crud.todo.get_existing_ids(db, list(todo_ids)):
+        raise APIException(ErrorMessage.ID_NOT_FOUND)
+    return await crud.todo.add_tags_to_todos(db, [(item.todo_id, item.tags) for item in data_in])
+
+@router.get("/export", operation_id="export_todos")
+async def export_todos(
+    q: str | None = None,
+    format: ExportFormatEnum = ExportFormatEnum.ndjson,
+    sort_query_in: schemas.TodoSortQueryIn = Depends(),
+    with_trashed: bool = False,
+) -> StreamingResponse:
+    """
+    todo を NDJSON または CSV で全件出力する
+    q・並び順・論理削除の条件は 一覧取得と同じ. 件数によらず chunk 毎に取得・出力する
+    """
+    async def generate_chunks() -> AsyncIterator[list[Any]]:
+        # レスポンス送信中も DB セッションを保持するため、依存関係ではなくここでセッションを生成する
+        async with get_async_session_factory()() as db:
+            db.info["read_only"]   = True
+            db.info["use_replica"] = True
+            async for rows in crud.todo.stream_list(
+                db,
+                q=q,
+                sort_query_in=sort_query_in,
+                include_deleted=with_trashed,
+            ):
+                yield rows
+
+    if format == ExportFormatEnum.csv:
+        columns = [column.key for column in crud.todo._select_columns]
+        body, media_type = iter_csv(generate_chunks(), columns), "text/csv" # charset は StreamingResponse が付与する
+    else:
+        body, media_type = iter_ndjson(generate_chunks()), "application/x-ndjson"
+
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="todos.{format.value}"'},
+    )
+
+@router.get("/{id}", operation_id="get_todo_by_id")
+async def get_job(
+    id: str,
+    request: Request,
+    with_trashed: bool = False,
+    db: AsyncSession = Depends(get_read_db),
+) -> schemas.TodoResponse:
+    """
+    todo データを取得する
+    ETag は id・updated_at・tags の集計から生成し、If-None-Match が一致する場合は データを取得せず 304 を返却する
+    with_trashed 指定時、アーカイブ済み (保持期間を過ぎた論理削除) の todo は tags を空で返却する (紐付けは todos_tags_archive に保持する)
+    """
+    etag = await crud.todo.get_etag(db, id=id, include_deleted=with_trashed)
+    if etag is None:
+        raise APIException(ErrorMessage.ID_NOT_FOUND)
+    if is_not_modified(request, etag):
+        return not_modified_response(etag)
+
+    todo = await crud.todo.get_db_obj_by_id(db, id=id, include_deleted=with_trashed)
+    if not todo:
+        raise APIException(ErrorMessage.ID_NOT_FOUND)
+    return ModelJSONResponse(schemas.TodoResponse.from_orm(todo), headers={"ETag": etag})
+
+@router.get("", operation_id="get_paged_todos")
+async def get_paged_todos(
+    request: Request,
+    q: str | None = None,
+    paging_query_in: CursorPagingQueryIn = Depends(),
+    sort_query_in: schemas.TodoSortQueryIn = Depends(),
+    with_trashed: bool = False,
+    db: AsyncSession = Depends(get_read_db)
+) -> schemas.TodosPagedResponse:
+    """
+    ページネート一覧を取得する
+    after/before または paging_mode=cursor 指定時はカーソル方式で取得する
+    with_trashed 指定時、アーカイブ済み (保持期間を過ぎた論理削除) の todo は tags を空で返却する (紐付けは todos_tags_archive に保持する)
+    ETag は 件数・max(updated_at)・tags の集計とクエリパラメータから生成し、If-None-Match が一致する場合は 一覧を取得せず 304 を返却する
+    crud で検証済みのレスポンスを そのまま orjson で変換して返却する (FastAPI による再検証を行わない)
+    """
+    etag = await crud.todo.get_list_etag(
+        db,
+        q=q,
+        include_deleted=with_trashed,
+        query_params=str(sorted(request.query_params.multi_items())),
+    )
+    if is_not_modified(request, etag):
+        return not_modified_response(etag)
+
+    if paging_query_in.is_cursor_mode:
+        data = await crud.todo.get_cursor_paged_list(
+            db,
+            q=q,
+            paging_query_in=paging_query_in,
+            sort_query_in=sort_query_in,
+            include_deleted=with_trashed
+        )
+    else:
+        data = await crud.todo.get_paged_list(
+            db,
+            q=q,
+            paging_query_in=paging_query_in,
+            sort_query_in=sort_query_in,
+            include_deleted=with_trashed
+        )
+
+    return ModelJSONResponse(data, headers={"ETag": etag})
+
+@router.post("", operation_id="create_todo")
+async def create_todo(data_in: schemas.TodoCreate, db: AsyncSession = Depends(get_async_db)) -> schemas.TodoResponse:
+    """todo 新規作成"""
+    return await crud.todo.create(db, data_in)
+
+@router.patch("/{id}", operation_id="update_todo")
+async def update_todo(id: str, data_in: schemas.TodoUpdate, db: AsyncSession = Depends(get_async_db)) -> schemas.TodoResponse:
+    """todo 更新"""
+    todo = await crud.todo.get_db_obj_by_id(db, id=id)
+    if not todo:
+        raise APIException(ErrorMessage.ID_NOT_FOUND)
+    return await crud.todo.update(db, db_obj=todo, update_schema=data_in)
+
+@router.post("/{id}/tags", operation_id="add_tags_to_todo")
+async def add_tags_to_todo(id: str, tags_in: list[schemas.TagCreate], db: AsyncSession = Depends(get_async_db)) -> schemas.TodoResponse:
+    """ Todo に紐づく Tags TodoTag  を生成する"""
+    todo = await crud.todo.get_db_obj_by_id(db, id=id)
+    if not todo:
+        raise APIException(ErrorMessage.ID_NOT_FOUND)
+    return await crud.todo.add_tags_to_todo(db, todo=todo, tags_in=tags_in)
+
+@router.delete("/{id}", status_code=status.HTTP_204_NO_CONTENT, operation_id="delete_todo")
+async def delete_todo(id: str, db: AsyncSession = Depends(get_async_db)) -> None:
+    """todo を削除する"""
+    todo = await crud.todo.get_db_obj_by_id(db, id=id)
+    if not todo:
+        raise APIException(ErrorMessage.ID_NOT_FOUND)
     await crud.todo.delete(db, db_obj=todo)
\ No newline at end of file
@@ -0,0 +1,57 @@
+"""
+論理削除後 保持期間を過ぎたデータを *_archive テーブルへ移動する
+
+例)
+    python -m app.core.archive
+    python -m app.core.archive --retention-days 90 --batch-size 1000
+"""
+import argparse
+import asyncio
+import datetime
+from typing import Any
+from app.core.config import settings
+from app.core.database import get_async_session_factory
+from app.core.logger import get_logger
+logger = get_logger(__name__)
+
+def get_archive_targets() -> list[Any]:
+    """アーカイブ対象の crud. todos_tags は todo・tag の移動時に合わせて移動する"""
+    from app import crud
+    return [crud.todo, crud.tag, crud.user]
+
+async def archive_soft_deleted(
+    retention_days: int | None = None,
+    batch_size: int | None = None,
+) -> dict[str, int]:
+    """
+    論理削除後 retention_days を過ぎたデータを batch_size 件毎に移動し、テーブル毎の移動件数を返却する
+    ロックの保持時間を短くするため batch 毎に commit し、次の batch まで待機する
+    """
+    retention_days = settings.ARCHIVE_RETENTION_DAYS if retention_days is None else retention_days
+    batch_size     = batch_size or settings.ARCHIVE_BATCH_SIZE
+    deleted_before = datetime.datetime.now(tz=datetime.timezone.utc) - datetime.timedelta(days=retention_days)
+
+    results: dict[str, int] = {}
+    for target in get_archive_targets():
+        table_name = target.model.__tablename__
+        results[table_name] = 0
+        while True:
+            async with get_async_session_factory()() as db:
+                ids = await target.archive_deleted(db, deleted_before, batch_size)
+                await db.commit()
+            results[table_name] += len(ids)
+            if len(ids) < batch_size:
+                break
+            await asyncio.sleep(settings.ARCHIVE_BATCH_INTERVAL_SECONDS)
+        logger.info(f"archived. table={table_name} count={results[table_name]} deleted_before={deleted_before}")
+    return results
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--retention-days", type=int, default=None)
+    parser.add_argument("--batch-size", type=int, default=None)
+    args = parser.parse_args()
+    print(asyncio.run(archive_soft_deleted(args.retention_days, args.batch_size)))
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
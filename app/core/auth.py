@@ -1,76 +1,151 @@
-from datetime import datetime, timedelta, timezone
-from typing import Any
-# fastapi
-from fastapi import Depends, status
-from fastapi, security import OAuth2PasswordBearer, SecurityScopes
-from jose import jwt
-from jose.exceptions import JWTError
-from passlib.context import CryptContext
-from pydantic import ValidationError
-from sqlalchemy.ext.asyncio import AsyncSession
-# app
-from app import crud, models, schemas
-from app.exceptions.core import APIException
-from app.exceptions.error_message import ErrorMessage
-# config系
-from .config import settings
-from .database import get_async_db
-from .logger import get_logger
-
-# 認証設定
-pwd_context     = CryptContext(schemes=["bcrypt"], deprecated="auto")
-ALGORITHM       = "HS256"
-reusable_oauth2 = OAuth2PasswordBearer(
-    tokenUrl=f"{settings.API_GATEWAY_STAGE_PATH}/auth/login",
-    auto_error=False,
-)
-
-def create_access_token(subject: str | Any, expires_delta: timedelta | None = None) -> str:
-    """jwtエンコードしたアクセストークンを生成する"""
-    expire = datetime.now(tz=timezone.utc) + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    if expires_delta:
-        expire = datetime.now(tz=timezone.utc) + expires_delta
-
-    to_encode   = {"exp": expire, "sub": str(subject)}
-    return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=ALGORITHM)
-
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """パスワードバリデーションを実行する"""
-    return pwd_context.verify(plain_password, hashed_password)
-
-def get_password_hash(password: str) -> str:
-    """パスワードをハッシュ化して返却する"""
-    return pwd_context.hash(password)
-
-async def get_current_user(
-        security_scopes: SecurityScopes,
-        db: AsyncSession = Depens(get_async_db),
-        token: str = Depends(reusable_oauth2),
-) -> models.User:
-    """現在のユーザーを取得する"""
-    if not token:
-        raise APIException(ErrorMessage.CouldNotValidateCredentials)
-
-    # jwt をデコードしてデータを取得する
-    try:
-        payload    = jwt.decode(token, settings.SECRET_KEY, algorithms=[ALGORITHM])
-        token_data = schemas.TokenPayload(**payload)
-    except (JWTError, ValidationError):
-        raise APIException(
-            ErrorMessage.CouldNotValidateCredentials
-        ) from None
-
-    # ユーザーを取得する
-    user = await crud.user.get_db_obj_by_id(db, id=token_data.sub)
-    if not user:
-        raise APIException(ErrorMessage.NOT_FOUND("USER"))
-    user_scope = user.scopes.split(",") if user.scopes else []
-    # セキュリティ範囲外の場合は失敗
-    for scope in security_scopes.scopes:
-        if scope not in user_scope:
-            raise APIException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                error=ErrorMessage.PERMISSION_ERROR,
-            )
-
-    return user
\ No newline at end of file
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any
+# fastapi
+from fastapi import Depends, status
+from fastapi.security import OAuth2PasswordBearer, SecurityScopes
+from jose import jwt
+from jose.exceptions import JWTError
+from pydantic import ValidationError
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+# app
+from app import crud, schemas
+from app.exceptions.core import APIException
+from app.exceptions.error_message import ErrorMessage
+# config系
+from .cache import TTLCache
+from .config import settings
+from .database import get_async_db
+from .logger import get_logger
+from .password_hasher import password_hasher, pwd_context
+
+# 認証設定
+ALGORITHM       = "HS256"
+reusable_oauth2 = OAuth2PasswordBearer(
+    tokenUrl=f"{settings.API_GATEWAY_STAGE_PATH}/auth/login",
+    auto_error=False,
+)
+
+@dataclass(frozen=True)
+class Principal:
+    """認証済ユーザのキャッシュデータ"""
+    payload: dict[str, Any]
+    user: schemas.CurrentUser
+    scopes: tuple[str, ...]
+
+# token をキーとした 認証済ユーザのキャッシュ
+# プロセス毎に保持するため、他プロセス (ワーカー) でのユーザ更新・削除・scopes の変更は 最大 TTL 秒 反映が遅れる
+principal_cache = TTLCache(
+    maxsize=settings.PRINCIPAL_CACHE_MAXSIZE,
+    ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+)
+# commit 前に破棄すると 並行するリクエストが commit 前のユーザを再度キャッシュするため session.info に保持し、commit 後に破棄する
+_PENDING_USER_IDS_KEY = "pending_principal_user_ids"
+# 破棄の実行回数. ユーザの取得中に破棄された場合は 取得したユーザをキャッシュしない
+_invalidation_count = 0
+
+def _invalidate_principals(user_ids: set[str]) -> int:
+    global _invalidation_count
+    _invalidation_count += 1
+    return principal_cache.invalidate(lambda _, principal: principal.user.id in user_ids)
+
+@event.listens_for(Session, "after_commit")
+def _apply_pending_invalidations(session: Session) -> None:
+    user_ids = session.info.pop(_PENDING_USER_IDS_KEY, None)
+    if user_ids:
+        _invalidate_principals(user_ids)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending_invalidations(session: Session) -> None:
+    session.info.pop(_PENDING_USER_IDS_KEY, None)
+
+def invalidate_principal(db: AsyncSession, user_id: str) -> None:
+    """user_id に紐づくキャッシュを commit 後に削除する. ユーザ更新・削除時に呼び出す"""
+    db.info.setdefault(_PENDING_USER_IDS_KEY, set()).add(user_id)
+
+def get_principal_cache_stats() -> dict[str, int]:
+    """認証済ユーザキャッシュの hit/miss 数を返却する"""
+    return principal_cache.stats()
+
+async def _load_principal(db: AsyncSession, token: str) -> Principal:
+    """token をデコードし、ユーザを取得して Principal を生成する"""
+    # jwt をデコードしてデータを取得する
+    try:
+        payload    = jwt.decode(token, settings.SECRET_KEY, algorithms=[ALGORITHM])
+        token_data = schemas.TokenPayload(**payload)
+    except (JWTError, ValidationError):
+        raise APIException(
+            ErrorMessage.CouldNotValidateCredentials
+        ) from None
+
+    # ユーザーを取得する
+    user = await crud.user.get_db_obj_by_id(db, id=token_data.sub)
+    if not user:
+        raise APIException(ErrorMessage.NOT_FOUND("USER"))
+    user_scope = tuple(user.scopes.split(",")) if user.scopes else ()
+
+    return Principal(payload=payload, user=schemas.CurrentUser.from_orm(user), scopes=user_scope)
+
+def create_access_token(subject: str | Any, expires_delta: timedelta | None = None) -> str:
+    """jwtエンコードしたアクセストークンを生成する"""
+    expire = datetime.now(tz=timezone.utc) + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    if expires_delta:
+        expire = datetime.now(tz=timezone.utc) + expires_delta
+
+    to_encode   = {"exp": expire, "sub": str(subject)}
+    return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=ALGORITHM)
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """パスワードバリデーションを実行する"""
+    return pwd_context.verify(plain_password, hashed_password)
+
+def get_password_hash(password: str) -> str:
+    """パスワードをハッシュ化して返却する"""
+    return pwd_context.hash(password)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+    """
+    パスワードバリデーションを イベントループ外で実行する
+    ハッシュが deprecated の場合は 再ハッシュした値を合わせて返却する
+    """
+    return await password_hasher.verify_and_update(plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    """パスワードのハッシュ化を イベントループ外で実行する"""
+    return await password_hasher.hash(password)
+
+async def get_current_user(
+        security_scopes: SecurityScopes,
+        db: AsyncSession = Depends(get_async_db),
+        token: str = Depends(reusable_oauth2),
+) -> schemas.CurrentUser:
+    """
+    現在のユーザーを取得する
+    token 毎に デコード結果・ユーザ・scopes をキャッシュし、2回目以降は DB に問い合わせない
+    返却する CurrentUser は session に紐づかない変更不可のスキーマのため、更新時は crud で User を取得する
+    """
+    if not token:
+        raise APIException(ErrorMessage.CouldNotValidateCredentials)
+
+    principal = principal_cache.get(token) if settings.PRINCIPAL_CACHE_TTL_SECONDS > 0 else None
+    if principal is None:
+        invalidation_count = _invalidation_count
+        principal          = await _load_principal(db, token)
+        if settings.PRINCIPAL_CACHE_TTL_SECONDS > 0 and invalidation_count == _invalidation_count:
+            # token の有効期限を超えてキャッシュしない
+            ttl = min(settings.PRINCIPAL_CACHE_TTL_SECONDS, principal.payload.get("exp", 0) - time.time())
+            if ttl > 0:
+                principal_cache.set(token, principal, ttl=ttl)
+
+    # セキュリティ範囲外の場合は失敗
+    for scope in security_scopes.scopes:
+        if scope not in principal.scopes:
+            raise APIException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                error=ErrorMessage.PERMISSION_ERROR,
+            )
+
+    return principal.user
\ No newline at end of file
@@ -1,57 +1,177 @@
-import os
-from functools import lru_cache
-from pathlib import Path
-from pydemic import BaseSettings
-
-# 定数を設置する
-class Settings(BaseSettings):
-    # NOTE: 環境変数定義　const
-    TITLE: str              = "FastAPI Sample"
-    ENV: str                = ""
-    DEBUG: bool             = False
-    VERSION: str            = "0.0.1"
-    CORS_ORIGINS: list[str] = [
-        "http://localhost:8000",
-        "http://127.0.0.1:8000",
-        "http://localhost:3000",
-        "http://localhost:3333",
-    ]
-    BASE_DIR_PATH: str       = str(Path(__file__).parent.parent.absolute())
-    ROOT_DIR_PATH: str       = str(Path(__file__).parent.parent.parent.absolute())
-    LOGGER_CONFIG_PATH: str  = os.path.join(BASE_DIR_PATH, "logger_config.yaml")
-    MIGRATIONS_DIR_PATH: str = os.path.join(ROOT_DIR_PATH, "alembic")
-
-    DB_HOST: str
-    DB_PORT: str
-    DB_NAME: str
-    DB_USER_NAME: str
-    DB_PASSWORD: str
-
-    API_GATEWAY_STAGE_PATH: str      = ""
-    ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
-
-    SECRET_KEY: str     = "secret"
-    SENTRY_SDK_DNS: str = ""
-
-    def get_database_url(self, is_async: bool = False) -> str:
-        if is_async:
-            return (
-                "mysql+aiomysql://"
-                f"{self.DB_USER_NAME}:{self.DB_PASSWORD}@"
-                f"{self.DB_HOST}/{self.DB_NAME}?charset=utf8mb4"
-            )
-        else:
-            return (
-                "mysql://"
-                f"{self.DB_USER_NAME}:{self.DB_PASSWORD}@"
-                f"{self.DB_HOST}/{self.DB_NAME}?charset=utf8mb4"
-            )
-
-    class Config:
-        env_file = ".env"
-
-@lru_cache
-def get_settings() -> Settings:
-    return Settings()
-
+import os
+from functools import lru_cache
+from pathlib import Path
+from pydemic import BaseSettings
+
+# 定数を設置する
+class Settings(BaseSettings):
+    # NOTE: 環境変数定義　const
+    TITLE: str              = "FastAPI Sample"
+    ENV: str                = ""
+    DEBUG: bool             = False
+    VERSION: str            = "0.0.1"
+    CORS_ORIGINS: list[str] = [
+        "http://localhost:8000",
+        "http://127.0.0.1:8000",
+        "http://localhost:3000",
+        "http://localhost:3333",
+    ]
+    BASE_DIR_PATH: str       = str(Path(__file__).parent.parent.absolute())
+    ROOT_DIR_PATH: str       = str(Path(__file__).parent.parent.parent.absolute())
+    LOGGER_CONFIG_PATH: str  = os.path.join(BASE_DIR_PATH, "logger_config.yaml")
+    MIGRATIONS_DIR_PATH: str = os.path.join(ROOT_DIR_PATH, "alembic")
+
+    DB_HOST: str
+    DB_PORT: str
+    DB_NAME: str
+    DB_USER_NAME: str
+    DB_PASSWORD: str
+
+    # コネクションプール設定 (エンジン毎・ワーカープロセス毎)
+    DB_POOL_SIZE: int                  = 5
+    DB_POOL_MAX_OVERFLOW: int          = 10
+    DB_POOL_RECYCLE_SECONDS: int       = 3600
+    DB_POOL_TIMEOUT_SECONDS: int       = 30
+    # 指定秒数以上 使用されていない接続のみ checkout 時に ping する (0 で毎回, -1 で無効)
+    DB_POOL_PRE_PING_IDLE_SECONDS: int = 30
+
+    # リードレプリカの接続先 (mysql+aiomysql://...). 未指定時は全てプライマリに接続する
+    DB_REPLICA_URLS: list[str] = []
+    # 書き込み後、同一クライアントの参照をプライマリに固定する秒数 (最終書き込み時刻を cookie・X-DB-Last-Write ヘッダで返却する. 0 で無効)
+    DB_REPLICA_STICKY_SECONDS: int = 5
+    # 接続エラーとなったレプリカを除外する秒数
+    DB_REPLICA_RETRY_SECONDS: int = 30
+
+    # ログ出力. LOG_QUEUE_ENABLED の場合は キュー経由で別スレッドから出力する (Lambda では無効にする)
+    LOG_LEVEL: str                       = "INFO"
+    LOG_FORMAT: str                      = "text" # text or json
+    LOG_QUEUE_ENABLED: bool              = True
+    # logger 毎 (前方一致) の 1秒あたりの出力件数の上限・サンプリング率 (WARNING 以上は対象外)
+    LOG_RATE_LIMITS: dict[str, float]    = {"app.jobs": 1.0}
+    LOG_RATE_LIMIT_BURST: int            = 10
+    LOG_SAMPLE_RATES: dict[str, float]   = {}
+    # アクセスログを出力しない path (前方一致)
+    LOG_ACCESS_EXCLUDED_PATHS: list[str] = ["/docs", "/redoc", "/openapi.json"]
+
+    # route 毎のレイテンシ・クエリ数等を記録し /metrics で出力する
+    METRICS_ENABLED: bool = True
+    # スロークエリ・N+1 の検出 (opt-in). 閾値以上のクエリ・1リクエスト内で閾値回を超えて実行された同一のクエリをログに出力する
+    QUERY_DETECTOR_ENABLED: bool             = False
+    QUERY_DETECTOR_SLOW_QUERY_SECONDS: float = 0.5
+    QUERY_DETECTOR_REPEAT_THRESHOLD: int     = 5
+    QUERY_DETECTOR_MAX_PARAMS_LENGTH: int    = 500
+
+    API_GATEWAY_STAGE_PATH: str      = ""
+    ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+
+    # ページネーション総件数の取得方法 (exact, cached, estimated, none)
+    TODOS_COUNT_STRATEGY: str           = "exact"
+    PAGING_COUNT_CACHE_TTL_SECONDS: int = 60
+    PAGING_COUNT_CACHE_MAXSIZE: int     = 1024
+
+    # 一覧取得の per_page 上限. 超える件数は export API を使用する
+    PAGING_MAX_PER_PAGE: int = 1000
+    # export API で 1回に DB から取得・出力する件数
+    EXPORT_CHUNK_SIZE: int = 1000
+
+    # 一括処理(create_many 等)の 1回の SQL で扱う件数
+    BULK_BATCH_SIZE: int = 1000
+    # 一括処理の 1リクエストで扱う件数の上限. transaction・レスポンスが大きくなりすぎないようにする
+    BULK_MAX_ITEMS: int  = 10000
+
+    # 論理削除後 保持日数を過ぎたデータを *_archive テーブルへ移動する
+    ARCHIVE_RETENTION_DAYS: int           = 30
+    ARCHIVE_BATCH_SIZE: int               = 500
+    # バッチ間の待機秒数 (ロック競合・レプリケーション遅延を抑える)
+    ARCHIVE_BATCH_INTERVAL_SECONDS: float = 0.5
+    # ジョブ (archive_soft_deleted) としての定期実行間隔. 0 で無効 (Lambda 等では python -m app.core.archive を定期実行する)
+    ARCHIVE_INTERVAL_SECONDS: int         = 0
+
+    # バックグラウンドジョブ. キューの DB 未指定時はアプリの DB を使用する (ローカルでは sqlite+aiosqlite:///./jobs.sqlite3 等)
+    JOB_DATABASE_URL: str             = ""
+    # アプリのプロセス内で worker を起動する. 無効時は python -m app.core.jobs で起動する
+    JOB_WORKER_IN_PROCESS: bool       = False
+    JOB_POLL_INTERVAL_SECONDS: float  = 1.0
+    # 再試行を含む実行回数の既定値. 失敗毎に JOB_RETRY_BACKOFF_SECONDS * 2^(n-1) 秒待機する
+    JOB_MAX_ATTEMPTS: int             = 3
+    JOB_RETRY_BACKOFF_SECONDS: float  = 5.0
+    # heartbeat (poll 毎に更新) が途絶えたジョブを 停止した worker のものとみなし再実行するまでの秒数
+    JOB_LOCK_TIMEOUT_SECONDS: int     = 300
+    JOB_THREAD_WORKERS: int           = 4
+    JOB_PROCESS_WORKERS: int          = 2
+
+    # todo の q 検索方式 (like, fulltext, inverted_index)
+    # inverted_index はプロセス毎のインデックスで 他プロセスの変更が反映されないため 単一プロセスでのみ使用する
+    TODOS_SEARCH_BACKEND: str = "like"
+
+    # 形態素解析 (sudachi, simple). sudachi が使用できない場合は simple で解析する
+    LANGUAGE_ANALYZER_BACKEND: str             = "sudachi"
+    # sudachi のシステム辞書 (core, small, full または system.dic のパス)
+    LANGUAGE_ANALYZER_SUDACHI_DICTIONARY: str  = "core"
+    # simple の辞書 (python -m app.core.language_analyzer で作成した TSV). 未指定時は文字種のみで分割する
+    LANGUAGE_ANALYZER_DICTIONARY_PATH: str     = ""
+    LANGUAGE_ANALYZER_EXECUTOR: str            = "process" # thread or process
+    LANGUAGE_ANALYZER_WORKERS: int             = 2
+    # 実行中以外に待機できるテキストの件数. 1リクエストの batch を受け付けられるよう MAX_BATCH_SIZE 以上とする
+    LANGUAGE_ANALYZER_QUEUE_LIMIT: int         = 200
+    LANGUAGE_ANALYZER_MAX_BATCH_SIZE: int      = 100
+    LANGUAGE_ANALYZER_MAX_TEXT_LENGTH: int     = 10000
+    # tokens から除き excluded_token とする品詞 (大分類)
+    LANGUAGE_ANALYZER_EXCLUDED_POS: list[str]  = ["補助記号", "空白"]
+    # 解析結果のキャッシュ (テキストの hash 毎. TTL 0 で無効)
+    LANGUAGE_ANALYZER_CACHE_TTL_SECONDS: int   = 3600
+    LANGUAGE_ANALYZER_CACHE_MAXSIZE: int       = 10000
+
+    # クライアントのホスト名の逆引き (アクセスログ・request-info 用)
+    REVERSE_DNS_ENABLED: bool                     = False
+    # 1リクエストで逆引きを待機する上限秒数. 超えた場合はホスト名なしとし、逆引きは継続してキャッシュする
+    REVERSE_DNS_BUDGET_SECONDS: float             = 0.05
+    # 1回の逆引きの上限秒数. 超えた場合は未解決としてキャッシュする
+    REVERSE_DNS_TIMEOUT_SECONDS: float            = 2.0
+    REVERSE_DNS_CACHE_TTL_SECONDS: int            = 3600
+    REVERSE_DNS_NEGATIVE_CACHE_TTL_SECONDS: int   = 300
+    REVERSE_DNS_CACHE_MAXSIZE: int                = 10000
+    REVERSE_DNS_WORKERS: int                      = 4
+    # 同時に実行する逆引きの上限. 超えた場合は逆引きしない
+    REVERSE_DNS_MAX_INFLIGHT: int                 = 64
+
+    # 認証済ユーザのキャッシュ (TTL 0 で無効). プロセス毎に保持するため 他プロセスでの権限変更・削除は最大 TTL 秒 遅れて反映される
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 15
+    PRINCIPAL_CACHE_MAXSIZE: int     = 10000
+
+    # tag名 → id のキャッシュ (TTL 0 で無効). プロセス毎に保持し、他プロセスで削除された tag の id は insert 失敗時に破棄する
+    TAG_ID_CACHE_TTL_SECONDS: int = 600
+    TAG_ID_CACHE_MAXSIZE: int     = 10000
+
+    # パスワードハッシュ設定. 先頭の scheme でハッシュ化し、cost は scheme 毎に指定する
+    PASSWORD_HASH_SCHEMES: list[str]     = ["bcrypt"]
+    PASSWORD_HASH_ROUNDS: dict[str, int] = {"bcrypt": 12}
+    PASSWORD_HASH_EXECUTOR: str          = "thread" # thread or process
+    PASSWORD_HASH_WORKERS: int           = 4
+    PASSWORD_HASH_QUEUE_LIMIT: int       = 32
+
+    SECRET_KEY: str     = "secret"
+    SENTRY_SDK_DNS: str = ""
+
+    def get_database_url(self, is_async: bool = False) -> str:
+        if is_async:
+            return (
+                "mysql+aiomysql://"
+                f"{self.DB_USER_NAME}:{self.DB_PASSWORD}@"
+                f"{self.DB_HOST}/{self.DB_NAME}?charset=utf8mb4"
+            )
+        else:
+            return (
+                "mysql://"
+                f"{self.DB_USER_NAME}:{self.DB_PASSWORD}@"
+                f"{self.DB_HOST}/{self.DB_NAME}?charset=utf8mb4"
+            )
+
+    class Config:
+        env_file = ".env"
+
+@lru_cache
+def get_settings() -> Settings:
+    return Settings()
+
 settings = get_settings()
\ No newline at end of file
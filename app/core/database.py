@@ -1,97 +1,316 @@
-from collections.abc import AsyncGenerator, Generator
-# sql
-from sqlalchemy import MetaData, create_engine
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
-from sqlalchemy.orm import Session, sessionmaker
-from sqlalchemy.sql import text
-# setting, log
-from app.core.config import settings
-from app.core.logger import get_logger
-# log 生成
-logger = get_logger(__name__)
-
-# DB接続設定を定義
-try: # 通常エンジンを定義する
-    engine = create_engine(
-        settings.get_database_url(),
-        connect_args={"auth_plugin": "mysql_native_password"},
-        pool_pre_ping=True,
-        echo=False,
-        future=True,
-    )
-    session_factory = sessionmaker(
-        autocommit=False,
-        autoflush=False,
-        bind=engine
-    )
-except Exception as e:
-    logger.error(f"DB connection error. detail={e}")
-
-try: # 非同期エンジンを定義する
-    async_engine = create_async_engine(
-        settings.get_database_url(),
-        connect_args={"auth_plugin": "mysql_native_password"},
-        pool_pre_ping=True,
-        echo=False,
-        future=True,
-    )
-    async_session_factory = sessionmaker(
-        autocommit=False,
-        autoflush=False,
-        bind=async_engine,
-        class_=AsyncSession,
-    )
-except Exception as e:
-    logger.error(f"DB connection error. detail={e}")
-
-
-def get_db() -> Generator[Session, None, None]:
-    """
-    通常DBセッションを生成し動作させる
-    endpointからアクセス時に、Dependで呼び出しdbセッションを生成する
-    エラーがなければ、commitする
-    エラー時はrollbackし、いずれの場合も最終的にcloseする.
-    """
-    db = None
-    try:
-        db = session_factory()
-        yield db
-        db.commit()
-    except Exception:
-        if db:
-            db.rollback()
-    finally:
-        if db:
-            db.close()
-
-async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
-    """非同期DBセッションを生成し動作させる"""
-    async with async_session_factory() as db:
-        try:
-            yield db
-            await db.commit()
-        except Exception:
-            await db.rollback()
-        finally:
-            await db.close()
-
-def drop_all_tables() -> None:
-    """全てのテーブルおよび型、Roleなどを削除して、初期状態に戻す(開発環境専用)"""
-    logger.info("start: drop_all_tables")
-    if settings.ENV != "local":
-        # ローカル環境以外は非動作
-        logger.info("drop_all_table() is ENV local only.")
-        return
-
-    metadata = MetaData()
-    metadata.reflect(bind=engine) # 通常エンジンと紐づける
-
-    with engine.connect() as connect:
-        # 外部キー制約を無効にして、データを無制限に削除できるようにする
-        connect.execute("SET FOREIGN_KEY_CHECKS = 0")
-         # 全テーブル削除
-        for table in metadata.tables:
-            connect.execute(text(f"DROP TABLE {table} CASCADE"))
-        # 外部キー制約を有効化
-        connect.execute("SET FOREIGN_KEY_CHECKS = 1")
-    logger.info("end: drop_all_tables")
+import itertools
+import threading
+import time
+from collections.abc import AsyncGenerator, Generator
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Any
+# fastapi
+from fastapi import Request
+# sql
+from sqlalchemy import MetaData, create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import InterfaceError, InvalidRequestError, OperationalError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.sql import Select, text
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+# setting, log
+from app.core.config import settings
+from app.core.db_pool import get_pool_options, setup_pool_events
+from app.core.logger import get_logger
+# log 生成
+logger = get_logger(__name__)
+
+class ReplicaRouter:
+    """
+    リードレプリカの選択とヘルス管理を行う
+    ラウンドロビンで選択し、接続エラーとなったレプリカは retry_seconds の間 選択対象から除外する
+    """
+    def __init__(self, engines: list[AsyncEngine], retry_seconds: float) -> None:
+        self.engines       = engines
+        self.retry_seconds = retry_seconds
+        self._unhealthy_until: dict[int, float] = {}
+        self._counter = itertools.count()
+        self._lock    = threading.Lock()
+
+    def choose(self) -> AsyncEngine | None:
+        """正常なレプリカを返却する. 存在しない場合は None (プライマリを使用する)"""
+        now = time.monotonic()
+        with self._lock:
+            for _ in range(len(self.engines)):
+                engine = self.engines[next(self._counter) % len(self.engines)]
+                if self._unhealthy_until.get(id(engine), 0.0) <= now:
+                    return engine
+        return None
+
+    def mark_unhealthy(self, engine: AsyncEngine) -> None:
+        with self._lock:
+            self._unhealthy_until[id(engine)] = time.monotonic() + self.retry_seconds
+        logger.warning(f"replica marked unhealthy. url={engine.url.render_as_string(hide_password=True)}")
+
+    def stats(self) -> list[dict[str, Any]]:
+        """レプリカ毎の接続先・状態を返却する"""
+        now = time.monotonic()
+        return [
+            {
+                "url": engine.url.render_as_string(hide_password=True),
+                "healthy": self._unhealthy_until.get(id(engine), 0.0) <= now,
+            }
+            for engine in self.engines
+        ]
+
+class RoutingSession(Session):
+    """
+    参照をリードレプリカに振り分けるセッション
+    info["use_replica"] が True の場合、SELECT のみレプリカで実行する
+    info["read_only"] が True の場合、レプリカ以外は プライマリの read only 用エンジンで実行し、書き込みはエラーとする
+    flush や INSERT/UPDATE/DELETE を実行した後は read-your-writes のため 以降の参照もプライマリで実行する
+    レプリカは 1セッション内で固定し、接続エラー時は 別のレプリカ(なければプライマリ)で 1度だけ再実行する
+    """
+    def get_bind(self, mapper: Any = None, clause: Any = None, **kw: Any) -> Any:
+        is_write = self._flushing or (clause is not None and clause.is_dml)
+        if is_write and self.info.get("read_only"):
+            raise InvalidRequestError("read only session では書き込みできません")
+        if is_write:
+            self.info["wrote"] = True
+            writes = _request_writes.get()
+            if writes is not None:
+                writes["last_write_at"] = time.time()
+        elif self.info.get("use_replica") and not self.info.get("wrote") and isinstance(clause, Select):
+            if "replica" not in self.info:
+                self.info["replica"] = replica_router.choose()
+            if self.info["replica"] is not None:
+                return self.info["replica"].sync_engine
+        if self.info.get("read_only"):
+            return get_read_only_engine().sync_engine
+        return super().get_bind(mapper=mapper, clause=clause, **kw)
+
+    def execute(self, statement: Any, *args: Any, **kw: Any) -> Any:
+        try:
+            return super().execute(statement, *args, **kw)
+        except (OperationalError, InterfaceError):
+            replica = self.info.get("replica")
+            if replica is None or self.info.get("wrote"):
+                raise
+            replica_router.mark_unhealthy(replica)
+            # レプリカの接続を解放し、選択し直して再実行する
+            self.rollback()
+            del self.info["replica"]
+            return super().execute(statement, *args, **kw)
+
+replica_router = ReplicaRouter([], settings.DB_REPLICA_RETRY_SECONDS)
+
+# 書き込みを行ったクライアントに返却する 最終書き込み時刻 (UNIX 時間 ms) の cookie・ヘッダ
+# 期限内 (DB_REPLICA_STICKY_SECONDS) に送信された参照はプライマリで実行する. プロセス・サーバをまたいで有効となる
+LAST_WRITE_COOKIE = "db_last_write"
+LAST_WRITE_HEADER = "x-db-last-write"
+# リクエスト毎の最終書き込み時刻. RoutingSession が設定し、ReadYourWritesMiddleware がレスポンスに設定する
+_request_writes: ContextVar[dict[str, float] | None] = ContextVar("request_writes", default=None)
+
+class ReadYourWritesMiddleware:
+    """
+    リクエスト内で書き込み (flush・DML) を行った場合、レスポンスの送信前に 最終書き込み時刻を cookie・ヘッダに設定する
+    セッションの commit は依存関係の終了処理 (レスポンス送信後) のため、送信前に実行した書き込みのみ対象となる
+    """
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or settings.DB_REPLICA_STICKY_SECONDS <= 0:
+            await self.app(scope, receive, send)
+            return
+
+        writes: dict[str, float] = {}
+        token = _request_writes.set(writes)
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start" and "last_write_at" in writes:
+                value  = str(int(writes["last_write_at"] * 1000))
+                cookie = (
+                    f"{LAST_WRITE_COOKIE}={value}; Max-Age={settings.DB_REPLICA_STICKY_SECONDS}; "
+                    "Path=/; HttpOnly; SameSite=Lax"
+                )
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (b"set-cookie", cookie.encode("latin-1")),
+                    (LAST_WRITE_HEADER.encode(), value.encode("latin-1")),
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _request_writes.reset(token)
+
+# DB接続設定を定義. エンジンは初回使用時に生成する
+@lru_cache
+def get_engine() -> Engine:
+    """
+    通常エンジンを生成する
+    同期処理 (get_db, drop_all_tables) を使用する場合のみ生成し、mysqlclient を import する
+    """
+    engine = create_engine(
+        settings.get_database_url(),
+        connect_args={"auth_plugin": "mysql_native_password"},
+        echo=False,
+        future=True,
+        **get_pool_options("primary_sync"),
+    )
+    setup_pool_events(engine, "primary_sync")
+    return engine
+
+@lru_cache
+def get_session_factory() -> sessionmaker:
+    return sessionmaker(
+        autocommit=False,
+        autoflush=False,
+        bind=get_engine()
+    )
+
+@lru_cache
+def get_async_engine() -> AsyncEngine:
+    """
+    非同期エンジン・リードレプリカのエンジンを生成する
+    コールドスタート時の import を軽くするため、初回のセッション生成時に生成する
+    """
+    async_engine = create_async_engine(
+        settings.get_database_url(is_async=True),
+        connect_args={"auth_plugin": "mysql_native_password"},
+        echo=False,
+        future=True,
+        **get_pool_options("primary", is_async=True),
+    )
+    setup_pool_events(async_engine.sync_engine, "primary")
+    for i, url in enumerate(settings.DB_REPLICA_URLS):
+        replica_router.engines.append(_create_read_only_engine(url, f"replica{i}"))
+    return async_engine
+
+def _create_read_only_engine(url: str, name: str) -> AsyncEngine:
+    """
+    参照専用の非同期エンジンを生成する
+    autocommit で実行し、rollback も省略するため BEGIN/COMMIT/ROLLBACK の往復が発生しない
+    接続毎に 1度だけ READ ONLY を設定し、誤った書き込みは MySQL 側でもエラーとする
+    """
+    read_only_engine = create_async_engine(
+        url,
+        connect_args={"auth_plugin": "mysql_native_password"},
+        echo=False,
+        future=True,
+        isolation_level="AUTOCOMMIT",
+        skip_autocommit_rollback=True,
+        **get_pool_options(name, is_async=True),
+    )
+    setup_pool_events(read_only_engine.sync_engine, name)
+
+    @event.listens_for(read_only_engine.sync_engine, "connect")
+    def _set_read_only(dbapi_connection: Any, connection_record: Any) -> None:
+        cursor = dbapi_connection.cursor()
+        cursor.execute("SET SESSION TRANSACTION READ ONLY")
+        cursor.close()
+
+    return read_only_engine
+
+@lru_cache
+def get_read_only_engine() -> AsyncEngine:
+    """プライマリの参照専用エンジン. レプリカ未設定時・書き込み直後の参照で使用する"""
+    return _create_read_only_engine(settings.get_database_url(is_async=True), "primary_read_only")
+
+@lru_cache
+def get_async_session_factory() -> sessionmaker:
+    return sessionmaker(
+        autocommit=False,
+        autoflush=False,
+        bind=get_async_engine(),
+        class_=AsyncSession,
+        sync_session_class=RoutingSession,
+    )
+
+_LAZY_ATTRIBUTES = {
+    "engine": get_engine,
+    "session_factory": get_session_factory,
+    "async_engine": get_async_engine,
+    "async_session_factory": get_async_session_factory,
+}
+
+def __getattr__(name: str) -> Any:
+    """engine, async_session_factory などは 初回参照時に生成する"""
+    if name in _LAZY_ATTRIBUTES:
+        return _LAZY_ATTRIBUTES[name]()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def get_db() -> Generator[Session, None, None]:
+    """
+    通常DBセッションを生成し動作させる
+    endpointからアクセス時に、Dependで呼び出しdbセッションを生成する
+    エラーがなければ、commitする
+    エラー時はrollbackし、いずれの場合も最終的にcloseする.
+    """
+    db = None
+    try:
+        db = get_session_factory()()
+        yield db
+        db.commit()
+    except Exception:
+        if db:
+            db.rollback()
+    finally:
+        if db:
+            db.close()
+
+def _is_sticky(request: Request) -> bool:
+    """
+    クライアントが返却した最終書き込み時刻 (cookie または ヘッダ) が DB_REPLICA_STICKY_SECONDS 以内の場合 True
+    サーバ間の時刻のずれを考慮し 未来の時刻も期限内とする (不正な値で常にプライマリを使用させないよう期限で制限する)
+    """
+    value = request.cookies.get(LAST_WRITE_COOKIE) or request.headers.get(LAST_WRITE_HEADER)
+    try:
+        elapsed = time.time() - int(value) / 1000 # type: ignore[arg-type]
+    except (TypeError, ValueError):
+        return False
+    return abs(elapsed) < settings.DB_REPLICA_STICKY_SECONDS
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """非同期DBセッションを生成し動作させる"""
+    async with get_async_session_factory()() as db:
+        try:
+            yield db
+            await db.commit()
+        except Exception:
+            await db.rollback()
+        finally:
+            await db.close()
+
+async def get_read_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """
+    参照用の非同期DBセッションを生成し動作させる
+    SELECT はリードレプリカで実行する. 直前に書き込みを行ったクライアント (ReadYourWritesMiddleware の cookie・ヘッダ) はプライマリで実行する
+    autocommit + READ ONLY の接続を使用するため commit は行わない
+    接続は最初の SQL 実行時に取得し、DB を使用しない場合は接続しない
+    """
+    async with get_async_session_factory()() as db:
+        db.info["read_only"]   = True
+        db.info["use_replica"] = not _is_sticky(request)
+        yield db
+
+def drop_all_tables() -> None:
+    """全てのテーブルおよび型、Roleなどを削除して、初期状態に戻す(開発環境専用)"""
+    logger.info("start: drop_all_tables")
+    if settings.ENV != "local":
+        # ローカル環境以外は非動作
+        logger.info("drop_all_table() is ENV local only.")
+        return
+
+    metadata = MetaData()
+    engine   = get_engine()
+    metadata.reflect(bind=engine) # 通常エンジンと紐づける
+
+    with engine.connect() as connect:
+        # 外部キー制約を無効にして、データを無制限に削除できるようにする
+        connect.execute("SET FOREIGN_KEY_CHECKS = 0")
+         # 全テーブル削除
+        for table in metadata.tables:
+            connect.execute(text(f"DROP TABLE {table} CASCADE"))
+        # 外部キー制約を有効化
+        connect.execute("SET FOREIGN_KEY_CHECKS = 1")
+    logger.info("end: drop_all_tables")
@@ -0,0 +1,141 @@
+import bisect
+import threading
+import time
+from typing import Any
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DisconnectionError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
+from app.core.config import settings
+from app.core.logger import get_logger
+logger = get_logger(__name__)
+
+# checkout 待機時間のヒストグラムの区切り(秒)
+CHECKOUT_WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+
+class PoolMetrics:
+    """コネクションプールの統計情報 (checkout 待機時間・接続の生成/破棄数 など)"""
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.checkouts        = 0
+            self.connects         = 0
+            self.closes           = 0
+            self.invalidations    = 0
+            self.pings            = 0
+            self.ping_failures    = 0
+            self.wait_seconds_sum = 0.0
+            self.wait_seconds_max = 0.0
+            self.wait_buckets     = [0] * (len(CHECKOUT_WAIT_BUCKETS) + 1)
+
+    def observe_wait(self, seconds: float) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.wait_seconds_sum += seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+            self.wait_buckets[bisect.bisect_left(CHECKOUT_WAIT_BUCKETS, seconds)] += 1
+
+    def incr(self, name: str) -> None:
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def stats(self, pool: Pool) -> dict[str, Any]:
+        with self._lock:
+            # prometheus と同様に 各区切り以下の累計件数とする
+            histogram, total = {}, 0
+            for le, count in zip([*map(str, CHECKOUT_WAIT_BUCKETS), "+Inf"], self.wait_buckets):
+                total += count
+                histogram[le] = total
+            return {
+                "size": pool.size() if isinstance(pool, QueuePool) else None,
+                "checked_in": pool.checkedin() if isinstance(pool, QueuePool) else None,
+                "checked_out": pool.checkedout() if isinstance(pool, QueuePool) else None,
+                "overflow": pool.overflow() if isinstance(pool, QueuePool) else None,
+                "checkouts": self.checkouts,
+                "connects": self.connects,
+                "closes": self.closes,
+                "invalidations": self.invalidations,
+                "pings": self.pings,
+                "ping_failures": self.ping_failures,
+                "checkout_wait_seconds_sum": self.wait_seconds_sum,
+                "checkout_wait_seconds_max": self.wait_seconds_max,
+                "checkout_wait_seconds_histogram": histogram,
+            }
+
+# pool の logging_name 毎の統計情報. dispose で pool が再生成されても引き継ぐ
+pool_metrics: dict[str, PoolMetrics] = {}
+_engines: dict[str, Engine] = {}
+
+class _TimedPoolMixin:
+    """プールからの接続取得(空き待ち・新規接続を含む)に掛かった時間を記録する"""
+    def _do_get(self) -> Any:
+        start = time.perf_counter()
+        try:
+            return super()._do_get() # type: ignore[misc]
+        finally:
+            pool_metrics[self.logging_name].observe_wait(time.perf_counter() - start) # type: ignore[attr-defined]
+
+class TimedQueuePool(_TimedPoolMixin, QueuePool):
+    pass
+
+class TimedAsyncAdaptedQueuePool(_TimedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+def get_pool_options(name: str, is_async: bool = False) -> dict[str, Any]:
+    """Settings から create_engine / create_async_engine に渡すプール設定を生成する"""
+    return {
+        "poolclass": TimedAsyncAdaptedQueuePool if is_async else TimedQueuePool,
+        "pool_logging_name": name,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_POOL_MAX_OVERFLOW,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+        "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+        # pre-ping は 一定時間以上使用されていない接続のみ setup_pool_events で実行する
+        "pool_pre_ping": False,
+    }
+
+def setup_pool_events(engine: Engine, name: str) -> None:
+    """
+    統計情報の収集と 一定時間以上 idle だった接続のみ pre-ping するイベントを登録する
+    非同期エンジンの場合は sync_engine を指定する
+    """
+    metrics = pool_metrics.setdefault(name, PoolMetrics())
+    _engines[name] = engine
+    idle_seconds = settings.DB_POOL_PRE_PING_IDLE_SECONDS
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection: Any, connection_record: Any) -> None:
+        metrics.incr("connects")
+
+    @event.listens_for(engine, "close")
+    def _on_close(dbapi_connection: Any, connection_record: Any) -> None:
+        metrics.incr("closes")
+
+    @event.listens_for(engine, "invalidate")
+    def _on_invalidate(dbapi_connection: Any, connection_record: Any, exception: Any) -> None:
+        metrics.incr("invalidations")
+
+    @event.listens_for(engine, "checkin")
+    def _on_checkin(dbapi_connection: Any, connection_record: Any) -> None:
+        connection_record.info["last_checkin"] = time.monotonic()
+
+    @event.listens_for(engine, "checkout")
+    def _on_checkout(dbapi_connection: Any, connection_record: Any, connection_proxy: Any) -> None:
+        last_checkin = connection_record.info.get("last_checkin")
+        if idle_seconds < 0 or last_checkin is None or time.monotonic() - last_checkin < idle_seconds:
+            return
+        metrics.incr("pings")
+        try:
+            engine.dialect.do_ping(dbapi_connection)
+        except Exception as e:
+            metrics.incr("ping_failures")
+            logger.warning(f"pool pre-ping failed. pool={name} detail={e}")
+            # DisconnectionError を送出すると プールが接続を破棄して 新しい接続で再試行する
+            raise DisconnectionError() from e
+
+def get_pool_stats() -> dict[str, dict[str, Any]]:
+    """エンジン毎のプール統計情報を返却する"""
+    return {name: metrics.stats(_engines[name].pool) for name, metrics in pool_metrics.items()}
@@ -0,0 +1,25 @@
+import hashlib
+from typing import Any
+from fastapi import Request, Response, status
+
+def make_etag(*parts: Any) -> str:
+    """parts (id・updated_at・件数 等) から strong ETag を生成する"""
+    raw = "|".join("" if part is None else str(part) for part in parts)
+    return f'"{hashlib.sha1(raw.encode()).hexdigest()}"'
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    """
+    If-None-Match が etag に一致する場合 True (304 を返却する)
+    If-None-Match は弱い比較のため W/ は無視する
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return etag.removeprefix("W/") in tags
+
+def not_modified_response(etag: str) -> Response:
+    """body を含まない 304 を返却する"""
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
\ No newline at end of file
@@ -0,0 +1,50 @@
+import csv
+import datetime
+import io
+import json
+from collections.abc import AsyncIterator
+from typing import Any
+from app.schemas.core import to_camel
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    return str(value)
+
+def _csv_value(value: Any) -> Any:
+    if value is None:
+        return ""
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    return value
+
+async def iter_ndjson(chunks: AsyncIterator[list[Any]]) -> AsyncIterator[str]:
+    """
+    select 結果の chunk を NDJSON (1行1データ) に変換する
+    key はレスポンススキーマと同じ camelCase とする
+    """
+    async for rows in chunks:
+        yield "".join(
+            json.dumps(
+                {to_camel(key): value for key, value in row._mapping.items()},
+                default=_json_default,
+                ensure_ascii=False,
+            ) + "\n"
+            for row in rows
+        )
+
+async def iter_csv(chunks: AsyncIterator[list[Any]], columns: list[str]) -> AsyncIterator[str]:
+    """
+    select 結果の chunk を CSV に変換する
+    データが 0件の場合もヘッダ行は出力する
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([to_camel(column) for column in columns])
+    yield buffer.getvalue()
+
+    async for rows in chunks:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows([_csv_value(value) for value in row] for row in rows)
+        yield buffer.getvalue()
\ No newline at end of file
@@ -0,0 +1,318 @@
+"""
+DB をキューとしたバックグラウンドジョブの実行
+ジョブ種別毎に 実行方式 (async, thread, process)・同時実行数・再試行回数を登録し、worker が DB からジョブを取得して実行する
+worker はアプリのプロセス内 (JOB_WORKER_IN_PROCESS) または 別プロセスで起動する
+
+例)
+    python -m app.core.jobs
+    python -m app.core.jobs --job-types long_process_thread long_process_async
+"""
+import argparse
+import asyncio
+import datetime
+import os
+import signal
+import socket
+import time
+from collections.abc import AsyncGenerator, Callable
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache, partial
+from typing import Any
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from app.core.config import settings
+from app.core.logger import get_logger, setup_logging
+logger = get_logger(__name__)
+
+EXECUTORS = ("async", "thread", "process")
+
+class JobDefinition:
+    """
+    ジョブ種別の定義
+    func は (payload, report_progress) を受け取り、JSON に変換可能な結果を返却する
+    report_progress(0〜100) で進捗を通知する. async の場合は coroutine 関数、process の場合は pickle 可能な関数とする
+    concurrency は worker プロセス毎の同時実行数
+    """
+    def __init__(
+        self,
+        name: str,
+        func: Callable[..., Any],
+        executor: str,
+        concurrency: int,
+        max_attempts: int,
+        backoff_seconds: float,
+    ) -> None:
+        if executor not in EXECUTORS:
+            raise ValueError(f"unknown job executor: {executor}")
+        self.name            = name
+        self.func            = func
+        self.executor        = executor
+        self.concurrency     = concurrency
+        self.max_attempts    = max_attempts
+        self.backoff_seconds = backoff_seconds
+
+    def get_retry_delay(self, attempts: int) -> float:
+        """attempts 回目の失敗後の待機秒数 (指数バックオフ)"""
+        return self.backoff_seconds * 2 ** (attempts - 1)
+
+JOB_DEFINITIONS: dict[str, JobDefinition] = {}
+# ジョブ種別 → (実行間隔秒, payload)
+PERIODIC_JOBS: dict[str, tuple[float, dict[str, Any]]] = {}
+
+def register_job(
+    name: str,
+    executor: str = "async",
+    concurrency: int = 1,
+    max_attempts: int | None = None,
+    backoff_seconds: float | None = None,
+) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """ジョブ種別を登録するデコレータ"""
+    def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
+        JOB_DEFINITIONS[name] = JobDefinition(
+            name,
+            func,
+            executor=executor,
+            concurrency=concurrency,
+            max_attempts=max_attempts or settings.JOB_MAX_ATTEMPTS,
+            backoff_seconds=settings.JOB_RETRY_BACKOFF_SECONDS if backoff_seconds is None else backoff_seconds,
+        )
+        return func
+    return decorator
+
+def register_periodic(name: str, interval_seconds: float, payload: dict[str, Any] | None = None) -> None:
+    """登録済のジョブ種別を interval_seconds 毎に実行する"""
+    if name not in JOB_DEFINITIONS:
+        raise ValueError(f"unknown job type: {name}")
+    PERIODIC_JOBS[name] = (interval_seconds, payload or {})
+
+def get_job_definition(name: str) -> JobDefinition:
+    if name not in JOB_DEFINITIONS:
+        raise ValueError(f"unknown job type: {name}")
+    return JOB_DEFINITIONS[name]
+
+def load_jobs() -> None:
+    """ジョブ種別の定義 (app.jobs) を読み込む"""
+    import app.jobs  # noqa
+
+@lru_cache
+def get_job_engine() -> AsyncEngine:
+    """JOB_DATABASE_URL 指定時のジョブキュー専用エンジン"""
+    return create_async_engine(settings.JOB_DATABASE_URL, echo=False, future=True)
+
+@lru_cache
+def get_job_session_factory() -> sessionmaker:
+    """
+    ジョブキューのセッションを生成する
+    JOB_DATABASE_URL 未指定時は アプリの DB (プライマリ) を使用する
+    """
+    if not settings.JOB_DATABASE_URL:
+        from app.core.database import get_async_session_factory
+        return get_async_session_factory()
+    return sessionmaker(autocommit=False, autoflush=False, bind=get_job_engine(), class_=AsyncSession)
+
+async def init_job_database() -> None:
+    """JOB_DATABASE_URL (SQLite 等) 指定時は jobs テーブルを作成する. アプリの DB は alembic で作成する"""
+    if not settings.JOB_DATABASE_URL:
+        return
+    from app.models import Job
+    async with get_job_engine().begin() as conn:
+        await conn.run_sync(Job.__table__.create, checkfirst=True)
+
+async def get_job_db() -> AsyncGenerator[AsyncSession, None]:
+    """ジョブキューの非同期DBセッションを生成し動作させる"""
+    async with get_job_session_factory()() as db:
+        try:
+            yield db
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            raise
+        finally:
+            await db.close()
+
+async def enqueue_job(
+    db: AsyncSession,
+    job_type: str,
+    payload: dict[str, Any] | None = None,
+    run_at: datetime.datetime | None = None,
+    unique_key: str | None = None,
+) -> Any:
+    """ジョブを登録する. commit は呼び出し元で行う"""
+    from app import crud, schemas
+    definition = get_job_definition(job_type)
+    job_in     = schemas.JobCreate(job_type=job_type, payload=payload, run_at=run_at, unique_key=unique_key)
+    return await crud.job.enqueue(db, job_in, max_attempts=definition.max_attempts)
+
+def _set_progress(store: Any, job_id: str, progress: int) -> None:
+    """report_progress の実体. process の場合 store は Manager の dict"""
+    store[job_id] = max(0, min(100, int(progress)))
+
+class JobWorker:
+    """
+    ジョブ種別毎に 同時実行数の空き分だけ DB からジョブを取得して実行する
+    実行中のジョブの進捗・heartbeat は poll 毎にまとめて DB へ反映する
+    heartbeat が JOB_LOCK_TIMEOUT_SECONDS 途絶えたジョブは 停止した worker のものとみなし再実行する
+    """
+    def __init__(self, job_types: list[str] | None = None, worker_id: str | None = None) -> None:
+        self.definitions = {
+            name: definition for name, definition in JOB_DEFINITIONS.items()
+            if not job_types or name in job_types
+        }
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self._running: dict[str, set[asyncio.Task[None]]] = {name: set() for name in self.definitions}
+        self._progress: dict[str, int] = {}
+        self._next_periodic: dict[str, float] = {}
+        self._thread_executor: ThreadPoolExecutor | None   = None
+        self._process_executor: ProcessPoolExecutor | None = None
+        self._manager: Any          = None
+        self._process_progress: Any = None
+        self._stopped = asyncio.Event()
+
+    def _get_executor(self, executor: str) -> Executor:
+        """thread・process のプールは 該当するジョブの初回実行時に生成する"""
+        if executor == "thread":
+            if self._thread_executor is None:
+                self._thread_executor = ThreadPoolExecutor(settings.JOB_THREAD_WORKERS, thread_name_prefix="job")
+            return self._thread_executor
+        if self._process_executor is None:
+            import multiprocessing
+            self._process_executor = ProcessPoolExecutor(settings.JOB_PROCESS_WORKERS)
+            # 子プロセスからの進捗は Manager の dict 経由で受け取る
+            self._manager          = multiprocessing.Manager()
+            self._process_progress = self._manager.dict()
+        return self._process_executor
+
+    async def _execute(self, definition: JobDefinition, job_id: str, payload: Any, attempts: int, max_attempts: int) -> None:
+        from app import crud
+        from app.crud.job import utcnow
+        loop = asyncio.get_running_loop()
+        try:
+            if definition.executor == "async":
+                result = await definition.func(payload, partial(_set_progress, self._progress, job_id))
+            elif definition.executor == "thread":
+                report = partial(_set_progress, self._progress, job_id)
+                result = await loop.run_in_executor(self._get_executor("thread"), definition.func, payload, report)
+            else:
+                executor = self._get_executor("process")
+                report   = partial(_set_progress, self._process_progress, job_id)
+                result   = await loop.run_in_executor(executor, definition.func, payload, report)
+            async with get_job_session_factory()() as db:
+                await crud.job.complete(db, job_id, self.worker_id, result)
+                await db.commit()
+            logger.info(f"job succeeded. type={definition.name} id={job_id} attempts={attempts}")
+        except Exception as e:
+            retry_at = None
+            if attempts < max_attempts:
+                delay    = definition.get_retry_delay(attempts)
+                retry_at = utcnow() + datetime.timedelta(seconds=delay)
+            logger.warning(f"job failed. type={definition.name} id={job_id} attempts={attempts} retry_at={retry_at} detail={e!r}")
+            async with get_job_session_factory()() as db:
+                await crud.job.fail(db, job_id, self.worker_id, repr(e), retry_at)
+                await db.commit()
+        finally:
+            self._progress.pop(job_id, None)
+            if self._process_progress is not None:
+                self._process_progress.pop(job_id, None)
+
+    def _get_running_progress(self) -> dict[str, int]:
+        """実行中のジョブ id → 進捗. 進捗の通知がないジョブは 0"""
+        progress = {task.get_name(): 0 for running in self._running.values() for task in running}
+        for store in (self._progress, self._process_progress):
+            if store is not None:
+                progress.update({id: value for id, value in store.items() if id in progress})
+        return progress
+
+    async def _enqueue_periodic(self) -> None:
+        """
+        実行時刻となった定期ジョブを登録する
+        unique_key に 実行間隔で区切った時刻を含め、複数の worker が起動していても 1回分のみ登録する
+        """
+        now = time.monotonic()
+        for name, (interval_seconds, payload) in PERIODIC_JOBS.items():
+            if name not in self.definitions or self._next_periodic.get(name, 0.0) > now:
+                continue
+            self._next_periodic[name] = now + interval_seconds
+            slot = int(time.time() // interval_seconds)
+            async with get_job_session_factory()() as db:
+                await enqueue_job(db, name, payload, unique_key=f"periodic:{name}:{slot}")
+                await db.commit()
+
+    async def run_once(self) -> int:
+        """periodic の登録・heartbeat・停止した worker のジョブの回収を行い、空きがあればジョブを取得して実行する"""
+        from app import crud
+        from app.crud.job import utcnow
+        await self._enqueue_periodic()
+        async with get_job_session_factory()() as db:
+            await crud.job.heartbeat(db, self.worker_id, self._get_running_progress())
+            locked_before = utcnow() - datetime.timedelta(seconds=settings.JOB_LOCK_TIMEOUT_SECONDS)
+            await crud.job.requeue_stale(db, locked_before)
+            await db.commit()
+
+        started = 0
+        for name, definition in self.definitions.items():
+            running = self._running[name]
+            free    = definition.concurrency - len(running)
+            if free <= 0:
+                continue
+            async with get_job_session_factory()() as db:
+                jobs = await crud.job.claim(db, name, self.worker_id, free)
+                # commit 後に expire された属性を参照しないよう 先に取り出す
+                claimed = [(job.id, job.payload, job.attempts, job.max_attempts) for job in jobs]
+                await db.commit()
+            for job_id, payload, attempts, max_attempts in claimed:
+                task = asyncio.create_task(
+                    self._execute(definition, job_id, payload, attempts, max_attempts),
+                    name=job_id,
+                )
+                running.add(task)
+                task.add_done_callback(running.discard)
+                started += 1
+        return started
+
+    async def run(self) -> None:
+        """stop() が呼び出されるまで JOB_POLL_INTERVAL_SECONDS 毎にジョブを取得する. 停止時は実行中のジョブの完了を待つ"""
+        await init_job_database()
+        logger.info(f"job worker started. id={self.worker_id} job_types={list(self.definitions)}")
+        while not self._stopped.is_set():
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.error(f"job worker poll failed. detail={e!r}")
+            try:
+                await asyncio.wait_for(self._stopped.wait(), timeout=settings.JOB_POLL_INTERVAL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+
+        tasks = [task for running in self._running.values() for task in running]
+        if tasks:
+            logger.info(f"waiting for running jobs. count={len(tasks)}")
+            await asyncio.gather(*tasks, return_exceptions=True)
+        for executor in (self._thread_executor, self._process_executor):
+            if executor is not None:
+                executor.shutdown(wait=False)
+        if self._manager is not None:
+            self._manager.shutdown()
+        logger.info(f"job worker stopped. id={self.worker_id}")
+
+    def stop(self) -> None:
+        self._stopped.set()
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--job-types", nargs="*", default=None)
+    args = parser.parse_args()
+
+    setup_logging()
+    load_jobs()
+    worker = JobWorker(args.job_types)
+
+    async def run() -> None:
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, worker.stop)
+        await worker.run()
+
+    asyncio.run(run())
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,363 @@
+"""
+形態素解析
+解析器 (SudachiPy / 辞書の最長一致による pure Python 実装) を専用の executor で実行し、結果をテキストの hash 毎にキャッシュする
+辞書は mmap で読み込むため、process の worker を増やしても 辞書分のメモリ(RSS)は worker 間で共有される
+
+simple の辞書は 1行1語の TSV (表層形, 辞書形, 読み, 正規化形, 品詞(,区切り)) を 表層形のバイト順にソートしたもの
+例)
+    python -m app.core.language_analyzer words.tsv dictionary.tsv
+"""
+import argparse
+import asyncio
+import hashlib
+import math
+import mmap
+import threading
+import time
+import unicodedata
+from abc import ABC, abstractmethod
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from app import schemas
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.logger import get_logger
+from app.exceptions.core import APIException
+from app.exceptions.error_message import ErrorMessage
+logger = get_logger(__name__)
+
+# (表層形, 辞書形, 読み, 正規化形, 品詞, 開始文字番号, 終了文字番号)
+Token = tuple[str, str, str, str, tuple[str, ...], int, int]
+
+UNKNOWN_POS = ("名詞", "普通名詞", "一般", "*", "*", "*")
+NUMERAL_POS = ("名詞", "数詞", "*", "*", "*", "*")
+SYMBOL_POS  = ("補助記号", "一般", "*", "*", "*", "*")
+SPACE_POS   = ("空白", "*", "*", "*", "*", "*")
+
+class AnalyzerBackend(ABC):
+    """形態素解析の基本クラス. 結果は pickle しやすいよう tuple で返却する"""
+    name = ""
+
+    @abstractmethod
+    def tokenize(self, text: str) -> list[Token]:
+        """text を形態素に分割する"""
+
+class SudachiAnalyzerBackend(AnalyzerBackend):
+    """
+    SudachiPy (分割単位 C) による解析
+    システム辞書は Sudachi が mmap で読み込むため、同じ辞書ファイルを使用する worker 間で共有される
+    """
+    name = "sudachi"
+
+    def __init__(self, dictionary: str | None = None) -> None:
+        from sudachipy import Dictionary, SplitMode
+        dictionary      = settings.LANGUAGE_ANALYZER_SUDACHI_DICTIONARY if dictionary is None else dictionary
+        self._tokenizer = Dictionary(dict=dictionary).create(SplitMode.C)
+
+    def tokenize(self, text: str) -> list[Token]:
+        return [
+            (
+                m.surface(),
+                m.dictionary_form(),
+                m.reading_form(),
+                m.normalized_form(),
+                tuple(m.part_of_speech()),
+                m.begin(),
+                m.end(),
+            )
+            for m in self._tokenizer.tokenize(text)
+        ]
+
+class MmapDictionary:
+    """
+    表層形のバイト順にソートした TSV を mmap で開き、二分探索で引く辞書
+    ファイルの内容はページキャッシュに載るのみで、プロセス毎にコピーされない
+    """
+    def __init__(self, path: str) -> None:
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.max_length = self._get_max_length()
+
+    def _get_max_length(self) -> int:
+        """最長の表層形の文字数. 最長一致の探索範囲に使用する"""
+        max_length = 0
+        for line in iter(self._mmap.readline, b""):
+            max_length = max(max_length, len(line.split(b"\t", 1)[0].decode("utf-8")))
+        return max_length
+
+    def _next_line_start(self, offset: int) -> int:
+        """offset 以降で最初に始まる行の位置"""
+        if offset == 0:
+            return 0
+        end = self._mmap.find(b"\n", offset - 1)
+        return len(self._mmap) if end < 0 else end + 1
+
+    def _read_line(self, start: int) -> bytes:
+        end = self._mmap.find(b"\n", start)
+        return self._mmap[start:len(self._mmap) if end < 0 else end]
+
+    def lookup(self, surface: str) -> tuple[str, ...] | None:
+        """表層形が一致する項目 (表層形, 辞書形, 読み, 正規化形, 品詞) を返却する"""
+        key       = surface.encode("utf-8")
+        low, high = 0, len(self._mmap)
+        # 表層形が key 以上となる最初の行を探す
+        while low < high:
+            mid   = (low + high) // 2
+            start = self._next_line_start(mid)
+            if start < len(self._mmap) and self._read_line(start).split(b"\t", 1)[0] < key:
+                low = mid + 1
+            else:
+                high = mid
+        start = self._next_line_start(low)
+        if start >= len(self._mmap):
+            return None
+        line = self._read_line(start)
+        if line.split(b"\t", 1)[0] != key:
+            return None
+        return tuple(line.decode("utf-8").split("\t"))
+
+def _char_type(char: str) -> str:
+    """未知語の区切りに使用する文字種"""
+    if char.isspace():
+        return "space"
+    if char.isdigit():
+        return "digit"
+    if "ぁ" <= char <= "ゟ":
+        return "hiragana"
+    if "ァ" <= char <= "ヿ" or char == "ー":
+        return "katakana"
+    if char.isalpha():
+        # 漢字はまとめると長すぎるため 1文字毎とし、辞書の最長一致に任せる
+        return "kanji" if unicodedata.name(char, "").startswith("CJK") else "alpha"
+    return "symbol"
+
+def _to_katakana(text: str) -> str:
+    return "".join(chr(ord(c) + 0x60) if "ぁ" <= c <= "ゖ" else c for c in text)
+
+class SimpleAnalyzerBackend(AnalyzerBackend):
+    """
+    pure Python の解析 (SudachiPy が使用できない環境用)
+    辞書の最長一致で分割し、辞書にない部分は 文字種の連続で分割する
+    """
+    name = "simple"
+
+    def __init__(self, dictionary_path: str | None = None) -> None:
+        dictionary_path  = settings.LANGUAGE_ANALYZER_DICTIONARY_PATH if dictionary_path is None else dictionary_path
+        self._dictionary = MmapDictionary(dictionary_path) if dictionary_path else None
+
+    def _match(self, text: str, begin: int) -> Token | None:
+        if self._dictionary is None:
+            return None
+        for end in range(min(len(text), begin + self._dictionary.max_length), begin, -1):
+            entry = self._dictionary.lookup(text[begin:end])
+            if entry:
+                surface, dictionary_form, reading, normalized, pos = entry
+                return (surface, dictionary_form, reading, normalized, tuple(pos.split(",")), begin, end)
+        return None
+
+    def _unknown(self, text: str, begin: int) -> Token:
+        char_type = _char_type(text[begin])
+        end       = begin + 1
+        if char_type != "kanji":
+            while end < len(text) and _char_type(text[end]) == char_type:
+                end += 1
+        surface = text[begin:end]
+        pos     = {"space": SPACE_POS, "digit": NUMERAL_POS, "symbol": SYMBOL_POS}.get(char_type, UNKNOWN_POS)
+        reading = _to_katakana(surface) if char_type in ("hiragana", "katakana") else ""
+        return (surface, surface, reading, unicodedata.normalize("NFKC", surface).lower(), pos, begin, end)
+
+    def tokenize(self, text: str) -> list[Token]:
+        tokens: list[Token] = []
+        begin = 0
+        while begin < len(text):
+            token = self._match(text, begin) or self._unknown(text, begin)
+            tokens.append(token)
+            begin = token[6]
+        return tokens
+
+ANALYZER_BACKENDS: dict[str, type[AnalyzerBackend]] = {
+    SudachiAnalyzerBackend.name: SudachiAnalyzerBackend,
+    SimpleAnalyzerBackend.name: SimpleAnalyzerBackend,
+}
+
+def get_analyzer_backend(name: str) -> AnalyzerBackend:
+    """設定値から解析器を生成する. SudachiPy が未インストールの場合は simple を使用する"""
+    if name not in ANALYZER_BACKENDS:
+        raise ValueError(f"unknown analyzer backend: {name}")
+    try:
+        return ANALYZER_BACKENDS[name]()
+    except ImportError as e:
+        logger.warning(f"analyzer backend {name} is not available, fallback to simple. detail={e}")
+        return SimpleAnalyzerBackend()
+
+# worker 毎の解析器. executor の initializer で生成する (Sudachi の tokenizer はスレッド間で共有できないため thread 毎に保持する)
+_worker = threading.local()
+
+def _init_worker(name: str) -> None:
+    _worker.backend = get_analyzer_backend(name)
+
+def _tokenize_many(texts: list[str]) -> list[tuple[list[Token], float]]:
+    """worker 内で実行し テキスト毎に (結果, 処理時間) を返却する. ProcessPool で pickle できるよう module 関数とする"""
+    results = []
+    for text in texts:
+        start  = time.perf_counter()
+        tokens = _worker.backend.tokenize(text)
+        results.append((tokens, time.perf_counter() - start))
+    return results
+
+class LanguageAnalyzer:
+    """
+    形態素解析を専用の executor で実行する
+    batch はキャッシュにないテキストのみ worker 数に分割して並列に解析する
+    実行中 + 待機中のテキストの件数が workers + queue_limit を超える場合は 503 を返却する
+    (batch のテキスト数に関わらず 1件と数えると、大きな batch が並ぶだけで待ち時間が増え続けるため)
+    """
+    def __init__(
+        self,
+        backend: str,
+        executor_type: str,
+        workers: int,
+        queue_limit: int,
+        cache: TTLCache,
+    ) -> None:
+        self.backend         = backend
+        self.executor_type   = executor_type
+        self.workers         = workers
+        self.queue_limit     = queue_limit
+        self.cache           = cache
+        self._executor: Executor | None = None
+        self._pending = 0 # 実行中 + 待機中のテキストの件数
+        self._lock    = threading.Lock()
+        self._stats: dict[str, float] = {"count": 0, "rejected": 0, "tokenize_seconds_total": 0.0}
+
+    def _get_executor(self) -> Executor:
+        """初回実行時に executor を生成し、worker 毎に解析器(辞書)を読み込む"""
+        if self._executor is None:
+            initargs = (self.backend,)
+            if self.executor_type == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker, initargs=initargs)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers,
+                    thread_name_prefix="language-analyzer",
+                    initializer=_init_worker,
+                    initargs=initargs,
+                )
+        return self._executor
+
+    def _get_cache_key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.backend}\0{text}".encode()).hexdigest()
+
+    def _validate(self, texts: list[str]) -> None:
+        if len(texts) > settings.LANGUAGE_ANALYZER_MAX_BATCH_SIZE or \
+                any(len(text) > settings.LANGUAGE_ANALYZER_MAX_TEXT_LENGTH for text in texts):
+            raise APIException(ErrorMessage.ANALYZE_LIMIT_EXCEEDED)
+
+    async def _tokenize(self, texts: list[str]) -> list[tuple[list[Token], float]]:
+        """texts を worker 数に分割して解析する"""
+        with self._lock:
+            if self._pending + len(texts) > self.workers + self.queue_limit:
+                self._stats["rejected"] += 1
+                raise APIException(ErrorMessage.SERVICE_BUSY)
+            self._pending += len(texts)
+
+        try:
+            loop    = asyncio.get_running_loop()
+            size    = math.ceil(len(texts) / self.workers)
+            chunks  = [texts[i:i + size] for i in range(0, len(texts), size)]
+            results = await asyncio.gather(
+                *[loop.run_in_executor(self._get_executor(), _tokenize_many, chunk) for chunk in chunks]
+            )
+            return [result for chunk in results for result in chunk]
+        finally:
+            with self._lock:
+                self._pending -= len(texts)
+
+    async def analyze(self, texts: list[str]) -> list[tuple[list[Token], float]]:
+        """
+        テキスト毎に (解析結果, 処理秒数) を返却する
+        処理秒数は キャッシュにない場合は worker での解析時間、キャッシュにある場合は参照にかかった時間
+        """
+        self._validate(texts)
+        results: list[tuple[list[Token], float] | None] = []
+        misses: dict[str, list[int]] = {}
+        for i, text in enumerate(texts):
+            start  = time.perf_counter()
+            tokens = self.cache.get(self._get_cache_key(text))
+            if tokens is None:
+                results.append(None)
+                misses.setdefault(text, []).append(i) # 同一テキストは1度だけ解析する
+            else:
+                results.append((tokens, time.perf_counter() - start))
+
+        if misses:
+            for text, (tokens, elapsed) in zip(misses, await self._tokenize(list(misses))):
+                if self.cache.ttl > 0:
+                    self.cache.set(self._get_cache_key(text), tokens)
+                for i in misses[text]:
+                    results[i] = (tokens, elapsed)
+                with self._lock:
+                    self._stats["count"] += 1
+                    self._stats["tokenize_seconds_total"] += elapsed
+        return results
+
+    def to_schema(self, text: str, tokens: list[Token], during_time: float) -> schemas.AnalyzedLanguage:
+        """解析結果をスキーマに変換する. LANGUAGE_ANALYZER_EXCLUDED_POS の品詞は excluded_token とする"""
+        included, excluded = [], []
+        for surface, dictionary_form, reading, normalized, pos, begin, end in tokens:
+            # worker で生成した値のため validation を省略する
+            token = schemas.AnalyzedLanguageToken.construct(
+                surface=surface,
+                dictionary_form=dictionary_form,
+                reading_form=reading,
+                normalized_form=normalized,
+                part_of_speech=pos,
+                begin_pos=begin,
+                end_pos=end,
+            )
+            (excluded if pos[0] in settings.LANGUAGE_ANALYZER_EXCLUDED_POS else included).append(token)
+        return schemas.AnalyzedLanguage.construct(
+            raw_text=text,
+            tokens=included,
+            excluded_token=excluded,
+            during_time=during_time,
+        )
+
+    def stats(self) -> dict[str, float]:
+        """解析件数・キャッシュの hit/miss 数などの統計情報を返却する"""
+        with self._lock:
+            return {**self._stats, **self.cache.stats(), "pending": self._pending}
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+language_analyzer = LanguageAnalyzer(
+    backend=settings.LANGUAGE_ANALYZER_BACKEND,
+    executor_type=settings.LANGUAGE_ANALYZER_EXECUTOR,
+    workers=settings.LANGUAGE_ANALYZER_WORKERS,
+    queue_limit=settings.LANGUAGE_ANALYZER_QUEUE_LIMIT,
+    cache=TTLCache(
+        maxsize=settings.LANGUAGE_ANALYZER_CACHE_MAXSIZE,
+        ttl=settings.LANGUAGE_ANALYZER_CACHE_TTL_SECONDS,
+    ),
+)
+
+def build_dictionary(src_path: str, dst_path: str) -> int:
+    """TSV の辞書を 表層形のバイト順にソートして出力し、件数を返却する"""
+    with open(src_path, encoding="utf-8") as f:
+        lines = [line.rstrip("\n") for line in f if line.strip() and not line.startswith("#")]
+    lines.sort(key=lambda line: line.split("\t", 1)[0].encode("utf-8"))
+    with open(dst_path, "w", encoding="utf-8", newline="\n") as f:
+        f.write("\n".join(lines))
+    return len(lines)
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("src")
+    parser.add_argument("dst")
+    args = parser.parse_args()
+    print(f"{build_dictionary(args.src, args.dst)} entries")
+
+if __name__ == "__main__":
+    main()
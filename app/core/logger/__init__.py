@@ -1 +1,2 @@
-from .logger import get_logger, init_gunicorn_uvicorn_logger, init_logger
\ No newline at end of file
+from .logger import get_logger, init_gunicorn_uvicorn_logger, init_logger, setup_logging
+from .pipeline import init_queue_logging, stop_queue_logging
\ No newline at end of file
@@ -1,37 +1,62 @@
-import os
-import yaml
-from logging import Logger, getLogger
-from logging.config import dictConfig
-
-def init_logger(filepath: str) -> None:
-    with open(filepath) as f:
-        config = yaml.safe_load(f)
-        dictConfig(config)
-
-def init_gunicorn_uvicorn_logger(filepath: str) -> None:
-    import logging
-    from fastapi.logger import logger as fastapi_logger
-
-    if "gunicorn" in os.environ.get("SERVER_SOFTWARE", ""):
-        """ gunicornで起動した場合のみ logger を切り替える """
-        init_logger(filepath)
-        gunicorn_logger = logging.getLogger("gunicorn")
-        log_level       = gunicorn_logger.level
-
-        root_logger           = logging.getLogger()
-        gunicorn_error_logger = logging.getLogger("gunicorn.error")
-        uvicorn_access_logger = logging.getLogger("uvicorn.access")
-
-        # Use gunicorn error handlers for root, uvicorn, and fastapi loggers
-        root_logger.handlers = gunicorn_error_logger.handlers
-        uvicorn_access_logger.handlers = gunicorn_error_logger.handlers
-        fastapi_logger.handlers = gunicorn_error_logger.handlers
-
-        # Pass on logging levels for root, uvicorn, and fastapi loggers
-        root_logger.setLevel(log_level)
-        uvicorn_access_logger.setLevel(log_level)
-        fastapi_logger.setLevel(log_level)
-
-def get_logger(name: str) -> Logger:
-    return getLogger(name)
-
+import os
+import yaml
+from logging import Logger, getLogger
+from logging.config import dictConfig
+
+def init_logger(filepath: str) -> None:
+    with open(filepath) as f:
+        config = yaml.safe_load(f)
+        dictConfig(config)
+
+def init_gunicorn_uvicorn_logger(filepath: str) -> None:
+    import logging
+    from fastapi.logger import logger as fastapi_logger
+
+    if "gunicorn" in os.environ.get("SERVER_SOFTWARE", ""):
+        """ gunicornで起動した場合のみ logger を切り替える """
+        init_logger(filepath)
+        gunicorn_logger = logging.getLogger("gunicorn")
+        log_level       = gunicorn_logger.level
+
+        root_logger           = logging.getLogger()
+        gunicorn_error_logger = logging.getLogger("gunicorn.error")
+        uvicorn_access_logger = logging.getLogger("uvicorn.access")
+
+        # Use gunicorn error handlers for root, uvicorn, and fastapi loggers
+        root_logger.handlers = gunicorn_error_logger.handlers
+        uvicorn_access_logger.handlers = gunicorn_error_logger.handlers
+        fastapi_logger.handlers = gunicorn_error_logger.handlers
+
+        # Pass on logging levels for root, uvicorn, and fastapi loggers
+        root_logger.setLevel(log_level)
+        uvicorn_access_logger.setLevel(log_level)
+        fastapi_logger.setLevel(log_level)
+
+def setup_logging() -> None:
+    """
+    設定値からログの出力を初期化する
+    LOG_QUEUE_ENABLED の場合は キュー経由で別スレッドから出力し、logger 毎の件数制限・サンプリングを行う
+    """
+    import logging
+    from app.core.config import settings
+    from app.core.request_context import RequestContextFilter
+    from .pipeline import AccessLogRouteFilter, RateLimitFilter, init_queue_logging
+
+    access_logger = logging.getLogger("uvicorn.access")
+    access_logger.addFilter(AccessLogRouteFilter(settings.LOG_ACCESS_EXCLUDED_PATHS))
+    if not settings.LOG_QUEUE_ENABLED:
+        # アクセスログにクライアントのホスト名を付与する
+        access_logger.addFilter(RequestContextFilter())
+        return
+    init_queue_logging(
+        settings.LOG_LEVEL,
+        json=settings.LOG_FORMAT == "json",
+        filters=[
+            RequestContextFilter(),
+            RateLimitFilter(settings.LOG_RATE_LIMITS, settings.LOG_RATE_LIMIT_BURST, settings.LOG_SAMPLE_RATES),
+        ],
+    )
+
+def get_logger(name: str) -> Logger:
+    return getLogger(name)
+
@@ -0,0 +1,177 @@
+import atexit
+import copy
+import datetime
+import logging
+import queue
+import random
+import sys
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any
+import orjson
+
+# LogRecord の標準の属性. JSON には これ以外 (extra 等) の属性を出力する
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+class LogQueueHandler(QueueHandler):
+    """
+    ログをキューに追加し、フォーマット・出力は QueueListener のスレッドで行う
+    呼び出し元のスレッドでは メッセージの展開と例外の文字列化のみ行う
+    """
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record         = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg     = record.message
+        record.args    = None
+        if record.exc_info:
+            # traceback は frame を参照し続けるため 文字列にして破棄する
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+class JsonFormatter(logging.Formatter):
+    """1行1件の JSON で出力する. request_id・latency_ms など extra の属性も出力する"""
+    def format(self, record: logging.LogRecord) -> str:
+        data: dict[str, Any] = {
+            "time": datetime.datetime.fromtimestamp(record.created, tz=datetime.timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith("_") and value is not None:
+                data[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            data["exc_info"] = record.exc_text
+        return orjson.dumps(data, default=str).decode()
+
+class RateLimitFilter(logging.Filter):
+    """
+    logger 毎 (前方一致) に 1秒あたりの出力件数を制限・サンプリングする. WARNING 以上は常に出力する
+    制限で破棄した件数は 次に出力するログの suppressed に設定する
+    """
+    def __init__(self, rates: dict[str, float], burst: int, sample_rates: dict[str, float]) -> None:
+        super().__init__()
+        self.rates        = rates
+        self.burst        = burst
+        self.sample_rates = sample_rates
+        self._buckets: dict[str, list[float]] = {}  # logger → [残りトークン, 最終更新時刻]
+        self._suppressed: dict[str, int]      = {}
+        self._settings: dict[str, tuple[str | None, str | None]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _match(name: str, keys: dict[str, float]) -> str | None:
+        """name に前方一致する最も長い key"""
+        matched = [key for key in keys if name == key or name.startswith(f"{key}.")]
+        return max(matched, key=len) if matched else None
+
+    def _get_settings(self, name: str) -> tuple[str | None, str | None]:
+        if name not in self._settings:
+            self._settings[name] = (self._match(name, self.rates), self._match(name, self.sample_rates))
+        return self._settings[name]
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        rate_key, sample_key = self._get_settings(record.name)
+        if sample_key is not None and random.random() >= self.sample_rates[sample_key]:
+            return False
+        if rate_key is None:
+            return True
+
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.setdefault(rate_key, [float(self.burst), now])
+            bucket[0] = min(float(self.burst), bucket[0] + (now - bucket[1]) * self.rates[rate_key])
+            bucket[1] = now
+            if bucket[0] < 1.0:
+                self._suppressed[rate_key] = self._suppressed.get(rate_key, 0) + 1
+                return False
+            bucket[0] -= 1.0
+            suppressed = self._suppressed.pop(rate_key, 0)
+        if suppressed:
+            record.suppressed = suppressed
+        return True
+
+class AccessLogRouteFilter(logging.Filter):
+    """
+    uvicorn のアクセスログのうち excluded_paths (前方一致) の path を出力しない
+    メッセージをフォーマットせず、args (client_addr, method, path, http_version, status_code) から判定する
+    """
+    def __init__(self, excluded_paths: list[str]) -> None:
+        super().__init__()
+        self.excluded_paths = tuple(excluded_paths)
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        args = record.args
+        if not isinstance(args, tuple) or len(args) != 5:
+            return True
+        path = str(args[2]).split("?", 1)[0]
+        if path.startswith(self.excluded_paths):
+            return False
+        record.http_method = args[1]
+        record.path        = path
+        record.status_code = args[4]
+        return True
+
+_listener: QueueListener | None = None
+_queue_loggers: list[logging.Logger] = []
+
+def init_queue_logging(
+    level: str,
+    json: bool,
+    filters: list[logging.Filter],
+    logger_names: tuple[str, ...] = ("", "uvicorn.access", "uvicorn.error"),
+) -> QueueListener:
+    """
+    logger_names の handler を LogQueueHandler に置き換え、標準出力への出力を QueueListener のスレッドで行う
+    filters は 呼び出し元のスレッドで実行する (request_context 等の contextvar を参照できる)
+    """
+    global _listener
+    if _listener is not None:
+        return _listener
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(
+        JsonFormatter() if json else logging.Formatter("%(asctime)s %(levelname)s [%(name)s] %(message)s")
+    )
+    log_queue: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+    queue_handler = LogQueueHandler(log_queue)
+    for log_filter in filters:
+        queue_handler.addFilter(log_filter)
+
+    for name in logger_names:
+        logger = logging.getLogger(name)
+        logger.handlers = [queue_handler]
+        logger.setLevel(level)
+        # root と重複して出力しないよう uvicorn 等は伝播させない
+        logger.propagate = name == ""
+        _queue_loggers.append(logger)
+
+    _listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_queue_logging)
+    return _listener
+
+def stop_queue_logging() -> None:
+    """
+    キューに残ったログを出力して listener を停止する
+    停止後のログが破棄されないよう logger の handler を LogQueueHandler から 同じ filter・出力先の handler に戻す
+    """
+    global _listener
+    if _listener is None:
+        return
+    listener, _listener = _listener, None
+    listener.stop()
+    for logger in _queue_loggers:
+        for handler in [h for h in logger.handlers if isinstance(h, LogQueueHandler)]:
+            logger.removeHandler(handler)
+            for stream_handler in listener.handlers:
+                for log_filter in handler.filters:
+                    stream_handler.addFilter(log_filter)
+                logger.addHandler(stream_handler)
+    _queue_loggers.clear()
@@ -0,0 +1,234 @@
+"""
+リクエスト・DB クエリの統計情報 (ワーカープロセス毎の値)
+route 毎のレイテンシ・ステータス毎の件数・実行中の件数と、リクエスト毎のクエリ数・DB 時間を記録し、Prometheus のテキスト形式で出力する
+"""
+import bisect
+import threading
+import time
+from collections.abc import Iterable
+from contextvars import ContextVar
+from typing import Any
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# ヒストグラムの区切り
+LATENCY_BUCKETS     = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DB_SECONDS_BUCKETS  = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+UNMATCHED_ROUTE     = "<unmatched>"
+
+class Histogram:
+    """区切り毎の件数・合計・件数を保持する. 出力時に prometheus と同様の 各区切り以下の累計件数とする"""
+    def __init__(self, buckets: tuple[float, ...]) -> None:
+        self.buckets = buckets
+        self.counts  = [0] * (len(buckets) + 1)
+        self.sum     = 0.0
+        self.count   = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum   += value
+        self.count += 1
+
+    def cumulative(self) -> list[tuple[str, int]]:
+        result, total = [], 0
+        for le, count in zip([*map(str, self.buckets), "+Inf"], self.counts):
+            total += count
+            result.append((le, total))
+        return result
+
+# リクエスト毎の [クエリ数, DB 時間]. sync の endpoint (threadpool)・AsyncSession (greenlet) にも引き継がれる
+_request_db: ContextVar[list[Any] | None] = ContextVar("request_db", default=None)
+
+class RequestMetrics:
+    """
+    route 毎のリクエスト・DB の統計情報
+    install() するまで クエリの計測イベントを登録しない (無効時のオーバーヘッドはない)
+    """
+    def __init__(self) -> None:
+        self._lock     = threading.Lock()
+        self.installed = False
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.in_flight = 0
+            self.requests: dict[tuple[str, str, int], int]         = {}
+            self.latency: dict[tuple[str, str], Histogram]         = {}
+            self.db_queries: dict[tuple[str, str], Histogram]      = {}
+            self.db_seconds: dict[tuple[str, str], Histogram]      = {}
+            self.engine_queries: dict[str, list[float]]            = {} # engine → [件数, 秒数]
+
+    def install(self) -> None:
+        """同期・非同期 (sync_engine)・レプリカ等 全てのエンジンのクエリを記録する"""
+        if not self.installed:
+            event.listen(Engine, "before_cursor_execute", self._before_cursor_execute)
+            event.listen(Engine, "after_cursor_execute", self._after_cursor_execute)
+            self.installed = True
+
+    def uninstall(self) -> None:
+        if self.installed:
+            event.remove(Engine, "before_cursor_execute", self._before_cursor_execute)
+            event.remove(Engine, "after_cursor_execute", self._after_cursor_execute)
+            self.installed = False
+
+    def _before_cursor_execute(self, conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool) -> None:
+        if context is not None:
+            context._metrics_query_start = time.perf_counter()
+
+    def _after_cursor_execute(self, conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool) -> None:
+        start = getattr(context, "_metrics_query_start", None)
+        if start is None:
+            return
+        seconds = time.perf_counter() - start
+        self.observe_query(conn.engine.pool.logging_name or "default", seconds)
+        current = _request_db.get()
+        if current is not None:
+            current[0] += 1
+            current[1] += seconds
+
+    def start(self) -> None:
+        with self._lock:
+            self.in_flight += 1
+
+    def observe(self, method: str, route: str, status: int, seconds: float, queries: int, db_seconds: float) -> None:
+        key = (method, route)
+        with self._lock:
+            self.in_flight -= 1
+            self.requests[(method, route, status)] = self.requests.get((method, route, status), 0) + 1
+            if key not in self.latency:
+                self.latency[key]    = Histogram(LATENCY_BUCKETS)
+                self.db_queries[key] = Histogram(QUERY_COUNT_BUCKETS)
+                self.db_seconds[key] = Histogram(DB_SECONDS_BUCKETS)
+            self.latency[key].observe(seconds)
+            self.db_queries[key].observe(queries)
+            self.db_seconds[key].observe(db_seconds)
+
+    def observe_query(self, engine: str, seconds: float) -> None:
+        with self._lock:
+            totals = self.engine_queries.setdefault(engine, [0, 0.0])
+            totals[0] += 1
+            totals[1] += seconds
+
+request_metrics = RequestMetrics()
+
+def get_request_db_stats() -> tuple[int, float] | None:
+    """実行中のリクエストの (クエリ数, DB 時間). リクエスト外では None"""
+    current = _request_db.get()
+    return None if current is None else (current[0], current[1])
+
+class MetricsMiddleware:
+    """
+    リクエスト毎のレイテンシ・ステータス・クエリ数・DB 時間を route (path のテンプレート) 毎に記録する
+    route は ルーティング後に scope に設定される endpoint から求め、path の値 (id 等) で系列が増えないようにする
+    """
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        self._routes: dict[Any, str] = {}
+
+    def _get_route(self, scope: Scope) -> str:
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return UNMATCHED_ROUTE
+        if endpoint not in self._routes:
+            # 初回 (route の追加後を含む) のみ app の route 一覧から path を求める
+            for route in getattr(scope.get("app"), "routes", []):
+                if getattr(route, "endpoint", None) is not None:
+                    self._routes.setdefault(route.endpoint, route.path)
+        return self._routes.get(endpoint, UNMATCHED_ROUTE)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start  = time.perf_counter()
+        status = 500
+        db     = [0, 0.0]
+        token  = _request_db.set(db)
+        request_metrics.start()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _request_db.reset(token)
+            request_metrics.observe(
+                scope["method"], self._get_route(scope), status, time.perf_counter() - start, db[0], db[1],
+            )
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _labels(labels: dict[str, Any]) -> str:
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}" if labels else ""
+
+def _render_histogram(lines: list[str], name: str, labels: dict[str, Any], histogram: Histogram) -> None:
+    for le, count in histogram.cumulative():
+        lines.append(f"{name}_bucket{_labels({**labels, 'le': le})} {count}")
+    lines.append(f"{name}_sum{_labels(labels)} {histogram.sum}")
+    lines.append(f"{name}_count{_labels(labels)} {histogram.count}")
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+def _render_stats(lines: list[str], prefix: str, label: str, stats: dict[str, dict[str, Any]]) -> None:
+    """
+    {label の値: {項目: 値}} を 項目毎の gauge として出力する
+    *_histogram ({le: 累計件数}) は *_sum と合わせて histogram として出力し、それ以外の数値以外の値は出力しない
+    """
+    keys = sorted({key for values in stats.values() for key, value in values.items() if _is_number(value) or key.endswith("_histogram")})
+    for key in keys:
+        if key.endswith("_histogram"):
+            name = f"{prefix}_{key.removesuffix('_histogram')}"
+            lines.append(f"# TYPE {name} histogram")
+            for label_value, values in stats.items():
+                buckets = values.get(key) or {}
+                labels  = {label: label_value}
+                for le, count in buckets.items():
+                    lines.append(f"{name}_bucket{_labels({**labels, 'le': le})} {count}")
+                lines.append(f"{name}_sum{_labels(labels)} {values.get(key.replace('_histogram', '_sum'), 0)}")
+                lines.append(f"{name}_count{_labels(labels)} {list(buckets.values())[-1] if buckets else 0}")
+            continue
+        lines.append(f"# TYPE {prefix}_{key} gauge")
+        for label_value, values in stats.items():
+            if _is_number(values.get(key)):
+                lines.append(f"{prefix}_{key}{_labels({label: label_value})} {values[key]}")
+
+def render_metrics(groups: Iterable[tuple[str, str, dict[str, dict[str, Any]]]] = ()) -> str:
+    """
+    統計情報を Prometheus のテキスト形式で出力する
+    groups は (metric 名の prefix, label 名, {label の値: stats() の結果}) で、プール・キャッシュ等の値を出力する
+    """
+    m     = request_metrics
+    lines = []
+    with m._lock:
+        lines.append("# TYPE http_requests_in_flight gauge")
+        lines.append(f"http_requests_in_flight {m.in_flight}")
+        lines.append("# TYPE http_requests_total counter")
+        for (method, route, status), count in sorted(m.requests.items()):
+            lines.append(f"http_requests_total{_labels({'method': method, 'route': route, 'status': status})} {count}")
+        for name, histograms in (
+            ("http_request_duration_seconds", m.latency),
+            ("http_request_db_queries", m.db_queries),
+            ("http_request_db_seconds", m.db_seconds),
+        ):
+            lines.append(f"# TYPE {name} histogram")
+            for (method, route), histogram in sorted(histograms.items()):
+                _render_histogram(lines, name, {"method": method, "route": route}, histogram)
+        lines.append("# TYPE db_queries_total counter")
+        for engine, (count, _) in sorted(m.engine_queries.items()):
+            lines.append(f"db_queries_total{_labels({'engine': engine})} {count}")
+        lines.append("# TYPE db_query_seconds_total counter")
+        for engine, (_, seconds) in sorted(m.engine_queries.items()):
+            lines.append(f"db_query_seconds_total{_labels({'engine': engine})} {seconds}")
+
+    for prefix, label, stats in groups:
+        _render_stats(lines, prefix, label, stats)
+    return "\n".join(lines) + "\n"
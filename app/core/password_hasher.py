@@ -0,0 +1,119 @@
+import asyncio
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any
+from passlib.context import CryptContext
+from app.exceptions.core import APIException
+from app.exceptions.error_message import ErrorMessage
+from .config import settings
+
+def create_crypt_context() -> CryptContext:
+    """
+    設定から CryptContext を生成する
+    先頭の scheme でハッシュ化し、それ以外の scheme や cost が異なるハッシュは deprecated として扱う
+    """
+    rounds = {
+        f"{scheme}__rounds": cost
+        for scheme, cost in settings.PASSWORD_HASH_ROUNDS.items()
+        if scheme in settings.PASSWORD_HASH_SCHEMES
+    }
+    return CryptContext(schemes=settings.PASSWORD_HASH_SCHEMES, deprecated="auto", **rounds)
+
+pwd_context = create_crypt_context()
+
+def _timed(fn: Callable[..., Any], *args: Any) -> tuple[Any, float]:
+    """worker 内で実行し (結果, 処理時間) を返却する. ProcessPool で pickle できるよう module 関数とする"""
+    start = time.perf_counter()
+    return fn(*args), time.perf_counter() - start
+
+def _hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+def _verify_and_update(plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+class PasswordHasher:
+    """
+    パスワードのハッシュ化・検証を専用の executor で実行する
+    bcrypt はリクエスト毎に数十ms CPU を占有するため、イベントループ外で実行する
+    実行中 + 待機中の件数が workers + queue_limit を超える場合は 503 を返却する
+    """
+    def __init__(self, executor_type: str, workers: int, queue_limit: int) -> None:
+        self.executor_type = executor_type
+        self.workers       = workers
+        self.queue_limit   = queue_limit
+        self._executor: Executor | None = None
+        self._pending = 0
+        self._lock    = threading.Lock()
+        self._stats: dict[str, float] = {
+            "count": 0,
+            "rejected": 0,
+            "wait_seconds_total": 0.0,
+            "wait_seconds_max": 0.0,
+            "hash_seconds_total": 0.0,
+            "hash_seconds_max": 0.0,
+        }
+
+    def _get_executor(self) -> Executor:
+        """初回実行時に executor を生成する"""
+        if self._executor is None:
+            if self.executor_type == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password-hasher")
+        return self._executor
+
+    def _record(self, wait: float, elapsed: float) -> None:
+        with self._lock:
+            self._stats["count"] += 1
+            self._stats["wait_seconds_total"] += wait
+            self._stats["wait_seconds_max"] = max(self._stats["wait_seconds_max"], wait)
+            self._stats["hash_seconds_total"] += elapsed
+            self._stats["hash_seconds_max"] = max(self._stats["hash_seconds_max"], elapsed)
+
+    async def _run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        with self._lock:
+            if self._pending >= self.workers + self.queue_limit:
+                self._stats["rejected"] += 1
+                raise APIException(ErrorMessage.SERVICE_BUSY)
+            self._pending += 1
+
+        try:
+            start = time.perf_counter()
+            loop  = asyncio.get_running_loop()
+            result, elapsed = await loop.run_in_executor(self._get_executor(), _timed, fn, *args)
+            # 待機時間 = 全体の所要時間 - ハッシュ処理時間
+            self._record(max(time.perf_counter() - start - elapsed, 0.0), elapsed)
+            return result
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    async def hash(self, password: str) -> str:
+        """パスワードをハッシュ化して返却する"""
+        return await self._run(_hash, password)
+
+    async def verify_and_update(self, plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+        """
+        パスワードを検証する
+        ハッシュが deprecated (scheme や cost が現在の設定と異なる) の場合は 再ハッシュした値も返却する
+        """
+        return await self._run(_verify_and_update, plain_password, hashed_password)
+
+    def stats(self) -> dict[str, float]:
+        """queue待機時間・ハッシュ処理時間などの統計情報を返却する"""
+        with self._lock:
+            return {**self._stats, "pending": self._pending}
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+password_hasher = PasswordHasher(
+    executor_type=settings.PASSWORD_HASH_EXECUTOR,
+    workers=settings.PASSWORD_HASH_WORKERS,
+    queue_limit=settings.PASSWORD_HASH_QUEUE_LIMIT,
+)
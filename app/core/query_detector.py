@@ -0,0 +1,190 @@
+"""
+スロークエリ・N+1 の検出 (opt-in)
+閾値以上の時間がかかったクエリを バインドパラメータと合わせてログに出力し、
+1リクエスト内で 正規化した同一のクエリが閾値を超えて実行された場合に N+1 の疑いとしてログに出力する
+テストでは query_budget でクエリ数の上限を宣言し、超えた場合に失敗させる
+
+例)
+    with query_budget(max_queries=4, max_repeats=1):
+        res = await client.get("/todos")
+"""
+import re
+import time
+from collections import Counter
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Any
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Receive, Scope, Send
+from app.core.config import settings
+from app.core.logger import get_logger
+logger = get_logger(__name__)
+
+# 値・プレースホルダを ? に置き換え、IN 句の件数・空白の違いを無視する
+_NORMALIZE_PATTERNS = (
+    (re.compile(r"'(?:[^']|'')*'"), "?"),
+    (re.compile(r"%\(\w+\)s|%s|(?<!:):\w+|\$\d+"), "?"),
+    (re.compile(r"\b\d+(?:\.\d+)?\b"), "?"),
+    (re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)"), "(?)"),
+    (re.compile(r"\s+"), " "),
+)
+
+@lru_cache(maxsize=4096)
+def normalize_statement(statement: str) -> str:
+    """値・IN 句の件数が異なるだけのクエリを同一とみなすよう正規化する"""
+    for pattern, replacement in _NORMALIZE_PATTERNS:
+        statement = pattern.sub(replacement, statement)
+    return statement.strip()
+
+def _truncate(value: Any, max_length: int) -> str:
+    text = repr(value)
+    return text if len(text) <= max_length else f"{text[:max_length]}...({len(text)} chars)"
+
+class QueryRecorder:
+    """実行されたクエリの件数・正規化したクエリ毎の件数・スロークエリを記録する"""
+    def __init__(self) -> None:
+        self.count   = 0
+        self.seconds = 0.0
+        self.statements: Counter[str]      = Counter()
+        self.slow: list[tuple[float, str]] = [] # (秒数, クエリ)
+
+    def record(self, statement: str, seconds: float, is_slow: bool) -> None:
+        self.count   += 1
+        self.seconds += seconds
+        self.statements[normalize_statement(statement)] += 1
+        if is_slow:
+            self.slow.append((seconds, statement))
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        """threshold 回を超えて実行された (正規化した) クエリと件数"""
+        return [(statement, count) for statement, count in self.statements.most_common() if count > threshold]
+
+# 実行中の QueryRecorder. ミドルウェア・query_budget が入れ子になっても全てに記録する
+_recorders: ContextVar[tuple[QueryRecorder, ...]] = ContextVar("query_recorders", default=())
+
+@contextmanager
+def record_queries() -> Iterator[QueryRecorder]:
+    """with 内 (同一の context・引き継いだ greenlet/スレッド) で実行されたクエリを記録する"""
+    recorder = QueryRecorder()
+    token    = _recorders.set((*_recorders.get(), recorder))
+    try:
+        yield recorder
+    finally:
+        _recorders.reset(token)
+
+class QueryDetector:
+    """
+    全てのエンジンの before/after_cursor_execute でクエリの時間を計測し、スロークエリをログに出力する
+    install() するまでイベントを登録しない (無効時のオーバーヘッドはない)
+    """
+    def __init__(self, slow_query_seconds: float, repeat_threshold: int, max_params_length: int = 500) -> None:
+        self.slow_query_seconds = slow_query_seconds
+        self.repeat_threshold   = repeat_threshold
+        self.max_params_length  = max_params_length
+        self.installed          = False
+        self.slow_queries       = 0
+        self.repeated_requests  = 0
+
+    def install(self) -> None:
+        if not self.installed:
+            event.listen(Engine, "before_cursor_execute", self._before_cursor_execute)
+            event.listen(Engine, "after_cursor_execute", self._after_cursor_execute)
+            self.installed = True
+
+    def uninstall(self) -> None:
+        if self.installed:
+            event.remove(Engine, "before_cursor_execute", self._before_cursor_execute)
+            event.remove(Engine, "after_cursor_execute", self._after_cursor_execute)
+            self.installed = False
+
+    def _before_cursor_execute(self, conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool) -> None:
+        if context is not None:
+            context._query_detector_start = time.perf_counter()
+
+    def _after_cursor_execute(self, conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool) -> None:
+        start = getattr(context, "_query_detector_start", None)
+        if start is None:
+            return
+        seconds = time.perf_counter() - start
+        is_slow = seconds >= self.slow_query_seconds
+        if is_slow:
+            self.slow_queries += 1
+            logger.warning(
+                "slow query %.1fms: %s params=%s",
+                seconds * 1000,
+                " ".join(statement.split()),
+                _truncate(parameters, self.max_params_length),
+                extra={"duration_ms": round(seconds * 1000, 1)},
+            )
+        for recorder in _recorders.get():
+            recorder.record(statement, seconds, is_slow)
+
+    def report(self, recorder: QueryRecorder, method: str, path: str) -> None:
+        """同一のクエリが repeat_threshold 回を超えて実行された場合 N+1 の疑いとしてログに出力する"""
+        repeated = recorder.repeated(self.repeat_threshold)
+        if not repeated:
+            return
+        self.repeated_requests += 1
+        for statement, count in repeated:
+            logger.warning(
+                "possible N+1: %s %s ran the same statement %d times (%d queries in total): %s",
+                method, path, count, recorder.count, statement,
+                extra={"query_count": recorder.count},
+            )
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "installed": int(self.installed),
+            "slow_queries": self.slow_queries,
+            "repeated_requests": self.repeated_requests,
+        }
+
+class QueryDetectorMiddleware:
+    """リクエスト毎にクエリを記録し、終了時に N+1 の疑いがあるクエリをログに出力する"""
+    def __init__(self, app: ASGIApp, detector: QueryDetector | None = None) -> None:
+        self.app      = app
+        self.detector = detector or query_detector
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        with record_queries() as recorder:
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                self.detector.report(recorder, scope["method"], scope["path"])
+
+class QueryBudgetExceeded(AssertionError):
+    """query_budget の上限を超えた"""
+
+@contextmanager
+def query_budget(max_queries: int | None = None, max_repeats: int | None = None) -> Iterator[QueryRecorder]:
+    """
+    with 内のクエリ数が max_queries を超えた場合、または 同一のクエリが max_repeats 回を超えた場合に
+    QueryBudgetExceeded を送出する (テスト用). detector が未 install の場合は install する
+    """
+    query_detector.install()
+    with record_queries() as recorder:
+        yield recorder
+
+    errors = []
+    if max_queries is not None and recorder.count > max_queries:
+        errors.append(f"{recorder.count} queries exceeded the budget of {max_queries}")
+    if max_repeats is not None:
+        errors.extend(
+            f"statement ran {count} times (max {max_repeats}): {statement}"
+            for statement, count in recorder.repeated(max_repeats)
+        )
+    if errors:
+        statements = "\n".join(f"  {count}x {statement}" for statement, count in recorder.statements.most_common())
+        raise QueryBudgetExceeded("\n".join(errors) + f"\nstatements:\n{statements}")
+
+query_detector = QueryDetector(
+    slow_query_seconds=settings.QUERY_DETECTOR_SLOW_QUERY_SECONDS,
+    repeat_threshold=settings.QUERY_DETECTOR_REPEAT_THRESHOLD,
+    max_params_length=settings.QUERY_DETECTOR_MAX_PARAMS_LENGTH,
+)
\ No newline at end of file
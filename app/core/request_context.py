@@ -0,0 +1,73 @@
+import logging
+import time
+from contextvars import ContextVar
+from typing import Any
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.config import settings
+from app.core.resolver import host_resolver
+from app.core.utils import get_ulid
+
+REQUEST_ID_HEADER = "x-request-id"
+
+# リクエスト毎の情報 (request_id, client_ip, client_host, start). ログの出力時に参照する
+request_context: ContextVar[dict[str, Any] | None] = ContextVar("request_context", default=None)
+
+class RequestContextMiddleware:
+    """
+    request_id・クライアントの IP・ホスト名を request.state と request_context に設定する
+    request_id は X-Request-ID ヘッダの値 (未指定時は採番) とし、レスポンスのヘッダにも設定する
+    ホスト名の逆引きはリクエスト開始時に開始して処理と並行させ、レスポンス開始時に
+    開始からの経過時間を除いた REVERSE_DNS_BUDGET_SECONDS だけ待機する (キャッシュにあれば開始時に設定する)
+    """
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start      = time.monotonic()
+        headers    = dict(scope["headers"])
+        request_id = headers.get(REQUEST_ID_HEADER.encode(), b"").decode("latin-1")[:64] or get_ulid()
+        client_ip  = scope["client"][0] if scope.get("client") else None
+        lookup     = host_resolver.start(client_ip) if settings.REVERSE_DNS_ENABLED else None
+        context    = {
+            "request_id": request_id,
+            "client_ip": client_ip,
+            "client_host": lookup if isinstance(lookup, str) else None,
+            "start": start,
+        }
+        request_context.set(context)
+        state = scope.setdefault("state", {})
+        state["request_id"]    = request_id
+        state["client_ip"]     = client_ip
+        state["client_host"]   = context["client_host"]
+        state["client_lookup"] = lookup
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", []), (REQUEST_ID_HEADER.encode(), request_id.encode("latin-1"))]
+                if context["client_host"] is None and lookup is not None:
+                    budget = settings.REVERSE_DNS_BUDGET_SECONDS - (time.monotonic() - start)
+                    context["client_host"] = state["client_host"] = await host_resolver.wait(lookup, budget)
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+class RequestContextFilter(logging.Filter):
+    """
+    ログに request_id・client_ip・client_host・latency_ms (リクエスト開始からの経過時間) を追加する
+    uvicorn のアクセスログは client_addr にホスト名を付与する
+    """
+    def filter(self, record: logging.LogRecord) -> bool:
+        if hasattr(record, "request_id"): # logger・handler の両方に設定された場合
+            return True
+        context            = request_context.get() or {}
+        record.request_id  = context.get("request_id")
+        record.client_ip   = context.get("client_ip")
+        record.client_host = context.get("client_host")
+        record.latency_ms  = round((time.monotonic() - context["start"]) * 1000, 3) if context else None
+        if record.client_host and record.name == "uvicorn.access" and isinstance(record.args, tuple) and record.args:
+            record.args = (f"{record.args[0]} ({record.client_host})", *record.args[1:])
+        return True
\ No newline at end of file
@@ -0,0 +1,120 @@
+import asyncio
+import ipaddress
+import socket
+from concurrent.futures import ThreadPoolExecutor
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.logger import get_logger
+logger = get_logger(__name__)
+
+# 逆引きできなかった IP のキャッシュ値
+_UNRESOLVED = ""
+
+class HostResolver:
+    """
+    IP アドレスからホスト名を非同期に逆引きする
+    gethostbyaddr は専用の thread pool で実行し、1回の逆引きは timeout 秒で打ち切る
+    結果は 解決できた場合 ttl 秒・できなかった場合 negative_ttl 秒 キャッシュし、同じ IP の同時の逆引きは 1回にまとめる
+    呼び出し側は budget 秒だけ待機し、間に合わない場合も逆引きは継続して 以降のリクエストでキャッシュを使用する
+    """
+    def __init__(
+        self,
+        timeout: float,
+        workers: int,
+        max_inflight: int,
+        cache: TTLCache,
+        negative_ttl: float,
+    ) -> None:
+        self.timeout      = timeout
+        self.workers      = workers
+        self.max_inflight = max_inflight
+        self.cache        = cache
+        self.negative_ttl = negative_ttl
+        self._executor: ThreadPoolExecutor | None = None
+        self._inflight: dict[str, asyncio.Task[str]] = {}
+        self._stats = {"lookups": 0, "resolved": 0, "unresolved": 0, "timeouts": 0, "dropped": 0, "budget_exceeded": 0}
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """初回の逆引き時に生成する. 応答しない DNS で他の処理の thread を占有しないよう専用とする"""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="host-resolver")
+        return self._executor
+
+    async def _lookup(self, ip_address: str) -> str:
+        """逆引きを実行し結果をキャッシュする. 解決できない場合は空文字"""
+        self._stats["lookups"] += 1
+        loop = asyncio.get_running_loop()
+        try:
+            future = loop.run_in_executor(self._get_executor(), socket.gethostbyaddr, ip_address)
+            host   = (await asyncio.wait_for(future, timeout=self.timeout))[0]
+            self._stats["resolved"] += 1
+            self.cache.set(ip_address, host)
+            return host
+        except asyncio.TimeoutError:
+            self._stats["timeouts"] += 1
+        except OSError:
+            self._stats["unresolved"] += 1
+        finally:
+            self._inflight.pop(ip_address, None)
+        self.cache.set(ip_address, _UNRESOLVED, ttl=self.negative_ttl)
+        return _UNRESOLVED
+
+    def start(self, ip_address: str | None) -> asyncio.Task[str] | str | None:
+        """
+        キャッシュにあればその値を、なければ逆引きの task を返却する
+        IP アドレスでない場合・同時の逆引きが max_inflight を超える場合は None
+        """
+        if not ip_address:
+            return None
+        try:
+            ipaddress.ip_address(ip_address)
+        except ValueError:
+            return None
+
+        host = self.cache.get(ip_address)
+        if host is not None:
+            return host or None
+        task = self._inflight.get(ip_address)
+        if task is None:
+            if len(self._inflight) >= self.max_inflight:
+                self._stats["dropped"] += 1
+                return None
+            task = asyncio.create_task(self._lookup(ip_address))
+            self._inflight[ip_address] = task
+        return task
+
+    async def wait(self, lookup: asyncio.Task[str] | str | None, budget: float) -> str | None:
+        """start の結果を 最大 budget 秒待機してホスト名を返却する. 間に合わない場合は None"""
+        if lookup is None or isinstance(lookup, str):
+            return lookup
+        try:
+            # 待機を打ち切っても逆引きは継続させる
+            return await asyncio.wait_for(asyncio.shield(lookup), timeout=max(budget, 0.0)) or None
+        except asyncio.TimeoutError:
+            self._stats["budget_exceeded"] += 1
+            return None
+
+    async def resolve(self, ip_address: str | None, budget: float | None = None) -> str | None:
+        """ip_address のホスト名を返却する. budget 未指定時は REVERSE_DNS_BUDGET_SECONDS まで待機する"""
+        budget = settings.REVERSE_DNS_BUDGET_SECONDS if budget is None else budget
+        return await self.wait(self.start(ip_address), budget)
+
+    def stats(self) -> dict[str, int]:
+        """逆引き・キャッシュの hit/miss 数などの統計情報を返却する"""
+        return {**self._stats, **self.cache.stats(), "inflight": len(self._inflight)}
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+host_resolver = HostResolver(
+    timeout=settings.REVERSE_DNS_TIMEOUT_SECONDS,
+    workers=settings.REVERSE_DNS_WORKERS,
+    max_inflight=settings.REVERSE_DNS_MAX_INFLIGHT,
+    cache=TTLCache(
+        maxsize=settings.REVERSE_DNS_CACHE_MAXSIZE,
+        ttl=settings.REVERSE_DNS_CACHE_TTL_SECONDS,
+    ),
+    negative_ttl=settings.REVERSE_DNS_NEGATIVE_CACHE_TTL_SECONDS,
+)
\ No newline at end of file
@@ -0,0 +1,217 @@
+import threading
+import unicodedata
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from typing import Any
+from sqlalchemy import String, bindparam, event, or_
+from sqlalchemy.dialects.mysql import match
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import select
+from app.core.logger import get_logger
+logger = get_logger(__name__)
+
+# flush 後・commit 前の変更は rollback される可能性があるため session.info に保持し、commit 後にインデックスへ反映する
+_PENDING_SEARCH_OPS_KEY = "pending_search_ops"
+
+@event.listens_for(Session, "after_commit")
+def _apply_pending_search_ops(session: Session) -> None:
+    for backend, doc_id, values in session.info.pop(_PENDING_SEARCH_OPS_KEY, []):
+        if values is None:
+            backend.remove(doc_id)
+        else:
+            backend.index(values)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending_search_ops(session: Session) -> None:
+    session.info.pop(_PENDING_SEARCH_OPS_KEY, None)
+
+class SearchBackend(ABC):
+    """
+    全文検索の基本クラス
+    fields に指定したカラムを対象に 検索条件(where句)と関連度順の order by を生成する
+    検索条件は q によらず同一の構造とし (statement をキャッシュできるよう)、q に応じた値は get_params で bind する
+    """
+    name = ""
+    # index/remove によるデータ反映が必要な場合 True
+    needs_index = False
+
+    def __init__(self, fields: tuple[str, ...]) -> None:
+        self.fields = fields
+
+    async def build(self, db: AsyncSession, model: Any) -> None:
+        """インデックスを構築する (起動時に呼び出される)"""
+        pass
+
+    async def prepare(self, db: AsyncSession, model: Any) -> None:
+        """検索前の準備処理"""
+        pass
+
+    @abstractmethod
+    def get_conditions(self, model: Any) -> list[Any]:
+        """検索条件(where句)を返却する. 値は bindparam とする"""
+
+    @abstractmethod
+    def get_params(self, q: str) -> dict[str, Any]:
+        """q から get_conditions・get_relevance_order_by の bindparam の値を返却する"""
+
+    def get_relevance_order_by(self, model: Any) -> list[Any]:
+        """関連度順の order by を返却する. 関連度を持たない場合は空"""
+        return []
+
+    def index(self, obj: Any) -> None:
+        """データ作成・更新時に呼び出される"""
+        pass
+
+    def remove(self, id: str) -> None:
+        """データ削除時に呼び出される"""
+        pass
+
+    def stage_index(self, db: AsyncSession, obj: Any) -> None:
+        """commit 後に index するよう登録する. 値は commit で expire されるため登録時に取得する"""
+        if not self.needs_index:
+            return
+        if isinstance(obj, dict):
+            values = {"id": obj["id"], **{field: obj.get(field) for field in self.fields}}
+        else:
+            values = {"id": obj.id, **{field: getattr(obj, field, None) for field in self.fields}}
+        db.info.setdefault(_PENDING_SEARCH_OPS_KEY, []).append((self, values["id"], values))
+
+    def stage_remove(self, db: AsyncSession, id: str) -> None:
+        """commit 後に remove するよう登録する"""
+        if self.needs_index:
+            db.info.setdefault(_PENDING_SEARCH_OPS_KEY, []).append((self, id, None))
+
+class LikeSearchBackend(SearchBackend):
+    """LIKE '%q%' による部分一致検索 (インデックス未使用)"""
+    name = "like"
+
+    def get_conditions(self, model: Any) -> list[Any]:
+        pattern = bindparam("search_pattern", type_=String)
+        return [or_(*[getattr(model, field).like(pattern) for field in self.fields])]
+
+    def get_params(self, q: str) -> dict[str, Any]:
+        return {"search_pattern": f"%{q}%"}
+
+class FullTextSearchBackend(SearchBackend):
+    """
+    MySQL の FULLTEXT インデックス(ngram parser)を使用した検索
+    MATCH ... AGAINST の関連度で並び替える. 検索単位は サーバ設定 ngram_token_size (既定 2文字) に従う
+    """
+    name = "fulltext"
+
+    def _match(self, model: Any) -> Any:
+        columns = [getattr(model, field) for field in self.fields]
+        return match(*columns, against=bindparam("search_q", type_=String)).in_natural_language_mode()
+
+    def get_conditions(self, model: Any) -> list[Any]:
+        return [self._match(model)]
+
+    def get_params(self, q: str) -> dict[str, Any]:
+        return {"search_q": q}
+
+    def get_relevance_order_by(self, model: Any) -> list[Any]:
+        return [self._match(model).desc()]
+
+def tokenize_ngram(text: str) -> set[str]:
+    """NFKC 正規化・小文字化した文字列を unigram + bigram に分割する"""
+    text = unicodedata.normalize("NFKC", text).lower()
+    return set(text) | {text[i:i + 2] for i in range(len(text) - 1)}
+
+class InvertedIndexSearchBackend(SearchBackend):
+    """
+    プロセス内の転置インデックスによる検索 (SQLite / ローカル環境用)
+    起動時に DB から構築し、以降は commit 後に index/remove で差分を反映する
+    インデックスはプロセス毎のため 他プロセス (ワーカー・ジョブ) の変更は反映されない. 単一プロセスでのみ使用すること
+    bigram で候補を絞り込んだ後、部分一致で確定するため LIKE と同じ結果になる
+    関連度順には対応しない (ヒット件数分の CASE 式が必要になるため)
+    """
+    name        = "inverted_index"
+    needs_index = True
+
+    def __init__(self, fields: tuple[str, ...]) -> None:
+        super().__init__(fields)
+        self._docs: dict[str, str]          = {}
+        self._postings: dict[str, set[str]] = defaultdict(set)
+        self._lock                          = threading.Lock()
+        self._is_built                      = False
+
+    def _get_text(self, values: Any) -> str:
+        if isinstance(values, dict):
+            texts = [values.get(field) for field in self.fields]
+        else:
+            texts = [getattr(values, field, None) for field in self.fields]
+        return unicodedata.normalize("NFKC", "\n".join(t for t in texts if t)).lower()
+
+    async def build(self, db: AsyncSession, model: Any) -> None:
+        with self._lock:
+            self._docs.clear()
+            self._postings.clear()
+        columns = [model.id, *[getattr(model, field) for field in self.fields]]
+        stmt    = select(*columns).execution_options(include_deleted=True)
+        result  = await db.stream(stmt)
+        async for row in result:
+            self.index(dict(row._mapping))
+        self._is_built = True
+        logger.info(f"inverted index built. table={model.__tablename__} docs={len(self._docs)}")
+
+    async def prepare(self, db: AsyncSession, model: Any) -> None:
+        """起動時に構築していない場合 (スクリプト・テストなど) のみ 検索前に構築する"""
+        if not self._is_built:
+            await self.build(db, model)
+
+    def index(self, obj: Any) -> None:
+        doc_id = obj["id"] if isinstance(obj, dict) else obj.id
+        text   = self._get_text(obj)
+        with self._lock:
+            self._remove(doc_id)
+            self._docs[doc_id] = text
+            for token in tokenize_ngram(text):
+                self._postings[token].add(doc_id)
+
+    def _remove(self, doc_id: str) -> None:
+        text = self._docs.pop(doc_id, None)
+        if text is None:
+            return
+        for token in tokenize_ngram(text):
+            ids = self._postings.get(token)
+            if ids is not None:
+                ids.discard(doc_id)
+                if not ids:
+                    del self._postings[token]
+
+    def remove(self, id: str) -> None:
+        with self._lock:
+            self._remove(id)
+
+    def search(self, q: str) -> set[str]:
+        """q を含むデータの id を返却する"""
+        query = unicodedata.normalize("NFKC", q).lower()
+        if not query:
+            return set()
+        tokens = {query[i:i + 2] for i in range(len(query) - 1)} or {query}
+        with self._lock:
+            # 件数の少ない posting から積集合を取る
+            postings = sorted((self._postings.get(t, set()) for t in tokens), key=len)
+            candidates = set(postings[0]).intersection(*postings[1:]) if postings else set()
+            return {doc_id for doc_id in candidates if query in self._docs[doc_id]}
+
+    def get_conditions(self, model: Any) -> list[Any]:
+        # 件数が多くなるため bind パラメータ数の上限を受けないよう literal で展開する
+        ids = bindparam("search_ids", type_=model.id.type, expanding=True, literal_execute=True)
+        return [model.id.in_(ids)]
+
+    def get_params(self, q: str) -> dict[str, Any]:
+        return {"search_ids": list(self.search(q))}
+
+SEARCH_BACKENDS: dict[str, type[SearchBackend]] = {
+    LikeSearchBackend.name: LikeSearchBackend,
+    FullTextSearchBackend.name: FullTextSearchBackend,
+    InvertedIndexSearchBackend.name: InvertedIndexSearchBackend,
+}
+
+def get_search_backend(name: str, fields: tuple[str, ...]) -> SearchBackend:
+    """設定値から検索バックエンドを生成する"""
+    if name not in SEARCH_BACKENDS:
+        raise ValueError(f"unknown search backend: {name}")
+    return SEARCH_BACKENDS[name](fields)
@@ -0,0 +1,47 @@
+from functools import lru_cache
+from typing import Any
+import orjson
+from pydantic import BaseModel
+from pydantic.fields import ModelField
+from starlette.responses import Response
+
+# (field 名, alias, 値が model (または model の list) か) の組
+FieldPlan = tuple[tuple[str, str, bool], ...]
+
+def _is_model_field(field: ModelField) -> bool:
+    """field の型が model か. Union の場合はいずれかが model であれば True"""
+    types = [f.type_ for f in field.sub_fields] if field.sub_fields else [field.type_]
+    return any(isinstance(t, type) and issubclass(t, BaseModel) for t in types)
+
+@lru_cache(maxsize=None)
+def get_field_plan(schema: type[BaseModel]) -> FieldPlan:
+    """schema 毎の field 名 → alias (camelCase) の対応を 初回のみ算出して保持する"""
+    return tuple((name, field.alias, _is_model_field(field)) for name, field in schema.__fields__.items())
+
+def model_to_dict(model: BaseModel) -> dict[str, Any]:
+    """
+    検証済みの model を alias を key とする dict に変換する
+    .dict(by_alias=True) + jsonable_encoder と異なり 値の再変換は行わず、datetime・Enum 等は orjson に任せる
+    """
+    values = model.__dict__
+    result = {}
+    for name, alias, is_model in get_field_plan(type(model)):
+        value = values.get(name)
+        if is_model and value is not None:
+            value = [model_to_dict(v) for v in value] if isinstance(value, list) else model_to_dict(value)
+        result[alias] = value
+    return result
+
+def dump_model(model: BaseModel) -> bytes:
+    """検証済みの model を JSON bytes に変換する"""
+    return orjson.dumps(model_to_dict(model))
+
+class ModelJSONResponse(Response):
+    """
+    検証済みの model を orjson で JSON に変換して返却する
+    endpoint から Response を返却すると FastAPI による response_model の再検証・jsonable_encoder を行わない
+    """
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dump_model(content)
\ No newline at end of file
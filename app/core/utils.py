@@ -1,12 +1,39 @@
-import socket
-import ulid
-from fastapi import Request
-
-def get_ulid() -> str:
-    return ulid.new().str
-
-def get_request_info(request: Request) -> str:
-    return request.client.host
-
-def get_host_by_ip_address(ip_address: str) -> str:
-    return socket.gethostbyaddr(ip_address)[0]
\ No newline at end of file
+import base64
+import json
+import socket
+from typing import Any
+import ulid
+from fastapi import Request
+
+def get_ulid() -> str:
+    return ulid.new().str
+
+def normalize_ulid(value: Any) -> str:
+    """ULID を 正規化した文字列 (大文字の26文字) にする. ULID として不正な場合は ValueError"""
+    try:
+        return ulid.from_str(str(value)).str
+    except (ValueError, OverflowError) as e:
+        raise ValueError(f"invalid ULID: {value!r}") from e
+
+def get_request_info(request: Request) -> str:
+    return request.client.host
+
+def get_host_by_ip_address(ip_address: str) -> str:
+    """同期で逆引きする (タイムアウトなし). リクエスト処理中は app.core.resolver.host_resolver を使用する"""
+    return socket.gethostbyaddr(ip_address)[0]
+
+def encode_cursor(values: dict[str, Any]) -> str:
+    """dict を url-safe な不透明カーソル文字列にエンコードする"""
+    raw = json.dumps(values, default=str, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> dict[str, Any]:
+    """encode_cursor で生成したカーソルを dict にデコードする. 不正な場合は ValueError"""
+    try:
+        padding = "=" * (-len(cursor) % 4)
+        values  = json.loads(base64.urlsafe_b64decode(cursor + padding))
+    except Exception as e:
+        raise ValueError(f"invalid cursor: {cursor}") from e
+    if not isinstance(values, dict):
+        raise ValueError(f"invalid cursor: {cursor}")
+    return values
\ No newline at end of file
@@ -1,4 +1,5 @@
-from .base import *  # noqa
-from .tag import *  # noqa
-from .todo import *  # noqa
+from .base import *  # noqa
+from .job import *  # noqa
+from .tag import *  # noqa
+from .todo import *  # noqa
 from .user import *  # noqa
\ No newline at end of file
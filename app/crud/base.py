@@ -1,227 +1,960 @@
-# 基本設定
-import datetime
-import math
-from enum import Enum
-from typing import Any, Generic, TypeVar
-# fastapi
-from fastapi.encoders import jsonable_encoder
-from pydantic import BaseModel
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.inspection import inspect
-from sqlalchemy.orm.properties import ColumnProperty
-from sqlalchemy.sql import func, select
-# app
-from app import schemas
-from app.exceptions.core import APIException
-from app.exceptions.error_message import ErrorMessage
-from app.models.base import Base
-from app.schemas.core import PagingQueryIn
-
-#TypeVar を使用して以下の型を定義する
-ModelType              = TypeVar("ModelType", bound=Base)
-ResponseSchemaType     = TypeVar("ResponseSchemaType", bound=BaseModel)
-CreateSchemaType       = TypeVar("CreateSchemaType", bound=BaseModel)
-UpdateSchemaType       = TypeVar("UpdateSchemaType", bound=BaseModel)
-ListResponseSchemaType = TypeVar("ListResponseSchemaType", bound=BaseModel)
-
-class CRUDBase(
-    Generic[
-        ModelType,
-        ResponseSchemaType,
-        CreateSchemaType,
-        UpdateSchemaType,
-        ListResponseSchemaType,
-    ],
-):
-    def __init__(
-        self,
-        model: type[ModelType],
-        response_schema_class: type[ResponseSchemaType],
-        list_response_class: type[ListResponseSchemaType]
-    ) -> None:
-        self.model                 = model
-        self.response_schema_class = response_schema_class
-        self.list_response_class   = list_response_class
-
-    def _get_select_columns(self) -> list(ColumnProperty):
-        """
-        ResponseSchemaに含まれる fieldのみを
-        sqlalchemyの select用のobject として返す
-        """
-        schema_columns = list(self.response_schema_class.__fields__.keys())
-        mapper         = inspect(self.model) # マッパーを取得する
-        select_columns = [
-            # for文を実行し、条件文に合致するデータのみ, getattr を実行して listに代入する
-            getattr(self.model, attr.key)
-            for attr in mapper.attrs
-            if (isinstance(attr, ColumnProperty)) and (attr.key in schema_columns)
-        ]
-
-        return select_columns
-
-    def _filter_model_exists_fields(self, data_dict: dict[str, Any]) -> dict[str, Any]:
-        """
-        data_dict を基準に
-        modelに存在する field のみを返却する
-        """
-        data_fields   = list(data_dict.keys())
-        mapper        = inspect(self.model)
-        exists_d_dict = {}
-        for attr in mapper.attrs: # 条件に合致する field のみを返却する
-            if isinstance(attr, ColumnProperty) and (attr.key in data_fields):
-                exists_d_dict[attr.key] = data_dict[attr.key]
-
-        return exists_d_dict
-
-    def _get_order_by_clause(self, sort_field: Any | Enum) -> ColumnProperty | None:
-        """
-        引数 sort_field に合致する modelのfield を返却する
-        """
-        sort_field_value = sort_field.value if isinstance(sort_field, Enum) else sort_field
-        mapper = inspect(self.model)
-
-        order_by_clause = [
-            attr
-            for attr in mapper.attrs
-            if isinstance(attr, ColumnProperty) and (attr.key == sort_field_value)
-        ]
-
-        return order_by_clause[0] if order_by_clause else None
-
-    async def get_db_obj_by_id(
-        self,
-        db: AsyncSession,
-        id: Any,
-        include_deleted: bool = False,
-    ) -> ModelType | None:
-        """
-        id から obj のデータを取得する
-        """
-        sql = select(self.model).where(self.model.id == id).execution_options(include_deleted=include_deleted)
-        # scalars を使用してスカラー値のみ取得する
-        return (await db.execute(sql)).scalars().first()
-
-    async def get_db_obj_list(
-        self,
-        db: AsyncSession,
-        where_clause: list[Any] | None = None,
-        sort_query_in: schemas.SortQueryIn | None = None,
-        include_deleted: bool = False,
-    ) -> list[ModelType | None]:
-        """
-        一覧データを取得する
-        """
-        where_clause = where_clause if where_clause is not None else []
-        stmt         = select(self.model).where(*where_clause) # where句をunpack
-
-        if sort_query_in:
-            order_by_clause = self._get_order_by_clause(sort_query_in.sort_field)
-            stmt            = sort_query_in.apply_to_quey(stmt, order_by_clause=order_by_clause)
-
-        db_obj_list = (await db.execute(stmt.execution_option(include_deleted=include_deleted))).all()
-        return db_obj_list
-
-    async def get_paged_list(
-        self,
-        db: AsyncSession,
-        paging_query_in: PagingQueryIn,
-        conditions: list[Any] | None = None,
-        sort_query_in: schemas.SortQueryIn | None = None,
-        include_deleted: bool = False,
-    ) -> ListResponseSchemaType:
-        """
-        ページネーション付データを返却する
-        """
-        # ページネート使用データ取得
-        conditions = conditions if conditions is not None else []
-        stmt       = select(func.count(self.model.id)) \
-                        .where(*conditions) \
-                        .execution_options(include_deleted=include_deleted)
-        total_cnt = (await db.execute(stmt)).scalar() # 取得行数を取得
-
-        # データ取得
-        selects = self._get_select_columns()
-        stmt    = select(*selects).where(*conditions)
-        if sort_query_in: # order がある場合取得して追加する
-            order = self._get_order_by_clause(sort_query_in.sort_field)
-            stmt  = sort_query_in.apply_to_quey(stmt, order_by_clause=order)
-
-        stmt = stmt.execution_options(include_deleted=include_deleted)
-        stmt = paging_query_in.apply_to_query(stmt)
-        data = (await db.execute(stmt)).all()
-
-        # meta データ生成
-        meta = schemas.PagingMeta( # PagingMeta をインスタンス生成する
-            total_data_count = total_cnt,
-            current_page     = paging_query_in.page,
-            total_page_count = int(math.ceil(total_cnt / paging_query_in.per_page)),
-            per_page         = paging_query_in.per_page
-        )
-        # response 返却
-        return self.list_response_class(data=data, meta=meta)
-
-    async def create(
-        self,
-        db: AsyncSession,
-        create_schema: CreateSchemaType,
-    ) -> ModelType:
-        """ データ新規作成 """
-        create_dict = jsonable_encoder(create_schema, by_alias=False) # camelCase 採用を防ぐ
-        exists_dict = self._filter_model_exists_fields(create_dict)
-
-        db_obj = self.model(**exists_dict) # db_objを生成
-        db.add(db_obj)
-        await db.flush()
-        await db.refresh(db_obj)
-
-        return db_obj
-
-
-    async def update(
-        self,
-        db: AsyncSession,
-        *,
-        db_obj: ModelType,
-        update_schema: UpdateSchemaType
-    ) -> ModelType:
-        """データ更新"""
-        db_obj_dict = jsonable_encoder(db_obj)
-        update_dict = update_schema.dict(exclude_unset=True) # 未指定カラムは更新しない
-
-        for field in db_obj_dict: # attr をセットする
-            if field in update_dict:
-                # db_obj の field の値は update_dict[field]
-                setattr(db_obj, field, update_dict[field])
-
-        db.add(db_obj)
-        await db.flush()
-        await db.refresh(db_obj)
-        return db_obj
-
-    async def delete(
-        self,
-        db: AsyncSession,
-        db_obj: ModelType
-    ) -> ModelType:
-        """soft delete 論理削除"""
-        # バリデーション
-        if not hasattr(db_obj, "deleted_at"): # deleted_at カラムが存在しない場合
-            raise APIException(ErrorMessage.SOFT_DELETE_NOT_SUPPORTED)
-        if db_obj.deleted_at:
-            raise APIException(ErrorMessage.ALREADY_DELETED)
-
-        db_obj.deleted_at = datetime.datetime.now(tz=datetime.timezone.utc) # moduleのdatetimeを取ってきている
-        await db.add(db_obj)
-        await db.flush()
-        await db.refresh(db_obj)
-        return db_obj
-
-    async def hard_delete(
-        self,
-        db: AsyncSession,
-        db_obj: ModelType,
-    ) -> None:
-        """物理削除"""
-        await db.delete(db_obj)
-        await db.flush()
-
+# 基本設定
+import datetime
+import json
+import math
+from collections.abc import AsyncIterator, Callable, Hashable, Iterator
+from enum import Enum
+from functools import cached_property
+from typing import Any, Generic, TypeVar
+# fastapi
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel
+from sqlalchemy import Integer, Table, bindparam, delete, insert, union_all, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.inspection import inspect
+from sqlalchemy.orm.properties import ColumnProperty
+from sqlalchemy.sql import and_, desc, func, or_, select, text
+from sqlalchemy.sql.util import ClauseAdapter
+# app
+from app import schemas
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.etag import make_etag
+from app.core.logger import get_logger
+from app.core.utils import decode_cursor, encode_cursor, get_ulid, normalize_ulid
+from app.exceptions.core import APIException
+from app.exceptions.error_message import ErrorMessage
+from app.models.base import Base
+from app.schemas.bulk import BulkItemStatusEnum
+from app.schemas.core import CountStrategyEnum, CursorPagingQueryIn, PagingQueryIn, SortDirectionEnum
+logger = get_logger(__name__)
+
+# count_strategy=cached 用の COUNT 結果キャッシュ (全モデル共通)
+count_cache = TTLCache(
+    maxsize=settings.PAGING_COUNT_CACHE_MAXSIZE,
+    ttl=settings.PAGING_COUNT_CACHE_TTL_SECONDS,
+)
+
+#TypeVar を使用して以下の型を定義する
+ModelType              = TypeVar("ModelType", bound=Base)
+ResponseSchemaType     = TypeVar("ResponseSchemaType", bound=BaseModel)
+CreateSchemaType       = TypeVar("CreateSchemaType", bound=BaseModel)
+UpdateSchemaType       = TypeVar("UpdateSchemaType", bound=BaseModel)
+ListResponseSchemaType = TypeVar("ListResponseSchemaType", bound=BaseModel)
+
+class CRUDBase(
+    Generic[
+        ModelType,
+        ResponseSchemaType,
+        CreateSchemaType,
+        UpdateSchemaType,
+        ListResponseSchemaType,
+    ],
+):
+    def __init__(
+        self,
+        model: type[ModelType],
+        response_schema_class: type[ResponseSchemaType],
+        list_response_class: type[ListResponseSchemaType],
+        count_strategy: CountStrategyEnum = CountStrategyEnum.exact,
+        list_loader_options: list[Any] | None = None,
+        archive_table: Table | None = None,
+    ) -> None:
+        self.model                 = model
+        self.response_schema_class = response_schema_class
+        self.list_response_class   = list_response_class
+        self.count_strategy        = count_strategy
+        # 一覧取得時に既定で適用する loader option (selectinload 等). 指定時は カラムではなく model を select する
+        self.list_loader_options   = list_loader_options or []
+        # 論理削除後 保持期間を過ぎたデータの移動先. include_deleted の取得時は union して参照する
+        self.archive_table         = archive_table
+        self._statement_cache: dict[Hashable, Any] = {}
+
+    @cached_property
+    def _column_properties(self) -> dict[str, ColumnProperty]:
+        """model のカラム(ColumnProperty)を key 毎に保持する. mapper の走査は初回のみ行う"""
+        mapper = inspect(self.model) # マッパーを取得する
+        return {attr.key: attr for attr in mapper.attrs if isinstance(attr, ColumnProperty)}
+
+    @cached_property
+    def _select_columns(self) -> tuple[Any, ...]:
+        """ResponseSchema に含まれる カラムの select用 object"""
+        schema_columns = self.response_schema_class.__fields__.keys()
+        return tuple(getattr(self.model, key) for key in self._column_properties if key in schema_columns)
+
+    def _get_select_columns(self) -> list[ColumnProperty]:
+        """
+        ResponseSchemaに含まれる fieldのみを
+        sqlalchemyの select用のobject として返す
+        """
+        return list(self._select_columns)
+
+    def _filter_model_exists_fields(self, data_dict: dict[str, Any]) -> dict[str, Any]:
+        """
+        data_dict を基準に
+        modelに存在する field のみを返却する
+        """
+        return {key: data_dict[key] for key in self._column_properties if key in data_dict}
+
+    def _get_order_by_clause(self, sort_field: Any | Enum) -> ColumnProperty | None:
+        """
+        引数 sort_field に合致する modelのfield を返却する
+        """
+        sort_field_value = sort_field.value if isinstance(sort_field, Enum) else sort_field
+        return self._column_properties.get(sort_field_value)
+
+    def _get_cached_statement(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        """
+        key 毎に statement を1度だけ生成して保持する
+        同一の statement object を再利用することで 生成処理および SQLAlchemy のキャッシュキー算出を省略する
+        """
+        stmt = self._statement_cache.get(key)
+        if stmt is None:
+            stmt = self._statement_cache[key] = factory()
+        return stmt
+
+    def _get_list_statement(
+        self,
+        key: Hashable,
+        factory: Callable[[], Any],
+        conditions: list[Any],
+        order_by: list[Any] | None,
+        conditions_key: Hashable | None,
+        loader_options: list[Any],
+    ) -> Any:
+        """
+        conditions・order_by・アーカイブの union・loader option まで適用した statement を返却する
+        条件がない場合 または conditions_key で条件を識別できる場合は key 毎にキャッシュした statement を再利用する
+        (conditions の値は bindparam とし、実行時に params で渡すこと)
+        任意の条件・インスタンスの既定以外の loader_options の場合は 毎回生成する
+        """
+        has_conditions = bool(conditions or order_by)
+        if (has_conditions and conditions_key is None) or (loader_options and loader_options is not self.list_loader_options):
+            return factory()
+        return self._get_cached_statement((key, conditions_key if has_conditions else None), factory)
+
+    @cached_property
+    def _archive_adapter(self) -> ClauseAdapter:
+        """model のテーブルを アーカイブテーブルと union した subquery に置き換える adapter"""
+        table    = self.model.__table__
+        archived = select(*[self.archive_table.c[c.name] for c in table.columns])
+        union    = union_all(select(*table.columns), archived).subquery(f"{table.name}_with_archive")
+        return ClauseAdapter(union)
+
+    def _union_archive(self, stmt: Any, include_deleted: bool, select_entity: bool = False) -> Any:
+        """
+        include_deleted の場合 stmt の参照する model のテーブルを アーカイブと union したものに置き換える
+        model を select する statement は カラムの select に置き換えた後 from_statement で model に戻す
+        loader option は置き換え後に付与すること
+        """
+        if not include_deleted or self.archive_table is None:
+            return stmt
+        if not select_entity:
+            return self._archive_adapter.traverse(stmt)
+        adapted = self._archive_adapter.traverse(stmt.with_only_columns(*self.model.__table__.columns))
+        return select(self.model).from_statement(adapted)
+
+    def _get_loader_options(self, loader_options: list[Any] | None) -> list[Any]:
+        """loader_options 未指定時は インスタンスの list_loader_options を使用する"""
+        return self.list_loader_options if loader_options is None else loader_options
+
+    @staticmethod
+    def _normalize_id(id: Any) -> str | None:
+        """
+        外部から受け取った id を ULID の正規形 (大文字) にする
+        ULID として不正な id は どのデータにも一致しないため None とする (ULIDType は不正な値を bind できない)
+        """
+        try:
+            return normalize_ulid(id)
+        except ValueError:
+            return None
+
+    async def get_db_obj_by_id(
+        self,
+        db: AsyncSession,
+        id: Any,
+        include_deleted: bool = False,
+        loader_options: list[Any] | None = None,
+    ) -> ModelType | None:
+        """
+        id から obj のデータを取得する
+        loader_options 指定時は リレーションの取得方法 (selectinload, raiseload 等) を上書きする
+        """
+        id = self._normalize_id(id)
+        if id is None:
+            return None
+        def factory() -> Any:
+            sql = select(self.model) \
+                    .where(self.model.id == bindparam("id")) \
+                    .execution_options(include_deleted=include_deleted)
+            sql = self._union_archive(sql, include_deleted, select_entity=True)
+            return sql.options(*loader_options) if loader_options else sql
+
+        # loader_options 指定時は 指定毎に異なるため キャッシュしない
+        sql = factory() if loader_options else self._get_cached_statement(("by_id", include_deleted), factory)
+        # scalars を使用してスカラー値のみ取得する
+        return (await db.execute(sql, {"id": id})).scalars().first()
+
+    async def get_etag(
+        self,
+        db: AsyncSession,
+        id: Any,
+        include_deleted: bool = False,
+    ) -> str | None:
+        """
+        データの ETag を返却する. 存在しない場合は None
+        データ本体は取得せず id と updated_at (マイクロ秒) から生成する
+        """
+        id = self._normalize_id(id)
+        if id is None:
+            return None
+        sql = self._get_cached_statement(
+            ("etag", include_deleted),
+            lambda: self._union_archive(
+                select(self.model.id, self.model.updated_at)
+                    .where(self.model.id == bindparam("id"))
+                    .execution_options(include_deleted=include_deleted),
+                include_deleted,
+            ),
+        )
+        row = (await db.execute(sql, {"id": id})).first()
+        return make_etag(*row) if row else None
+
+    async def get_list_etag(
+        self,
+        db: AsyncSession,
+        conditions: list[Any] | None = None,
+        include_deleted: bool = False,
+        query_params: str = "",
+        conditions_key: Hashable | None = None,
+        params: dict[str, Any] | None = None,
+    ) -> str:
+        """
+        一覧の ETag を返却する
+        条件に合致する件数と max(updated_at) を 1回の集計で取得し、ページング・並び順等の query_params と合わせて生成する
+        """
+        conditions = conditions if conditions is not None else []
+
+        def factory() -> Any:
+            sql = select(func.count(self.model.id), func.max(self.model.updated_at)) \
+                    .where(*conditions) \
+                    .execution_options(include_deleted=include_deleted)
+            return self._union_archive(sql, include_deleted)
+
+        sql = self._get_list_statement(("list_etag", include_deleted), factory, conditions, None, conditions_key, [])
+        count, max_updated_at = (await db.execute(sql, params)).one()
+        return make_etag(query_params, count, max_updated_at)
+
+    async def get_existing_ids(
+        self,
+        db: AsyncSession,
+        ids: list[Any],
+        include_deleted: bool = False,
+    ) -> set[Any]:
+        """
+        ids のうち存在する id を返却する
+        大文字・小文字の異なる id も存在するものとし、指定された表記のまま返却する
+        """
+        normalized_ids = {id: self._normalize_id(id) for id in ids}
+        valid_ids      = {id for id in normalized_ids.values() if id is not None}
+        if not valid_ids:
+            return set()
+        sql = select(self.model.id).where(self.model.id.in_(valid_ids)).execution_options(include_deleted=include_deleted)
+        exists_ids = set((await db.execute(sql)).scalars().all())
+        return {id for id, normalized_id in normalized_ids.items() if normalized_id in exists_ids}
+
+    async def get_db_obj_list(
+        self,
+        db: AsyncSession,
+        where_clause: list[Any] | None = None,
+        sort_query_in: schemas.SortQueryIn | None = None,
+        include_deleted: bool = False,
+        loader_options: list[Any] | None = None,
+    ) -> list[ModelType | None]:
+        """
+        一覧データを取得する
+        """
+        where_clause   = where_clause if where_clause is not None else []
+        loader_options = self._get_loader_options(loader_options)
+        stmt           = select(self.model).where(*where_clause) # where句をunpack
+
+        if sort_query_in:
+            order_by_clause = self._get_order_by_clause(sort_query_in.sort_field)
+            stmt            = sort_query_in.apply_to_quey(stmt, order_by_clause=order_by_clause)
+
+        stmt = self._union_archive(stmt, include_deleted, select_entity=True)
+        if loader_options:
+            stmt = stmt.options(*loader_options)
+        db_obj_list = (await db.execute(stmt.execution_options(include_deleted=include_deleted))).scalars().all()
+        return list(db_obj_list)
+
+    def _get_count_cache_key(
+        self,
+        stmt: Any,
+        conditions: list[Any],
+        include_deleted: bool,
+        conditions_key: Hashable | None,
+        params: dict[str, Any] | None,
+    ) -> tuple[Any, ...]:
+        """
+        COUNT 結果のキャッシュキーを生成する
+        条件がない場合 または conditions_key 指定時は conditions_key と bind パラメータの値から生成し、
+        conditions_key のない任意の条件の場合のみ COUNT 文を compile する
+        """
+        if conditions and conditions_key is None:
+            compiled = stmt.compile()
+            values   = tuple(sorted((k, str(v)) for k, v in compiled.params.items()))
+            return (self.model.__tablename__, str(compiled), values, include_deleted)
+        values = tuple(sorted((k, str(v)) for k, v in (params or {}).items()))
+        return (self.model.__tablename__, conditions_key if conditions else None, values, include_deleted)
+
+    async def _get_estimated_count(
+        self,
+        db: AsyncSession,
+        conditions: list[Any],
+        include_deleted: bool,
+        params: dict[str, Any] | None = None,
+    ) -> int:
+        """
+        オプティマイザの推定行数を返却する (MySQL)
+        条件がない場合は information_schema.TABLES.TABLE_ROWS, ある場合は EXPLAIN の rows を使用する
+        """
+        if not conditions and include_deleted:
+            stmt = text(
+                "SELECT TABLE_ROWS FROM information_schema.TABLES "
+                "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table_name"
+            )
+            return int((await db.execute(stmt, {"table_name": self.model.__tablename__})).scalar() or 0)
+
+        # EXPLAIN は Core で実行するため論理削除の条件を明示的に付与する
+        if not include_deleted and hasattr(self.model, "deleted_at"):
+            conditions = [*conditions, self.model.deleted_at.is_(None)]
+        conn     = await db.connection()
+        compiled = select(self.model.id).where(*conditions).params(params or {}).compile(dialect=conn.dialect)
+        params   = tuple(compiled.params[key] for key in (compiled.positiontup or []))
+        rows     = (await conn.exec_driver_sql(f"EXPLAIN {compiled}", params)).mappings().all()
+        return int(rows[0]["rows"] or 0) if rows else 0
+
+    async def _get_total_count(
+        self,
+        db: AsyncSession,
+        conditions: list[Any],
+        include_deleted: bool,
+        count_strategy: CountStrategyEnum,
+        conditions_key: Hashable | None = None,
+        params: dict[str, Any] | None = None,
+    ) -> tuple[int, CountStrategyEnum]:
+        """count_strategy に従い総件数を取得し、(件数, 実際に使用した strategy) を返却する"""
+        def factory() -> Any:
+            stmt = select(func.count(self.model.id)) \
+                    .where(*conditions) \
+                    .execution_options(include_deleted=include_deleted)
+            return self._union_archive(stmt, include_deleted)
+
+        stmt = self._get_list_statement(("count", include_deleted), factory, conditions, None, conditions_key, [])
+
+        if count_strategy == CountStrategyEnum.estimated:
+            try:
+                return await self._get_estimated_count(db, conditions, include_deleted, params), count_strategy
+            except Exception as e: # MySQL 以外等で推定できない場合は exact で取得する
+                logger.warning(f"estimated count failed. fallback to exact. detail={e}")
+                count_strategy = CountStrategyEnum.exact
+
+        if count_strategy == CountStrategyEnum.cached:
+            key       = self._get_count_cache_key(stmt, conditions, include_deleted, conditions_key, params)
+            total_cnt = count_cache.get(key)
+            if total_cnt is None:
+                total_cnt = (await db.execute(stmt, params)).scalar()
+                count_cache.set(key, total_cnt)
+            return total_cnt, count_strategy
+
+        return (await db.execute(stmt, params)).scalar(), CountStrategyEnum.exact
+
+    def _validate_per_page(self, per_page: int) -> None:
+        """per_page が上限を超える場合はエラー. 全件取得は stream_list (export API) を使用する"""
+        if per_page > settings.PAGING_MAX_PER_PAGE:
+            raise APIException(ErrorMessage.PER_PAGE_LIMIT_EXCEEDED)
+
+    def _validate_bulk_size(self, count: int) -> None:
+        """一括処理の件数が上限を超える場合はエラー"""
+        if count > settings.BULK_MAX_ITEMS:
+            raise APIException(ErrorMessage.BULK_LIMIT_EXCEEDED)
+
+    def _get_paged_statement(
+        self,
+        sort_query_in: schemas.SortQueryIn | None,
+        include_deleted: bool,
+        loader_options: list[Any],
+        conditions: list[Any],
+        order_by: list[Any] | None = None,
+        conditions_key: Hashable | None = None,
+    ) -> Any:
+        """
+        並び順・条件毎の ページネート用 select を返却する
+        offset/limit は bind パラメータとし、実行時に値を渡す
+        loader_options 指定時は カラムではなく model を select する
+        """
+        select_entity = bool(loader_options)
+        sort_key  = None
+        direction = None
+        if sort_query_in:
+            order     = self._get_order_by_clause(sort_query_in.sort_field)
+            sort_key  = order.key if order is not None else None
+            direction = sort_query_in.direction
+
+        def factory() -> Any:
+            stmt = select(self.model) if select_entity else select(*self._select_columns)
+            if sort_query_in: # order がある場合取得して追加する
+                stmt = sort_query_in.apply_to_quey(stmt, order_by_clause=order)
+            if order_by:
+                stmt = stmt.order_by(*order_by)
+            stmt = stmt \
+                .where(*conditions) \
+                .offset(bindparam("offset", type_=Integer)) \
+                .limit(bindparam("limit", type_=Integer)) \
+                .execution_options(include_deleted=include_deleted)
+            stmt = self._union_archive(stmt, include_deleted, select_entity)
+            return stmt.options(*loader_options) if loader_options else stmt
+
+        key = ("page", sort_key, direction, include_deleted, select_entity)
+        return self._get_list_statement(key, factory, conditions, order_by, conditions_key, loader_options)
+
+    async def _fetch_list(self, db: AsyncSession, stmt: Any, params: dict[str, Any] | None, select_entity: bool) -> list[Any]:
+        """一覧を取得する. model を select した場合は model の object を返却する"""
+        result = await db.execute(stmt, params)
+        return list(result.scalars().all() if select_entity else result.all())
+
+    async def get_paged_list(
+        self,
+        db: AsyncSession,
+        paging_query_in: PagingQueryIn,
+        conditions: list[Any] | None = None,
+        sort_query_in: schemas.SortQueryIn | None = None,
+        include_deleted: bool = False,
+        count_strategy: CountStrategyEnum | None = None,
+        order_by: list[Any] | None = None,
+        loader_options: list[Any] | None = None,
+        conditions_key: Hashable | None = None,
+        params: dict[str, Any] | None = None,
+    ) -> ListResponseSchemaType:
+        """
+        ページネーション付データを返却する
+        count_strategy 未指定時はインスタンスの count_strategy を使用する
+        order_by 指定時は sort_query_in より優先して並び替える
+        loader_options 未指定時はインスタンスの list_loader_options を使用する
+        conditions_key 指定時は conditions・order_by を含めた statement をキャッシュする.
+        conditions_key は conditions・order_by の構造を識別する値とし、値は bindparam として params で渡すこと
+        """
+        conditions     = conditions if conditions is not None else []
+        count_strategy = count_strategy or self.count_strategy
+        loader_options = self._get_loader_options(loader_options)
+        select_entity  = bool(loader_options)
+        per_page       = paging_query_in.per_page
+        self._validate_per_page(per_page)
+
+        # データ取得
+        stmt = self._get_paged_statement(
+            None if order_by else sort_query_in, include_deleted, loader_options, conditions, order_by, conditions_key,
+        )
+
+        page_params = {**(params or {}), "offset": paging_query_in.get_offset(), "limit": per_page}
+        if count_strategy == CountStrategyEnum.none:
+            # 総件数は取得せず、1件多く取得して次ページの有無を判定する
+            rows     = await self._fetch_list(db, stmt, {**page_params, "limit": per_page + 1}, select_entity)
+            data     = rows[:per_page]
+            has_next = len(rows) > per_page
+            meta     = schemas.PagingMeta(
+                total_data_count = None,
+                current_page     = paging_query_in.page,
+                total_page_count = None,
+                per_page         = per_page,
+                has_next         = has_next,
+                count_strategy   = count_strategy,
+            )
+            return self.list_response_class(data=data, meta=meta)
+
+        # ページネート使用データ取得
+        total_cnt, count_strategy = await self._get_total_count(
+            db, conditions, include_deleted, count_strategy, conditions_key, params,
+        )
+        data = await self._fetch_list(db, stmt, page_params, select_entity)
+
+        # meta データ生成
+        total_page_count = int(math.ceil(total_cnt / per_page))
+        meta = schemas.PagingMeta( # PagingMeta をインスタンス生成する
+            total_data_count = total_cnt,
+            current_page     = paging_query_in.page,
+            total_page_count = total_page_count,
+            per_page         = per_page,
+            has_next         = paging_query_in.page < total_page_count,
+            count_strategy   = count_strategy,
+        )
+        # response 返却
+        return self.list_response_class(data=data, meta=meta)
+
+    def _decode_cursor_values(self, cursor: str, sort_key: str) -> tuple[Any, str]:
+        """
+        カーソルをデコードして (sort_field の値, id) を返却する
+        sort_field が現在の並び順と一致しない場合は不正なカーソルとする
+        """
+        try:
+            values = decode_cursor(cursor)
+        except ValueError:
+            raise APIException(ErrorMessage.INVALID_CURSOR) from None
+        cursor_id = self._normalize_id(values.get("id"))
+        if values.get("field") != sort_key or cursor_id is None:
+            raise APIException(ErrorMessage.INVALID_CURSOR)
+
+        sort_value = values.get("value")
+        column     = getattr(self.model, sort_key)
+        # datetime 等は文字列で保持しているので カラムの型に戻す
+        if sort_value is not None and column.type.python_type is datetime.datetime:
+            try:
+                sort_value = datetime.datetime.fromisoformat(sort_value)
+            except (TypeError, ValueError):
+                raise APIException(ErrorMessage.INVALID_CURSOR) from None
+
+        return sort_value, cursor_id
+
+    def _get_keyset_condition(
+        self,
+        sort_key: str,
+        sort_value: Any,
+        cursor_id: str,
+        scan_desc: bool,
+        inclusive: bool = False,
+    ) -> Any:
+        """
+        (sort_field, id) の並びで カーソルより後 (scan_desc の場合は小さい側) のデータの条件を返却する
+        NULL は MySQL の並び順と同様に最小値として扱う. inclusive の場合はカーソルのデータを含む
+        """
+        id_col = self.model.id
+        if scan_desc:
+            id_cond = id_col <= cursor_id if inclusive else id_col < cursor_id
+        else:
+            id_cond = id_col >= cursor_id if inclusive else id_col > cursor_id
+        if sort_key == "id":
+            return id_cond
+
+        sort_col = getattr(self.model, sort_key)
+        if sort_value is None:
+            # NULL 同士は id で比較する. 昇順では NULL 以外のデータが全て後になる
+            is_null = and_(sort_col.is_(None), id_cond)
+            return is_null if scan_desc else or_(sort_col.is_not(None), is_null)
+
+        condition = or_(
+            sort_col < sort_value if scan_desc else sort_col > sort_value,
+            and_(sort_col == sort_value, id_cond),
+        )
+        # NULL との比較は真にならないため、降順では NULL のデータを明示的に含める
+        if scan_desc and sort_col.property.columns[0].nullable:
+            condition = or_(condition, sort_col.is_(None))
+        return condition
+
+    async def _exists_from_cursor(
+        self,
+        db: AsyncSession,
+        conditions: list[Any],
+        sort_key: str,
+        sort_value: Any,
+        cursor_id: str,
+        scan_desc: bool,
+        include_deleted: bool,
+        params: dict[str, Any] | None = None,
+    ) -> bool:
+        """カーソル位置 (カーソルのデータを含む) から scan_desc の方向に 条件に合致するデータが存在するか"""
+        stmt = (
+            select(self.model.id)
+            .where(*conditions, self._get_keyset_condition(sort_key, sort_value, cursor_id, scan_desc, inclusive=True))
+            .limit(1)
+            .execution_options(include_deleted=include_deleted)
+        )
+        return (await db.execute(self._union_archive(stmt, include_deleted), params)).first() is not None
+
+    async def get_cursor_paged_list(
+        self,
+        db: AsyncSession,
+        paging_query_in: CursorPagingQueryIn,
+        conditions: list[Any] | None = None,
+        sort_query_in: schemas.SortQueryIn | None = None,
+        include_deleted: bool = False,
+        loader_options: list[Any] | None = None,
+        params: dict[str, Any] | None = None,
+    ) -> ListResponseSchemaType:
+        """
+        カーソル(keyset)ページネーション付データを返却する
+        OFFSET を使用せず (sort_field, id) の組で位置を特定するため、深いページでも取得コストが一定になる
+        sort_field が NULL のデータは MySQL の並び順と同様に最小値として扱う (昇順では先頭・降順では末尾)
+        カーソル指定時は 前後のページ有無の判定のため カーソルより前 (before 指定時は後) を 1件取得する
+        loader_options 未指定時はインスタンスの list_loader_options を使用する
+        params は conditions の bindparam の値
+        """
+        conditions     = list(conditions) if conditions is not None else []
+        loader_options = self._get_loader_options(loader_options)
+        per_page       = paging_query_in.per_page
+        self._validate_per_page(per_page)
+
+        # 並び順 (sort_field, id) を決定する. id は ULID のため作成順にソート可能
+        order    = self._get_order_by_clause(sort_query_in.sort_field) if sort_query_in else None
+        sort_key = order.key if order is not None else "id"
+        sort_col = getattr(self.model, sort_key)
+        id_col   = self.model.id
+        is_desc  = bool(sort_query_in and sort_query_in.direction == SortDirectionEnum.desc)
+
+        # before 指定時は逆順に取得して、最後に反転する
+        is_backward = bool(paging_query_in.before) and not paging_query_in.after
+        cursor      = paging_query_in.before if is_backward else paging_query_in.after
+        scan_desc   = is_desc != is_backward
+
+        base_conditions = list(conditions)
+        if cursor:
+            sort_value, cursor_id = self._decode_cursor_values(cursor, sort_key)
+            conditions.append(self._get_keyset_condition(sort_key, sort_value, cursor_id, scan_desc))
+
+        if loader_options:
+            stmt = select(self.model)
+        else:
+            selects = self._get_select_columns()
+            # カーソル生成に必要なカラムが select に含まれない場合は追加する
+            for column in {sort_key: sort_col, "id": id_col}.values():
+                if all(c.key != column.key for c in selects):
+                    selects.append(column)
+            stmt = select(*selects)
+
+        order_by = [desc(sort_col), desc(id_col)] if scan_desc else [sort_col, id_col]
+        if sort_key == "id":
+            order_by = order_by[1:]
+        stmt = (
+            stmt
+            .where(*conditions)
+            .order_by(*order_by)
+            .limit(per_page + 1) # 次ページ有無の判定用に 1件多く取得する
+            .execution_options(include_deleted=include_deleted)
+        )
+        stmt = self._union_archive(stmt, include_deleted, bool(loader_options))
+        if loader_options:
+            stmt = stmt.options(*loader_options)
+        rows     = await self._fetch_list(db, stmt, params, bool(loader_options))
+        has_more = len(rows) > per_page
+        data     = rows[:per_page]
+        if is_backward:
+            data = list(reversed(data))
+
+        def make_cursor(row: Any) -> str:
+            # Row / model の object どちらも属性で値を取得できる
+            return encode_cursor({"field": sort_key, "value": getattr(row, sort_key), "id": row.id})
+
+        # カーソル位置 (カーソルのデータを含む) から逆方向にデータが存在するかは 1件の取得で判定する
+        # カーソルのデータが削除されている場合や 末尾を超えるカーソルが指定された場合も正しく判定するため
+        has_beyond_cursor = bool(cursor) and await self._exists_from_cursor(
+            db, base_conditions, sort_key, sort_value, cursor_id, not scan_desc, include_deleted, params,
+        )
+        has_next = has_beyond_cursor if is_backward else has_more
+        has_prev = has_more if is_backward else has_beyond_cursor
+        meta = schemas.CursorPagingMeta(
+            per_page    = per_page,
+            next_cursor = make_cursor(data[-1]) if data and has_next else None,
+            prev_cursor = make_cursor(data[0]) if data and has_prev else None,
+            has_next    = has_next,
+            has_prev    = has_prev,
+        )
+        return self.list_response_class(data=data, meta=meta)
+
+    async def stream_list(
+        self,
+        db: AsyncSession,
+        conditions: list[Any] | None = None,
+        sort_query_in: schemas.SortQueryIn | None = None,
+        include_deleted: bool = False,
+        order_by: list[Any] | None = None,
+        chunk_size: int | None = None,
+        params: dict[str, Any] | None = None,
+    ) -> AsyncIterator[list[Any]]:
+        """
+        条件に合致する全データを chunk_size 件毎に返却する
+        server side cursor (AsyncSession.stream) で取得するため、件数によらずメモリ使用量は一定となる
+        order_by 指定時は sort_query_in より優先して並び替える
+        params は conditions・order_by の bindparam の値
+        """
+        chunk_size = chunk_size or settings.EXPORT_CHUNK_SIZE
+
+        stmt = select(*self._select_columns)
+        if sort_query_in and not order_by:
+            stmt = sort_query_in.apply_to_quey(stmt, order_by_clause=self._get_order_by_clause(sort_query_in.sort_field))
+        if conditions:
+            stmt = stmt.where(*conditions)
+        if order_by:
+            stmt = stmt.order_by(*order_by)
+        stmt = self._union_archive(stmt, include_deleted)
+        stmt = stmt.execution_options(include_deleted=include_deleted, yield_per=chunk_size)
+
+        result = await db.stream(stmt, params)
+        async for rows in result.partitions(chunk_size):
+            yield rows
+
+    async def create(
+        self,
+        db: AsyncSession,
+        create_schema: CreateSchemaType,
+    ) -> ModelType:
+        """ データ新規作成 """
+        create_dict = jsonable_encoder(create_schema, by_alias=False) # camelCase 採用を防ぐ
+        exists_dict = self._filter_model_exists_fields(create_dict)
+
+        db_obj = self.model(**exists_dict) # db_objを生成
+        db.add(db_obj)
+        await db.flush()
+        await db.refresh(db_obj)
+
+        return db_obj
+
+
+    async def update(
+        self,
+        db: AsyncSession,
+        *,
+        db_obj: ModelType,
+        update_schema: UpdateSchemaType
+    ) -> ModelType:
+        """データ更新"""
+        db_obj_dict = jsonable_encoder(db_obj)
+        update_dict = update_schema.dict(exclude_unset=True) # 未指定カラムは更新しない
+
+        for field in db_obj_dict: # attr をセットする
+            if field in update_dict:
+                # db_obj の field の値は update_dict[field]
+                setattr(db_obj, field, update_dict[field])
+
+        db.add(db_obj)
+        await db.flush()
+        await db.refresh(db_obj)
+        return db_obj
+
+    async def delete(
+        self,
+        db: AsyncSession,
+        db_obj: ModelType
+    ) -> ModelType:
+        """soft delete 論理削除"""
+        # バリデーション
+        if not hasattr(db_obj, "deleted_at"): # deleted_at カラムが存在しない場合
+            raise APIException(ErrorMessage.SOFT_DELETE_NOT_SUPPORTED)
+        if db_obj.deleted_at:
+            raise APIException(ErrorMessage.ALREADY_DELETED)
+
+        db_obj.deleted_at = datetime.datetime.now(tz=datetime.timezone.utc) # moduleのdatetimeを取ってきている
+        db.add(db_obj)
+        await db.flush()
+        await db.refresh(db_obj)
+        return db_obj
+
+    async def hard_delete(
+        self,
+        db: AsyncSession,
+        db_obj: ModelType,
+    ) -> None:
+        """物理削除"""
+        await db.delete(db_obj)
+        await db.flush()
+
+    async def _move_to_archive(self, db: AsyncSession, table: Table, archive_table: Table, condition: Any) -> None:
+        """condition に合致する table の行を archive_table へ移動する"""
+        columns = list(table.columns)
+        await db.execute(insert(archive_table).from_select([c.name for c in columns], select(*columns).where(condition)))
+        await db.execute(delete(table).where(condition))
+
+    async def _archive_relations(self, db: AsyncSession, ids: list[str]) -> None:
+        """アーカイブする ids に紐づく 中間テーブル等の行を移動する. 必要に応じてオーバーライドする"""
+        pass
+
+    async def archive_deleted(
+        self,
+        db: AsyncSession,
+        deleted_before: datetime.datetime,
+        batch_size: int | None = None,
+    ) -> list[str]:
+        """
+        deleted_before より前に論理削除されたデータを batch_size 件 アーカイブテーブルへ移動し、移動した id を返却する
+        対象は deleted_at 順に取得し、並行実行時は 他でロック中の行を読み飛ばす
+        commit は呼び出し元で行う
+        """
+        if self.archive_table is None or not hasattr(self.model, "deleted_at"):
+            raise APIException(ErrorMessage.SOFT_DELETE_NOT_SUPPORTED)
+
+        stmt = select(self.model.id) \
+                .where(self.model.deleted_at < deleted_before) \
+                .order_by(self.model.deleted_at) \
+                .limit(batch_size or settings.ARCHIVE_BATCH_SIZE) \
+                .with_for_update(skip_locked=True) \
+                .execution_options(include_deleted=True)
+        ids = list((await db.execute(stmt)).scalars().all())
+        if not ids:
+            return ids
+
+        await self._archive_relations(db, ids)
+        await self._move_to_archive(db, self.model.__table__, self.archive_table, self.model.id.in_(ids))
+        return ids
+
+    def _iter_chunks(self, items: list[Any], batch_size: int | None = None) -> Iterator[tuple[int, list[Any]]]:
+        """items を batch_size 件毎に (先頭の index, chunk) で返却する"""
+        size = batch_size or settings.BULK_BATCH_SIZE
+        for start in range(0, len(items), size):
+            yield start, items[start:start + size]
+
+    def _summarize_bulk_response(self, response: schemas.BulkResponse) -> schemas.BulkResponse:
+        """一括処理の成功・失敗件数を集計する"""
+        succeeded_statuses = (
+            BulkItemStatusEnum.created, BulkItemStatusEnum.updated, BulkItemStatusEnum.unchanged, BulkItemStatusEnum.deleted,
+        )
+        response.succeeded = sum(1 for r in response.results if r.status in succeeded_statuses)
+        response.failed    = len(response.results) - response.succeeded
+        return response
+
+    async def create_many(
+        self,
+        db: AsyncSession,
+        create_schemas: list[CreateSchemaType],
+        batch_size: int | None = None,
+    ) -> schemas.BulkResponse:
+        """
+        データ一括新規作成
+        batch_size 件毎に multi-row INSERT を1回実行する
+        失敗した batch は savepoint で巻き戻し、その batch の全件を failed とする
+        """
+        self._validate_bulk_size(len(create_schemas))
+        response = schemas.BulkResponse()
+        for start, chunk in self._iter_chunks(create_schemas, batch_size):
+            rows = []
+            for create_schema in chunk:
+                create_dict = jsonable_encoder(create_schema, by_alias=False) # camelCase 採用を防ぐ
+                row         = self._filter_model_exists_fields(create_dict)
+                row["id"]   = row.get("id") or get_ulid() # 結果に id を返却するため事前に採番する
+                rows.append(row)
+
+            status, error = BulkItemStatusEnum.created, None
+            try:
+                async with db.begin_nested():
+                    await db.execute(insert(self.model), rows)
+            except SQLAlchemyError as e:
+                logger.warning(f"create_many failed. table={self.model.__tablename__} detail={e}")
+                status, error = BulkItemStatusEnum.failed, str(getattr(e, "orig", e))
+
+            response.results.extend(
+                schemas.BulkItemResult(index=start + i, id=row["id"], status=status, error=error)
+                for i, row in enumerate(rows)
+            )
+
+        return self._summarize_bulk_response(response)
+
+    async def update_many(
+        self,
+        db: AsyncSession,
+        items: list[tuple[str, UpdateSchemaType]],
+        batch_size: int | None = None,
+    ) -> schemas.BulkResponse:
+        """
+        データ一括更新
+        batch_size 件毎に 存在する id を1回の SELECT で確認し、
+        更新内容が同一の id をまとめて UPDATE ... WHERE id IN で更新する
+        更新するカラムが指定されていない id は更新せず unchanged とする
+        id は ULID の正規形 (大文字) で確認・返却し、ULID として不正な id は not_found とする
+        """
+        self._validate_bulk_size(len(items))
+        response = schemas.BulkResponse()
+        for start, chunk in self._iter_chunks(items, batch_size):
+            normalized_ids = {id: self._normalize_id(id) for id, _ in chunk}
+            chunk          = [(normalized_ids[id] or id, update_schema) for id, update_schema in chunk]
+            valid_ids      = [id for id in normalized_ids.values() if id is not None]
+            stmt = select(self.model.id).where(self.model.id.in_(valid_ids)).execution_options(include_deleted=False)
+            exists_ids = set((await db.execute(stmt)).scalars().all()) if valid_ids else set()
+
+            # 更新内容毎に id をまとめる
+            groups: dict[str, tuple[dict[str, Any], list[str]]] = {}
+            unchanged: set[int] = set()
+            for i, (id, update_schema) in enumerate(chunk):
+                if id not in exists_ids:
+                    continue
+                values = self._filter_model_exists_fields(update_schema.dict(exclude_unset=True)) # 未指定カラムは更新しない
+                values.pop("id", None)
+                if not values:
+                    unchanged.add(i)
+                    continue
+                key = json.dumps(jsonable_encoder(values), sort_keys=True)
+                groups.setdefault(key, (values, []))[1].append(id)
+
+            errors: dict[str, str] = {}
+            for values, group_ids in groups.values():
+                try:
+                    async with db.begin_nested():
+                        await db.execute(update(self.model).where(self.model.id.in_(group_ids)).values(**values))
+                except SQLAlchemyError as e:
+                    logger.warning(f"update_many failed. table={self.model.__tablename__} detail={e}")
+                    errors.update({id: str(getattr(e, "orig", e)) for id in group_ids})
+
+            for i, (id, _) in enumerate(chunk):
+                if id not in exists_ids:
+                    status = BulkItemStatusEnum.not_found
+                elif id in errors:
+                    status = BulkItemStatusEnum.failed
+                elif i in unchanged:
+                    status = BulkItemStatusEnum.unchanged
+                else:
+                    status = BulkItemStatusEnum.updated
+                response.results.append(
+                    schemas.BulkItemResult(index=start + i, id=id, status=status, error=errors.get(id))
+                )
+
+        return self._summarize_bulk_response(response)
+
+    async def delete_many(
+        self,
+        db: AsyncSession,
+        ids: list[str] | None = None,
+        conditions: list[Any] | None = None,
+        batch_size: int | None = None,
+    ) -> schemas.BulkResponse:
+        """
+        一括 soft delete 論理削除
+        ids 指定時は batch_size 件毎に削除状態を1回の SELECT で確認し、UPDATE ... WHERE id IN で削除する
+        conditions 指定時は 条件に合致する未削除データを1回の UPDATE で削除し、件数のみ返却する
+        id は ULID の正規形 (大文字) で確認・返却し、ULID として不正な id は not_found とする
+        """
+        if not hasattr(self.model, "deleted_at"): # deleted_at カラムが存在しない場合
+            raise APIException(ErrorMessage.SOFT_DELETE_NOT_SUPPORTED)
+        self._validate_bulk_size(len(ids or []))
+
+        now      = datetime.datetime.now(tz=datetime.timezone.utc)
+        response = schemas.BulkResponse()
+        if conditions is not None:
+            stmt = update(self.model) \
+                    .where(*conditions, self.model.deleted_at.is_(None)) \
+                    .values(deleted_at=now) \
+                    .execution_options(synchronize_session=False)
+            response.succeeded = (await db.execute(stmt)).rowcount
+            return response
+
+        for start, chunk in self._iter_chunks(ids or [], batch_size):
+            normalized_ids = {id: self._normalize_id(id) for id in chunk}
+            chunk          = [normalized_ids[id] or id for id in chunk]
+            valid_ids      = [id for id in normalized_ids.values() if id is not None]
+            stmt = select(self.model.id, self.model.deleted_at) \
+                    .where(self.model.id.in_(valid_ids)) \
+                    .execution_options(include_deleted=True)
+            deleted_at_by_id = {row.id: row.deleted_at for row in (await db.execute(stmt)).all()} if valid_ids else {}
+            target_ids       = {id for id, deleted_at in deleted_at_by_id.items() if deleted_at is None}
+            if target_ids:
+                stmt = update(self.model).where(self.model.id.in_(target_ids)).values(deleted_at=now)
+                await db.execute(stmt)
+
+            for i, id in enumerate(chunk):
+                if id not in deleted_at_by_id:
+                    status = BulkItemStatusEnum.not_found
+                elif id in target_ids:
+                    status = BulkItemStatusEnum.deleted
+                    target_ids.discard(id) # 重複指定された id は2件目以降を削除済とする
+                else:
+                    status = BulkItemStatusEnum.already_deleted
+                response.results.append(schemas.BulkItemResult(index=start + i, id=id, status=status))
+
+        return self._summarize_bulk_response(response)
@@ -0,0 +1,181 @@
+import datetime
+from typing import Any
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import select
+from app import models, schemas
+from app.core.logger import get_logger
+from app.schemas.job import JobStatusEnum
+from .base import CRUDBase
+logger = get_logger(__name__)
+
+def utcnow() -> datetime.datetime:
+    """jobs の日時は naive な UTC で保持する (SQLite では文字列で比較されるため tz を含めない)"""
+    return datetime.datetime.now(tz=datetime.timezone.utc).replace(tzinfo=None)
+
+class CRUDJob(
+    CRUDBase[
+        models.Job,
+        schemas.JobResponse,
+        schemas.JobCreate,
+        schemas.JobCreate,
+        schemas.JobsPagedResponse,
+    ],
+):
+    """
+    ジョブキューの操作
+    更新は 状態を条件とした UPDATE で行い、複数の worker から同時に実行されても 1件のジョブは1つの worker のみが取得する
+    updated_at は SQLite でも動作するよう 明示的に指定する (onupdate の utc_timestamp() は MySQL のみ)
+    """
+    async def get_by_unique_key(self, db: AsyncSession, unique_key: str) -> models.Job | None:
+        stmt = select(models.Job).where(models.Job.unique_key == unique_key)
+        return (await db.execute(stmt)).scalars().first()
+
+    async def enqueue(self, db: AsyncSession, job_in: schemas.JobCreate, max_attempts: int) -> models.Job:
+        """
+        ジョブを登録する. unique_key が登録済の場合は 登録済のジョブを返却する
+        commit は呼び出し元で行う
+        """
+        if job_in.unique_key:
+            db_obj = await self.get_by_unique_key(db, job_in.unique_key)
+            if db_obj:
+                return db_obj
+
+        now    = utcnow()
+        db_obj = models.Job(
+            job_type=job_in.job_type,
+            status=JobStatusEnum.queued.value,
+            payload=job_in.payload or {},
+            progress=0,
+            attempts=0,
+            max_attempts=job_in.max_attempts or max_attempts,
+            unique_key=job_in.unique_key,
+            run_at=job_in.run_at.replace(tzinfo=None) if job_in.run_at else now,
+            created_at=now,
+            updated_at=now,
+        )
+        try:
+            # 同一 unique_key の同時登録は unique 制約で検出する
+            async with db.begin_nested():
+                db.add(db_obj)
+        except IntegrityError:
+            existing = await self.get_by_unique_key(db, job_in.unique_key) if job_in.unique_key else None
+            if existing is None:
+                raise
+            return existing
+        return db_obj
+
+    async def claim(self, db: AsyncSession, job_type: str, worker_id: str, limit: int) -> list[models.Job]:
+        """
+        実行時刻を過ぎた job_type のジョブを最大 limit 件取得し running に更新する
+        MySQL では 他の worker がロック中の行を読み飛ばし、SQLite では UPDATE の件数で取得できたか判定する
+        """
+        now  = utcnow()
+        stmt = select(models.Job.id) \
+                .where(models.Job.job_type == job_type) \
+                .where(models.Job.status == JobStatusEnum.queued.value) \
+                .where(models.Job.run_at <= now) \
+                .order_by(models.Job.run_at) \
+                .limit(limit) \
+                .with_for_update(skip_locked=True)
+        ids = list((await db.execute(stmt)).scalars().all())
+
+        claimed = []
+        for id in ids:
+            result = await db.execute(
+                update(models.Job)
+                .where(models.Job.id == id, models.Job.status == JobStatusEnum.queued.value)
+                .values(
+                    status=JobStatusEnum.running.value,
+                    attempts=models.Job.attempts + 1,
+                    progress=0,
+                    locked_by=worker_id,
+                    locked_at=now,
+                    started_at=now,
+                    updated_at=now,
+                )
+            )
+            if result.rowcount == 1:
+                claimed.append(id)
+        if not claimed:
+            return []
+        stmt = select(models.Job).where(models.Job.id.in_(claimed)).execution_options(populate_existing=True)
+        return list((await db.execute(stmt)).scalars().all())
+
+    async def heartbeat(self, db: AsyncSession, worker_id: str, progresses: dict[str, int]) -> None:
+        """実行中のジョブの進捗と locked_at を更新する"""
+        now = utcnow()
+        for id, progress in progresses.items():
+            await db.execute(
+                update(models.Job)
+                .where(models.Job.id == id, models.Job.locked_by == worker_id)
+                .values(progress=progress, locked_at=now, updated_at=now)
+            )
+
+    async def complete(self, db: AsyncSession, id: str, worker_id: str, result: Any) -> None:
+        now = utcnow()
+        await db.execute(
+            update(models.Job)
+            .where(models.Job.id == id, models.Job.locked_by == worker_id)
+            .values(
+                status=JobStatusEnum.succeeded.value,
+                result=result,
+                error=None,
+                progress=100,
+                locked_by=None,
+                locked_at=None,
+                finished_at=now,
+                updated_at=now,
+            )
+        )
+
+    async def fail(
+        self,
+        db: AsyncSession,
+        id: str,
+        worker_id: str,
+        error: str,
+        retry_at: datetime.datetime | None,
+    ) -> None:
+        """ジョブの失敗を記録する. retry_at 指定時は その時刻に再実行する"""
+        now    = utcnow()
+        values = {"error": error, "locked_by": None, "locked_at": None, "updated_at": now}
+        if retry_at is None:
+            values.update(status=JobStatusEnum.failed.value, finished_at=now)
+        else:
+            values.update(status=JobStatusEnum.queued.value, run_at=retry_at)
+        await db.execute(
+            update(models.Job)
+            .where(models.Job.id == id, models.Job.locked_by == worker_id)
+            .values(**values)
+        )
+
+    async def requeue_stale(self, db: AsyncSession, locked_before: datetime.datetime) -> int:
+        """
+        locked_before 以降 heartbeat のない running のジョブ (worker の停止等) を再実行待ちに戻し、件数を返却する
+        試行回数が上限に達している場合は failed とする
+        """
+        now   = utcnow()
+        stale  = (models.Job.status == JobStatusEnum.running.value) & (models.Job.locked_at < locked_before)
+        values = {"locked_by": None, "locked_at": None, "updated_at": now, "error": "worker lost"}
+        retried = await db.execute(
+            update(models.Job)
+            .where(stale, models.Job.attempts < models.Job.max_attempts)
+            .values(status=JobStatusEnum.queued.value, run_at=now, **values)
+        )
+        failed = await db.execute(
+            update(models.Job)
+            .where(stale)
+            .values(status=JobStatusEnum.failed.value, finished_at=now, **values)
+        )
+        count = retried.rowcount + failed.rowcount
+        if count:
+            logger.warning(f"stale jobs recovered. retried={retried.rowcount} failed={failed.rowcount}")
+        return count
+
+job = CRUDJob(
+    models.Job,
+    response_schema_class=schemas.JobResponse,
+    list_response_class=schemas.JobsPagedResponse,
+)
\ No newline at end of file
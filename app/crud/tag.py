@@ -1,37 +1,188 @@
-from fastapi.encoders import jsonable_encoder
-from sqlalchemy.dialects.mysql import insert
-from sqlalchemy.orm import Session
-from sqlalchemy.sql import select
-from app import models, schemas
-from .base import CRUDBase
-
-class CRUDTag(
-    CRUDBase[
-        models.Tag,
-        schemas.TagResponse,
-        schemas.TagCreate,
-        schemas.TagUpdate,
-        schemas.TagsPagedResponse,
-    ],
-):
-    def upsert_tags(self, db: Session, tag_in: list[schemas.TagCreate]) -> list[models.Tag]:
-        """ tag の upsert を実行して tags 一覧を返却する """
-        tags_in_list = jsonable_encoder(tag_in)
-        insert_stmt  = insert(models.Tag).values(tags_in_list)
-        # upsertを設定
-        insert_stmt  = insert_stmt.on_duplicated_key_update(name=insert_stmt.inserted.name)
-        # insert を実行数
-        db.execute(insert_stmt)
-
-        tag_names = (x.name for x in tag_in)
-        # in 句指定でtagを取得して返却する
-        stmt      = select(models.Tag).where(models.Tag.name.in_(tag_names))
-        tags      = db.execute(stmt).scalars().all()
-
-        return tags
-
-tag = CRUDTag(
-    models.Tag,
-    response_schema_class=schemas.TagResponse,
-    list_response_class=schemas.TagsPagedResponse
+import datetime
+from typing import Any
+from sqlalchemy import event
+from sqlalchemy.dialects.mysql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import select
+from app import models, schemas
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.logger import get_logger
+from .base import CRUDBase
+logger = get_logger(__name__)
+
+# tag名 (tag_name_key) → id のキャッシュ. tags.name は unique のため 一度採番された id はほぼ変わらない
+tag_id_cache = TTLCache(
+    maxsize=settings.TAG_ID_CACHE_MAXSIZE,
+    ttl=settings.TAG_ID_CACHE_TTL_SECONDS,
+)
+# upsert 1回 + id 取得 1回
+UPSERT_ROUND_TRIPS = 2
+# commit 前の tag は rollback される可能性があるため session.info に保持し、commit 後にキャッシュへ登録する
+_PENDING_TAG_IDS_KEY = "pending_tag_ids"
+_stats = {"calls": 0, "round_trips_saved": 0}
+
+def tag_name_key(name: str) -> str:
+    """
+    tags.name の照合順序 (utf8mb4_unicode_ci) で同一となる名前を同じ値にする
+    大文字・小文字を区別せず、末尾の空白を無視する (PAD SPACE)
+    """
+    return name.rstrip(" ").casefold()
+
+@event.listens_for(Session, "after_commit")
+def _apply_pending_tag_ids(session: Session) -> None:
+    pending = session.info.pop(_PENDING_TAG_IDS_KEY, None)
+    if pending and settings.TAG_ID_CACHE_TTL_SECONDS > 0:
+        for name, id in pending.items():
+            tag_id_cache.set(name, id)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending_tag_ids(session: Session) -> None:
+    session.info.pop(_PENDING_TAG_IDS_KEY, None)
+
+def invalidate_tag_ids(db: AsyncSession, ids: set[str] | None = None) -> int:
+    """
+    tag名 → id のキャッシュを破棄し、破棄件数を返却する
+    ids 未指定時は全件破棄する
+    """
+    pending = db.info.get(_PENDING_TAG_IDS_KEY, {})
+    if ids is None:
+        pending.clear()
+        count = len(tag_id_cache)
+        tag_id_cache.clear()
+        return count
+    for name in [name for name, id in pending.items() if id in ids]:
+        del pending[name]
+    return tag_id_cache.invalidate(lambda _, id: id in ids)
+
+def get_unverified_tag_ids(db: AsyncSession, ids: set[str]) -> set[str]:
+    """
+    ids のうち キャッシュから取得し、この transaction で存在を確認していない id を返却する
+    キャッシュはプロセス毎のため 他プロセス (ワーカー・ジョブ) で物理削除・アーカイブされた tag の id が残っている場合がある
+    """
+    verified = set(db.info.get(_PENDING_TAG_IDS_KEY, {}).values())
+    return ids - verified
+
+def get_tag_cache_stats() -> dict[str, int]:
+    """tag名 → id キャッシュの hit/miss 数・削減した DB 往復回数を返却する"""
+    return {**tag_id_cache.stats(), **_stats}
+
+class CRUDTag(
+    CRUDBase[
+        models.Tag,
+        schemas.TagResponse,
+        schemas.TagCreate,
+        schemas.TagUpdate,
+        schemas.TagsPagedResponse,
+    ],
+):
+    async def upsert_tags(self, db: AsyncSession, tag_in: list[schemas.TagCreate]) -> dict[str, str]:
+        """
+        tag の upsert を実行して {tag名: id} を返却する
+        tags.name の照合順序 (utf8mb4_unicode_ci) で同一となる tag は 1件にまとめ、
+        キャッシュに存在しない tag のみ upsert 1回 + id 取得 1回で処理する
+        既存の tag の名前 (大文字・小文字等) は変更しない
+        """
+        names = list(dict.fromkeys(x.name for x in tag_in if x.name))
+        if not names:
+            return {}
+        # 照合順序で同一となる名前は 先に指定された名前で upsert する
+        tag_names: dict[str, str] = {}
+        for name in names:
+            tag_names.setdefault(tag_name_key(name), name)
+
+        pending = db.info.setdefault(_PENDING_TAG_IDS_KEY, {})
+        key_ids: dict[str, str] = {}
+        misses: list[str]       = []
+        for key, name in tag_names.items():
+            id = pending.get(key)
+            if id is None and settings.TAG_ID_CACHE_TTL_SECONDS > 0:
+                id = tag_id_cache.get(key)
+            if id is None:
+                misses.append(name)
+            else:
+                key_ids[key] = id
+
+        if misses:
+            insert_stmt = insert(models.Tag).values([{"name": name} for name in misses])
+            # upsertを設定. 既存の tag は更新しない
+            insert_stmt = insert_stmt.on_duplicate_key_update(id=models.Tag.id)
+            await db.execute(insert_stmt)
+
+            # in 句指定で tag の id と name のみ取得する
+            stmt    = select(models.Tag.id, models.Tag.name).where(models.Tag.name.in_(misses))
+            fetched = {tag_name_key(name): id for id, name in (await db.execute(stmt)).all()}
+            for name in misses:
+                key = tag_name_key(name)
+                if key not in fetched:
+                    # アクセント等 tag_name_key で同一とみなせない名前は DB の照合順序で 1件ずつ取得する
+                    fetched[key] = (await db.execute(select(models.Tag.id).where(models.Tag.name == name))).scalar_one()
+            pending.update(fetched)
+            key_ids.update(fetched)
+
+        round_trips_saved = 0 if misses else UPSERT_ROUND_TRIPS
+        _stats["calls"] += 1
+        _stats["round_trips_saved"] += round_trips_saved
+        logger.debug(
+            f"upsert_tags. tags={len(tag_names)} hits={len(tag_names) - len(misses)} "
+            f"misses={len(misses)} round_trips_saved={round_trips_saved}"
+        )
+        return {name: key_ids[tag_name_key(name)] for name in names}
+
+    async def update(self, db: AsyncSession, *, db_obj: models.Tag, update_schema: schemas.TagUpdate) -> models.Tag: # type: ignore[override]
+        """update を オーバーライド.. 名前が変わるため キャッシュを破棄する"""
+        tag = await super().update(db, db_obj=db_obj, update_schema=update_schema)
+        invalidate_tag_ids(db, {tag.id})
+        return tag
+
+    async def delete(self, db: AsyncSession, db_obj: models.Tag) -> models.Tag:
+        """delete を オーバーライド.. キャッシュを破棄する"""
+        tag = await super().delete(db, db_obj)
+        invalidate_tag_ids(db, {tag.id})
+        return tag
+
+    async def hard_delete(self, db: AsyncSession, db_obj: models.Tag) -> None:
+        """hard_delete を オーバーライド.. キャッシュを破棄する"""
+        tag_id = db_obj.id
+        await super().hard_delete(db, db_obj)
+        invalidate_tag_ids(db, {tag_id})
+
+    async def delete_many(
+        self,
+        db: AsyncSession,
+        ids: list[str] | None = None,
+        conditions: list[Any] | None = None,
+        batch_size: int | None = None,
+    ) -> schemas.BulkResponse:
+        """delete_many を オーバーライド.. 削除した tag のキャッシュを破棄する"""
+        response = await super().delete_many(db, ids=ids, conditions=conditions, batch_size=batch_size)
+        if conditions is not None: # conditions 指定時は削除した id が不明なため全件破棄する
+            invalidate_tag_ids(db)
+        else:
+            invalidate_tag_ids(db, {r.id for r in response.results if r.status == schemas.BulkItemStatusEnum.deleted})
+        return response
+
+    async def _archive_relations(self, db: AsyncSession, ids: list[str]) -> None:
+        """_archive_relations を オーバーライド.. tag に紐づく todos_tags を移動する"""
+        await self._move_to_archive(
+            db, models.TodoTag.__table__, models.todos_tags_archive, models.TodoTag.tag_id.in_(ids),
+        )
+
+    async def archive_deleted( # type: ignore[override]
+        self,
+        db: AsyncSession,
+        deleted_before: datetime.datetime,
+        batch_size: int | None = None,
+    ) -> list[str]:
+        """archive_deleted を オーバーライド.. 同じ名前の tag を新たに作成できるため キャッシュを破棄する"""
+        ids = await super().archive_deleted(db, deleted_before, batch_size)
+        invalidate_tag_ids(db, set(ids))
+        return ids
+
+tag = CRUDTag(
+    models.Tag,
+    response_schema_class=schemas.TagResponse,
+    list_response_class=schemas.TagsPagedResponse,
+    archive_table=models.tags_archive,
 )
\ No newline at end of file
@@ -1,75 +1,331 @@
-from sqlalchemy import or_
-from sqlalchemy.dialects.mysql import insert
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import Session, contains_eager
-from sqlalchemy.sql import select
-from app import crud, models, schemas
-from .base import CRUDBase
-
-class CRUDTodo(
-    CRUDBase[
-        models.Todo,
-        schemas.TagResponse,
-        schemas.TagCreate,
-        schemas.TagUpdate,
-        schemas.TagsPagedResponse,
-    ],
-):
-    async def get_paged_list( # type: ignore[override]
-        self,
-        db: AsyncSession,
-        paging_query_in: schemas.PagingQueryIn,
-        q: str | None = None,
-        sort_query_in: schemas.SortQueryIn | None = None,
-        include_deleted: bool = False,
-    ) -> schemas.TodosPagedResponse:
-        """
-        get_paged_list を オーバーライド.. where句を追加する
-        """
-        conditions = (
-            [
-                or_(
-                    models.Todo.title.like(f"%{q}%"),
-                    models.Todo.description.like(f"%{q}%")
-                ),
-            ]
-            if q else []
-        )
-
-        data = await super().get_paged_list(
-            db,
-            paging_query_in,
-            conditions,
-            sort_query_in,
-            include_deleted
-        )
-
-        return data
-
-    def add_tags_to_todo(self, db:Session, todo: models.Todo, tags_in: list[schemas.TagCreate]) -> models.Todo:
-        """TODOが単独がある場合に、Tagsとのリレーションを作成する"""
-        # Tags を upsert してデータを受け取り、整形してlist[dict]に格納する
-        # TodoTag insert value を作成する
-        tags   = crud.tag.upsert_tags(db, tag_in=tags_in)
-        t_data = [{"todo_id": todo.id, "tag_id": tag.id} for tag in tags]
-
-        # TodoTag を作成する by upsert
-        stmt = insert(models.TodoTag).values(t_data)
-        stmt = stmt.on_duplicate_key_update(tag_id=stmt.inserted.tag_id)
-        db.execute(stmt)
-
-        stmt = (
-            select(models.Todo)
-            .outerjoin(models.Todo.tags) # TodoTag　を経由して tags とリレーションを取得する
-            .options(contains_eager(models.Todo.tags)) # eager load を指定する
-            .where(models.Todo.id == todo.id)
-        )
-        todo = db.execute(stmt).scalars().unique().first() # 非重複でデータを取得する
-
-        return todo
-
-todo = CRUDTodo(
-    models.Todo,
-    response_schema_class=schemas.TodoResponse,
-    list_response_class=schemas.TodosPagedResponse,
+from collections.abc import AsyncIterator
+from typing import Any
+from sqlalchemy import bindparam
+from sqlalchemy.dialects.mysql import insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import contains_eager, selectinload
+from sqlalchemy.sql import func, select
+from app import crud, models, schemas
+from app.core.config import settings
+from app.core.etag import make_etag
+from app.core.search import SearchBackend, get_search_backend
+from app.core.utils import normalize_ulid
+from .base import CRUDBase
+from .tag import get_unverified_tag_ids, invalidate_tag_ids
+
+class CRUDTodo(
+    CRUDBase[
+        models.Todo,
+        schemas.TagResponse,
+        schemas.TagCreate,
+        schemas.TagUpdate,
+        schemas.TagsPagedResponse,
+    ],
+):
+    search_backend: SearchBackend = get_search_backend(
+        settings.TODOS_SEARCH_BACKEND, fields=("title", "description"),
+    )
+
+    async def _get_search_conditions(self, db: AsyncSession, q: str | None) -> tuple[list[Any], dict[str, Any]]:
+        """q から where句 と その bindparam の値を生成する"""
+        if not q:
+            return [], {}
+        await self.search_backend.prepare(db, self.model)
+        return self.search_backend.get_conditions(self.model), self.search_backend.get_params(q)
+
+    def _get_search_order_by(self, q: str | None, sort_query_in: schemas.SortQueryIn | None) -> list[Any] | None:
+        """関連度順が指定された場合、検索バックエンドの order by を返却する"""
+        if not q or not sort_query_in or sort_query_in.sort_field != schemas.TodoSortFieldEnum.relevance:
+            return None
+        return self.search_backend.get_relevance_order_by(self.model) or None
+
+    def _get_search_conditions_key(self, order_by: list[Any] | None = None) -> tuple[str, ...]:
+        """検索条件を含む statement のキャッシュキー. 条件の構造は 検索バックエンド・関連度順の有無で決まる"""
+        return ("search", self.search_backend.name, "relevance" if order_by else "")
+
+    async def get_paged_list( # type: ignore[override]
+        self,
+        db: AsyncSession,
+        paging_query_in: schemas.PagingQueryIn,
+        q: str | None = None,
+        sort_query_in: schemas.SortQueryIn | None = None,
+        include_deleted: bool = False,
+        count_strategy: schemas.CountStrategyEnum | None = None,
+        loader_options: list[Any] | None = None,
+    ) -> schemas.TodosPagedResponse:
+        """
+        get_paged_list を オーバーライド.. where句を追加する
+        """
+        conditions, params = await self._get_search_conditions(db, q)
+        order_by           = self._get_search_order_by(q, sort_query_in)
+
+        data = await super().get_paged_list(
+            db,
+            paging_query_in,
+            conditions,
+            sort_query_in,
+            include_deleted,
+            count_strategy,
+            order_by=order_by,
+            loader_options=loader_options,
+            conditions_key=self._get_search_conditions_key(order_by),
+            params=params,
+        )
+
+        return data
+
+    async def get_cursor_paged_list( # type: ignore[override]
+        self,
+        db: AsyncSession,
+        paging_query_in: schemas.CursorPagingQueryIn,
+        q: str | None = None,
+        sort_query_in: schemas.SortQueryIn | None = None,
+        include_deleted: bool = False,
+        loader_options: list[Any] | None = None,
+    ) -> schemas.TodosPagedResponse:
+        """
+        get_cursor_paged_list を オーバーライド.. where句を追加する
+        """
+        conditions, params = await self._get_search_conditions(db, q)
+
+        return await super().get_cursor_paged_list(
+            db,
+            paging_query_in,
+            conditions,
+            sort_query_in,
+            include_deleted,
+            loader_options,
+            params,
+        )
+
+    async def stream_list( # type: ignore[override]
+        self,
+        db: AsyncSession,
+        q: str | None = None,
+        sort_query_in: schemas.SortQueryIn | None = None,
+        include_deleted: bool = False,
+        chunk_size: int | None = None,
+    ) -> AsyncIterator[list[Any]]:
+        """
+        stream_list を オーバーライド.. get_paged_list と同じ where句・並び順を適用する
+        """
+        conditions, params = await self._get_search_conditions(db, q)
+
+        async for rows in super().stream_list(
+            db,
+            conditions,
+            sort_query_in,
+            include_deleted,
+            order_by=self._get_search_order_by(q, sort_query_in),
+            chunk_size=chunk_size,
+            params=params,
+        ):
+            yield rows
+
+    @staticmethod
+    def _get_tags_etag_columns() -> list[Any]:
+        """
+        レスポンスに含まれる tags の変更を ETag に反映するための集計
+        tag の付与・解除・tag 名の変更は todo の updated_at を更新しないため、
+        紐付けの件数・最大の id (ULID のため 付け替えると増加する) と tag の更新日時を加える
+        """
+        return [
+            func.count(models.TodoTag.id),
+            func.max(models.TodoTag.id),
+            func.max(models.Tag.updated_at),
+        ]
+
+    async def get_etag( # type: ignore[override]
+        self,
+        db: AsyncSession,
+        id: str,
+        include_deleted: bool = False,
+    ) -> str | None:
+        """get_etag を オーバーライド.. レスポンスに含まれる tags の変更も ETag に反映する"""
+        id = self._normalize_id(id)
+        if id is None:
+            return None
+        sql = self._get_cached_statement(
+            ("etag", include_deleted),
+            lambda: self._union_archive(
+                select(models.Todo.id, models.Todo.updated_at, *self._get_tags_etag_columns())
+                    .outerjoin(models.TodoTag, models.TodoTag.todo_id == models.Todo.id)
+                    .outerjoin(models.Tag, models.Tag.id == models.TodoTag.tag_id)
+                    .where(models.Todo.id == bindparam("id"))
+                    .group_by(models.Todo.id, models.Todo.updated_at)
+                    .execution_options(include_deleted=include_deleted),
+                include_deleted,
+            ),
+        )
+        row = (await db.execute(sql, {"id": id})).first()
+        return make_etag(*row) if row else None
+
+    async def get_list_etag( # type: ignore[override]
+        self,
+        db: AsyncSession,
+        q: str | None = None,
+        include_deleted: bool = False,
+        query_params: str = "",
+    ) -> str:
+        """
+        get_list_etag を オーバーライド.. q の where句を追加し、一覧に含まれる tags の変更も ETag に反映する
+        todo の件数・max(updated_at) と 紐づく tag の集計を 1回のクエリで取得する
+        """
+        conditions, params = await self._get_search_conditions(db, q)
+
+        def factory() -> Any:
+            sql = (
+                select(func.count(models.Todo.id.distinct()), func.max(models.Todo.updated_at), *self._get_tags_etag_columns())
+                .outerjoin(models.TodoTag, models.TodoTag.todo_id == models.Todo.id)
+                .outerjoin(models.Tag, models.Tag.id == models.TodoTag.tag_id)
+                .where(*conditions)
+                .execution_options(include_deleted=include_deleted)
+            )
+            return self._union_archive(sql, include_deleted)
+
+        sql = self._get_list_statement(
+            ("list_etag", include_deleted), factory, conditions, None, self._get_search_conditions_key(), [],
+        )
+        return make_etag(query_params, *(await db.execute(sql, params)).one())
+
+    async def create(self, db: AsyncSession, create_schema: schemas.TodoCreate) -> models.Todo: # type: ignore[override]
+        """create を オーバーライド.. 検索インデックスに反映する"""
+        todo = await super().create(db, create_schema)
+        self.search_backend.stage_index(db, todo)
+        return todo
+
+    async def update( # type: ignore[override]
+        self,
+        db: AsyncSession,
+        *,
+        db_obj: models.Todo,
+        update_schema: schemas.TodoUpdate
+    ) -> models.Todo:
+        """update を オーバーライド.. 検索インデックスに反映する"""
+        todo = await super().update(db, db_obj=db_obj, update_schema=update_schema)
+        self.search_backend.stage_index(db, todo)
+        return todo
+
+    async def hard_delete(self, db: AsyncSession, db_obj: models.Todo) -> None: # type: ignore[override]
+        """hard_delete を オーバーライド.. 検索インデックスから削除する"""
+        await super().hard_delete(db, db_obj)
+        self.search_backend.stage_remove(db, db_obj.id)
+
+    async def _archive_relations(self, db: AsyncSession, ids: list[str]) -> None:
+        """_archive_relations を オーバーライド.. todo に紐づく todos_tags を移動する"""
+        await self._move_to_archive(
+            db, models.TodoTag.__table__, models.todos_tags_archive, models.TodoTag.todo_id.in_(ids),
+        )
+
+    async def _reindex(self, db: AsyncSession, ids: list[str]) -> None:
+        """一括処理後に 検索インデックスへ反映する"""
+        if not self.search_backend.needs_index or not ids:
+            return
+        columns = [self.model.id, *[getattr(self.model, f) for f in self.search_backend.fields]]
+        stmt    = select(*columns).where(self.model.id.in_(ids)).execution_options(include_deleted=True)
+        for row in (await db.execute(stmt)).all():
+            self.search_backend.stage_index(db, dict(row._mapping))
+
+    async def create_many( # type: ignore[override]
+        self,
+        db: AsyncSession,
+        create_schemas: list[schemas.TodoCreate],
+        batch_size: int | None = None,
+    ) -> schemas.BulkResponse:
+        """create_many を オーバーライド.. 検索インデックスに反映する"""
+        response = await super().create_many(db, create_schemas, batch_size)
+        if self.search_backend.needs_index:
+            for result, create_schema in zip(response.results, create_schemas):
+                if result.status == schemas.BulkItemStatusEnum.created:
+                    self.search_backend.stage_index(db, {"id": result.id, **create_schema.dict()})
+        return response
+
+    async def update_many( # type: ignore[override]
+        self,
+        db: AsyncSession,
+        items: list[tuple[str, schemas.TodoUpdate]],
+        batch_size: int | None = None,
+    ) -> schemas.BulkResponse:
+        """update_many を オーバーライド.. 検索インデックスに反映する"""
+        response = await super().update_many(db, items, batch_size)
+        updated  = [r.id for r in response.results if r.status == schemas.BulkItemStatusEnum.updated]
+        await self._reindex(db, updated)
+        return response
+
+    @staticmethod
+    def _get_todo_tag_pairs(
+        items: list[tuple[str, list[schemas.TagCreate]]],
+        tag_ids: dict[str, str],
+    ) -> list[tuple[str, str]]:
+        """TodoTag insert value を作成する (同一 todo・tag の組は 1件にまとめる)"""
+        return list(dict.fromkeys(
+            (todo_id, tag_ids[tag.name]) for todo_id, tags_in in items for tag in tags_in if tag.name
+        ))
+
+    async def _insert_todo_tags(self, db: AsyncSession, pairs: list[tuple[str, str]]) -> None:
+        """TodoTag を作成する by upsert"""
+        stmt = insert(models.TodoTag).values([{"todo_id": todo_id, "tag_id": tag_id} for todo_id, tag_id in pairs])
+        stmt = stmt.on_duplicate_key_update(tag_id=stmt.inserted.tag_id)
+        await db.execute(stmt)
+
+    async def add_tags_to_todos(
+        self,
+        db: AsyncSession,
+        items: list[tuple[str, list[schemas.TagCreate]]],
+    ) -> list[models.Todo]:
+        """
+        複数の todo に Tags とのリレーションを作成する
+        tag 名は一括で重複排除し、tag の upsert・id 取得・TodoTag の insert・todo の取得を 各1回で処理する
+        """
+        # todo の id は取得結果と対応付けるため ULID の正規形 (大文字) にする
+        items   = [(normalize_ulid(todo_id), todo_tags_in) for todo_id, todo_tags_in in items]
+        # Tags を upsert して {tag名: id} を受け取る
+        tags_in = [tag for _, todo_tags_in in items for tag in todo_tags_in]
+        self._validate_bulk_size(max(len(items), len(tags_in)))
+        tag_ids = await crud.tag.upsert_tags(db, tag_in=tags_in)
+        pairs   = self._get_todo_tag_pairs(items, tag_ids)
+        if pairs:
+            try:
+                await self._insert_todo_tags(db, pairs)
+            except IntegrityError:
+                # キャッシュの id は他プロセスで削除・アーカイブ済みの場合があるため、
+                # 外部キー制約違反となった場合は キャッシュを破棄して tag を upsert し直す
+                # (MySQL は失敗した文のみ取り消し transaction は継続するため savepoint は使用しない)
+                unverified = get_unverified_tag_ids(db, {tag_id for _, tag_id in pairs})
+                if not unverified:
+                    raise
+                invalidate_tag_ids(db, unverified)
+                tag_ids = await crud.tag.upsert_tags(db, tag_in=tags_in)
+                await self._insert_todo_tags(db, self._get_todo_tag_pairs(items, tag_ids))
+
+        todo_ids = list(dict.fromkeys(todo_id for todo_id, _ in items))
+        stmt = (
+            select(models.Todo)
+            .outerjoin(models.Todo.tags) # TodoTag　を経由して tags とリレーションを取得する
+            .options(contains_eager(models.Todo.tags)) # eager load を指定する
+            .where(models.Todo.id.in_(todo_ids))
+            .execution_options(populate_existing=True) # session 内の取得済み todo の tags も更新する
+        )
+        todos = {todo.id: todo for todo in (await db.execute(stmt)).scalars().unique().all()} # 非重複でデータを取得する
+        return [todos[todo_id] for todo_id in todo_ids if todo_id in todos]
+
+    async def add_tags_to_todo(
+        self,
+        db: AsyncSession,
+        todo: models.Todo,
+        tags_in: list[schemas.TagCreate],
+    ) -> models.Todo:
+        """TODOが単独がある場合に、Tagsとのリレーションを作成する"""
+        todos = await self.add_tags_to_todos(db, [(todo.id, tags_in)])
+        return todos[0]
+
+todo = CRUDTodo(
+    models.Todo,
+    response_schema_class=schemas.TodoResponse,
+    list_response_class=schemas.TodosPagedResponse,
+    count_strategy=schemas.CountStrategyEnum(settings.TODOS_COUNT_STRATEGY),
+    # 一覧でも tags を返却するため ページ分の tags を IN 句の1クエリで取得する
+    list_loader_options=[selectinload(models.Todo.tags)],
+    archive_table=models.todos_archive,
 )
\ No newline at end of file
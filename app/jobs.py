@@ -0,0 +1,35 @@
+"""
+バックグラウンドジョブの定義
+worker・API からは app.core.jobs.load_jobs() で読み込む
+"""
+import asyncio
+import time
+from collections.abc import Callable
+from typing import Any
+from app.core.config import settings
+from app.core.jobs import register_job, register_periodic
+from app.core.logger import get_logger
+logger = get_logger(__name__)
+
+@register_job("long_process_thread", executor="thread", concurrency=2)
+def long_process_thread(payload: dict[str, Any], report_progress: Callable[[int], None]) -> None:
+    for i in range(100):
+        logger.info(f"[long_process_thread(id={payload['id']})] {i + 1}sec")
+        time.sleep(1)
+        report_progress(i + 1)
+
+@register_job("long_process_async", executor="async", concurrency=10)
+async def long_process_async(payload: dict[str, Any], report_progress: Callable[[int], None]) -> None:
+    for i in range(100):
+        logger.info(f"[long_process_asyncio(id={payload['id']})] {i+1}sec")
+        await asyncio.sleep(1)
+        report_progress(i + 1)
+
+@register_job("archive_soft_deleted", executor="async", concurrency=1, max_attempts=1)
+async def archive_soft_deleted(payload: dict[str, Any], report_progress: Callable[[int], None]) -> dict[str, int]:
+    """論理削除後 保持期間を過ぎたデータのアーカイブ. 失敗時は次回の定期実行で再実行する"""
+    from app.core.archive import archive_soft_deleted
+    return await archive_soft_deleted(payload.get("retention_days"), payload.get("batch_size"))
+
+if settings.ARCHIVE_INTERVAL_SECONDS > 0:
+    register_periodic("archive_soft_deleted", settings.ARCHIVE_INTERVAL_SECONDS)
\ No newline at end of file
@@ -1,70 +1,134 @@
-import logging
-import senty_sdk
-from debug_toolbar.middleware import DebugToolbarMiddleware
-from fastapi import FastAPI
-from mangum import Mamgum
-from sentry_sdk.integrations.asgi import SentryAsgiMiddleware
-from sentry_sdk.integrations.logging import LoggingIntegration
-from sentry_sdk.integrations.sqlalchemy import SqlalchemyIntegration
-from starlette.middleware.cors import CORSMiddleware
-from app.api.endpoints import auth, tasks, todos, users
-from app.core.config import settings
-from app.core.logger import get_logger
-
-#
-# logging
-# ログをセットアップする
-#
-logger = get_logger(__name__)
-# こんなクラスが突然定義されるものなのか？
-class NoParsingFilter(logging.Filter):
-    def filter(self, record: logging.LogRecord) -> bool:
-        return not (record.getMessage().find("/docs") >= 0)
-# 定義したfilterクラスを引数に使用 /docsのログが大量に表示されるのを防ぐ
-logging.getLogger("uvicorn.access").addFilter(NoParsingFilter())
-
-
-sentry_logging = LoggingIntegration(level=logging.INFO, event_level=logging.ERROR)
-if settings.SENTRY_SDK_DNS:
-    sentry_sdk.init(
-        dsn=settings.SENTRY_SDK_DNS,
-        integrations=[sentry_logging, SqlalchemyIntegration()],
-        environment=settings.ENV,
-    )
-
-# app 定義
-app = FastAPI(
-    title=f"[{settings.ENV}]{settings.TITLE}",
-    version=settings.VERSION,
-    debug=settings.DEBUG or False,
-    root_path=f"{settings.API_GATEWAY_STAGE_PATH}/",
-)
-
- # middleware追加
-app.add_middleware(SentryAsgiMiddleware)
-app,add_middleware(
-    CORSMiddleware,
-    allow_origins=[str(origin) for origin in settings.CORS_ORIGINS],
-    allow_origin_regex=r"^https?:\/\/([\w\-\_]{1,}\.|)example\.com",
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-@app.get("/", tags=["info"])
-def get_info() -> dict[str, str]:
-    return {"title": settings.TITLE, "version": settings.VERSION}
-
-# ルーティング追加
-app.include_router(auth.router, tags=["Auth"], prefix="/auth")
-app.include_router(users.router, tags=["Users"], prefix="/users")
-app.include_router(todos.router, tags=["Todos"], prefix="/todos")
-app.include_router(tasks.router, tags=["Tasks"], prefix="/tasks")
-
-# debug 設定を制御する
-if settings.DEBUG:
-    app.add_middleware(
-        DebugToolbarMiddleware,
-        panels=["debug_toolbar.panels.sqlalchemy.SQLAlchemyPanel"],
-    )
-
-handler = Mangum(app)
\ No newline at end of file
+import asyncio
+import logging
+from typing import Any
+from fastapi import FastAPI
+from starlette.middleware.cors import CORSMiddleware
+from app import crud
+from app.api.endpoints import auth, language, metrics, task, todos, users
+from app.core.config import settings
+from app.core.database import ReadYourWritesMiddleware, get_async_session_factory
+from app.core.logger import get_logger, setup_logging, stop_queue_logging
+from app.core.metrics import MetricsMiddleware, request_metrics
+from app.core.query_detector import QueryDetectorMiddleware, query_detector
+from app.core.request_context import RequestContextMiddleware
+
+#
+# logging
+# ログをセットアップする
+#
+setup_logging()
+logger = get_logger(__name__)
+
+def init_sentry() -> None:
+    """
+    Sentry を初期化する
+    コールドスタート時の import を軽くするため、DSN 設定時のみ sentry_sdk を import する
+    """
+    import sentry_sdk
+    from sentry_sdk.integrations.logging import LoggingIntegration
+    from sentry_sdk.integrations.sqlalchemy import SqlalchemyIntegration
+
+    sentry_logging = LoggingIntegration(level=logging.INFO, event_level=logging.ERROR)
+    sentry_sdk.init(
+        dsn=settings.SENTRY_SDK_DNS,
+        integrations=[sentry_logging, SqlalchemyIntegration()],
+        environment=settings.ENV,
+    )
+
+if settings.SENTRY_SDK_DNS:
+    init_sentry()
+
+# app 定義
+app = FastAPI(
+    title=f"[{settings.ENV}]{settings.TITLE}",
+    version=settings.VERSION,
+    debug=settings.DEBUG or False,
+    root_path=f"{settings.API_GATEWAY_STAGE_PATH}/",
+)
+
+ # middleware追加
+if settings.SENTRY_SDK_DNS:
+    from sentry_sdk.integrations.asgi import SentryAsgiMiddleware
+    app.add_middleware(SentryAsgiMiddleware)
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=[str(origin) for origin in settings.CORS_ORIGINS],
+    allow_origin_regex=r"^https?:\/\/([\w\-\_]{1,}\.|)example\.com",
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
+app.add_middleware(RequestContextMiddleware)
+app.add_middleware(ReadYourWritesMiddleware)
+if settings.METRICS_ENABLED:
+    request_metrics.install()
+    app.add_middleware(MetricsMiddleware)
+if settings.QUERY_DETECTOR_ENABLED:
+    query_detector.install()
+    app.add_middleware(QueryDetectorMiddleware)
+
+@app.get("/", tags=["info"])
+def get_info() -> dict[str, str]:
+    return {"title": settings.TITLE, "version": settings.VERSION}
+
+# ルーティング追加
+app.include_router(auth.router, tags=["Auth"], prefix="/auth")
+app.include_router(users.router, tags=["Users"], prefix="/users")
+app.include_router(todos.router, tags=["Todos"], prefix="/todos")
+app.include_router(task.router, tags=["Tasks"], prefix="/tasks")
+app.include_router(language.router, tags=["Language"], prefix="/language")
+app.include_router(metrics.router, tags=["Metrics"], prefix="/metrics")
+
+_background_tasks: set[asyncio.Task[None]] = set()
+_job_worker: Any = None
+
+@app.on_event("startup")
+async def build_search_index() -> None:
+    """プロセス内の検索インデックスを使用する場合、リクエストを受け付ける前に構築する"""
+    if not crud.todo.search_backend.needs_index:
+        return
+    async with get_async_session_factory()() as db:
+        await crud.todo.search_backend.build(db, crud.todo.model)
+
+@app.on_event("startup")
+async def start_job_worker() -> None:
+    """JOB_WORKER_IN_PROCESS 指定時は アプリのプロセス内でジョブの worker を起動する"""
+    global _job_worker
+    if not settings.JOB_WORKER_IN_PROCESS:
+        return
+    from app.core.jobs import JobWorker, load_jobs
+    load_jobs()
+    _job_worker = JobWorker()
+    task = asyncio.create_task(_job_worker.run())
+    _background_tasks.add(task) # 実行中に GC されないよう参照を保持する
+    task.add_done_callback(_background_tasks.discard)
+
+@app.on_event("shutdown")
+async def stop_job_worker() -> None:
+    """実行中のジョブの完了を待って worker を停止する"""
+    if _job_worker is None:
+        return
+    _job_worker.stop()
+    await asyncio.gather(*_background_tasks, return_exceptions=True)
+
+@app.on_event("shutdown")
+def flush_logs() -> None:
+    """キューに残ったログを出力する. 以降のログ (他の shutdown 処理等) は 同期で出力する"""
+    stop_queue_logging()
+
+# debug 設定を制御する. debug_toolbar は DEBUG 時のみ import する
+if settings.DEBUG:
+    from debug_toolbar.middleware import DebugToolbarMiddleware
+    app.add_middleware(
+        DebugToolbarMiddleware,
+        panels=["debug_toolbar.panels.sqlalchemy.SQLAlchemyPanel"],
+    )
+
+_mangum_handler: Any = None
+
+def handler(event: dict[str, Any], context: Any) -> dict[str, Any]:
+    """Lambda のエントリポイント. Mangum は初回呼び出し時に生成する"""
+    global _mangum_handler
+    if _mangum_handler is None:
+        from mangum import Mangum
+        _mangum_handler = Mangum(app)
+    return _mangum_handler(event, context)
\ No newline at end of file
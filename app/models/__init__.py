@@ -1,4 +1,6 @@
-from .tags import Tag
-from .todos import Todo
-from .todos_tags import TodoTag
-from .users import User
+from .archives import tags_archive, todos_archive, todos_tags_archive, users_archive
+from .jobs import Job
+from .tags import Tag
+from .todos import Todo
+from .todos_tags import TodoTag
+from .users import User
\ No newline at end of file
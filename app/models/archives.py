@@ -0,0 +1,29 @@
+from sqlalchemy import Column, DateTime, Table
+from sqlalchemy.sql.functions import current_timestamp
+from app.models.base import Base
+from app.models.tags import Tag
+from app.models.todos import Todo
+from app.models.todos_tags import TodoTag
+from app.models.users import User
+
+def make_archive_table(table: Table) -> Table:
+    """
+    論理削除後 保持期間を過ぎたデータの移動先 <table>_archive を定義する
+    カラムは table と同じ. 参照は id・外部キーのみのため unique 制約・外部キー制約・その他のインデックスは持たない
+    """
+    return Table(
+        f"{table.name}_archive",
+        Base.metadata,
+        *[
+            Column(c.name, c.type, primary_key=c.primary_key, nullable=c.nullable, index=bool(c.foreign_keys))
+            for c in table.columns
+        ],
+        Column("archived_at", DateTime, nullable=False, server_default=current_timestamp(), index=True),
+        mysql_charset="utf8mb4",
+        mysql_collate="utf8mb4_unicode_ci",
+    )
+
+todos_archive      = make_archive_table(Todo.__table__)
+tags_archive       = make_archive_table(Tag.__table__)
+users_archive      = make_archive_table(User.__table__)
+todos_tags_archive = make_archive_table(TodoTag.__table__)
\ No newline at end of file
@@ -1,66 +1,115 @@
-from datetime import datetime
-from typing import Any
-# sqlalchemy
-from sqlalchemy import DateTime, String, event, func, orm
-from sqlalchemy.orm import DeclarativeMeta, Mapped, Session, mapped_column
-from sqlalchemy.sql.functions import current_timestamp
-# app
-from app.core.logger import get_logger
-from app.core.utils import get_ulid
-
-logger = get_logger(__name__)
-
-class Base(DeclarativeMeta):
-    pass
-
-class ModelBaseMixin:
-    """Model の基本クラスを定義する"""
-    id: Mapped[str] = mapped_column(String(32), primary_key=True, default=get_ulid)
-    created_at: Mapped[datetime] = mapped_column(
-        DateTime,
-        nullable=False,
-        server_default=current_timestamp(),
-    )
-    updated_at: Mapped[datetime] = mapped_column(
-        DateTime,
-        nullable=False,
-        default=current_timestamp(),
-        onupdate=func.utc_timestamp(),
-    )
-    deleted_at: Mapped[datetime] = mapped_column(DateTime)
-
-class ModelBaseMixinWithoutDeletedAt:
-    id: Mapped[str] = mapped_column(String(32), primary_key=True, default=get_ulid)
-    created_at: Mapped[datetime] = mapped_column(
-        DateTime,
-        nullable=False,
-        server_default=current_timestamp()
-    )
-    updated_at: Mapped[datetime] = mapped_column(
-        DateTime,
-        nullable=False,
-        default=current_timestamp(),
-        onupdate=func.utc_timestamp(),
-    )
-
-# ORM実行時に自動的に呼び出されるコールバック関数
-@event.listens_for(Session, "do_orm_execute")
-def _add_filtering_deleted_at(execute_state: Any) -> None:
-    """
-    論理削除用のfilterを自動的に適用する
-    以下例)論理削除済のデータも含めて取得可能
-    select(...).filter(...).execution_options(include_deleted=True).
-    """
-    if (
-        execute_state.is_select
-        and not execute_state.is_column_load
-        and not execute_state.is_relationship_load
-        and not execute_state.execution_options.get("include_deleted", True)
-    ):
-        execute_state.statement = execute_state.statement.options(
-            orm.with_loader_criteria(
-                ModelBaseMixin,
-                lambda cls: cls.deleted_at.is_(None),
-                include_aliases=True
-            )
+from collections.abc import Callable
+from datetime import datetime
+from typing import Any
+import ulid
+# sqlalchemy
+from sqlalchemy import DateTime, LargeBinary, event, func, orm
+from sqlalchemy.dialects import mysql
+from sqlalchemy.engine import Dialect
+from sqlalchemy.orm import DeclarativeMeta, Mapped, Session, mapped_column
+from sqlalchemy.sql.functions import current_timestamp
+from sqlalchemy.types import TypeDecorator, TypeEngine
+# app
+from app.core.logger import get_logger
+from app.core.utils import get_ulid
+
+logger = get_logger(__name__)
+
+class Base(DeclarativeMeta):
+    pass
+
+class ULIDType(TypeDecorator):
+    """
+    ULID を BINARY(16) で保持し、アプリケーション・スキーマでは 26文字の文字列として扱う
+    照合順序を持たない固定長のバイト列のため 文字列より PK・FK・インデックスが小さく比較も速い
+    バイト列の大小は文字列表現の大小と一致するため id 順の並び替え・カーソルもそのまま使用できる
+    """
+    impl     = LargeBinary(16)
+    cache_ok = True
+
+    @property
+    def python_type(self) -> type:
+        return str
+
+    def load_dialect_impl(self, dialect: Dialect) -> TypeEngine[Any]:
+        if dialect.name == "mysql":
+            return dialect.type_descriptor(mysql.BINARY(16))
+        return dialect.type_descriptor(LargeBinary(16))
+
+    def process_bind_param(self, value: Any, dialect: Dialect) -> bytes | None:
+        """
+        ULID として不正な値は ValueError とする (NULL として検索・登録しない)
+        外部から受け取った id は crud で正規化・検証してから bind すること
+        """
+        if value is None or isinstance(value, bytes):
+            return value
+        try:
+            return ulid.from_str(str(value)).bytes
+        except (ValueError, OverflowError) as e:
+            raise ValueError(f"invalid ULID: {value!r}") from e
+
+    def literal_processor(self, dialect: Dialect) -> Callable[[Any], str]:
+        """literal_execute 等で SQL に埋め込む場合は 16進数のリテラルとする"""
+        def process(value: Any) -> str:
+            binary = self.process_bind_param(value, dialect)
+            return "NULL" if binary is None else f"X'{binary.hex()}'"
+        return process
+
+    def process_result_value(self, value: Any, dialect: Dialect) -> str | None:
+        return None if value is None else ulid.from_bytes(bytes(value)).str
+
+UPDATED_AT_TYPE = DateTime().with_variant(mysql.DATETIME(fsp=6), "mysql")
+
+class ModelBaseMixin:
+    """Model の基本クラスを定義する"""
+    id: Mapped[str] = mapped_column(ULIDType, primary_key=True, default=get_ulid)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime,
+        nullable=False,
+        server_default=current_timestamp(),
+    )
+    # ETag に使用するため 同一秒内の更新も区別できるよう マイクロ秒まで保持する
+    updated_at: Mapped[datetime] = mapped_column(
+        UPDATED_AT_TYPE,
+        nullable=False,
+        default=current_timestamp(6),
+        onupdate=func.utc_timestamp(6),
+    )
+    deleted_at: Mapped[datetime] = mapped_column(DateTime)
+
+class ModelBaseMixinWithoutDeletedAt:
+    id: Mapped[str] = mapped_column(ULIDType, primary_key=True, default=get_ulid)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime,
+        nullable=False,
+        server_default=current_timestamp()
+    )
+    # ETag に使用するため 同一秒内の更新も区別できるよう マイクロ秒まで保持する
+    updated_at: Mapped[datetime] = mapped_column(
+        UPDATED_AT_TYPE,
+        nullable=False,
+        default=current_timestamp(6),
+        onupdate=func.utc_timestamp(6),
+    )
+
+# ORM実行時に自動的に呼び出されるコールバック関数
+@event.listens_for(Session, "do_orm_execute")
+def _add_filtering_deleted_at(execute_state: Any) -> None:
+    """
+    論理削除用のfilterを自動的に適用する
+    以下例)論理削除済のデータも含めて取得可能
+    select(...).filter(...).execution_options(include_deleted=True).
+    """
+    if (
+        execute_state.is_select
+        and not execute_state.is_column_load
+        and not execute_state.is_relationship_load
+        and not execute_state.execution_options.get("include_deleted", True)
+    ):
+        execute_state.statement = execute_state.statement.options(
+            orm.with_loader_criteria(
+                ModelBaseMixin,
+                lambda cls: cls.deleted_at.is_(None),
+                include_aliases=True
+            )
         )
\ No newline at end of file
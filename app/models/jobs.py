@@ -0,0 +1,31 @@
+from datetime import datetime
+from typing import Any
+from sqlalchemy import JSON, DateTime, Index, Integer, String, Text
+from sqlalchemy.orm import Mapped, mapped_column
+from app.models.base import Base, ModelBaseMixinWithoutDeletedAt
+
+class Job(ModelBaseMixinWithoutDeletedAt, Base):
+    """バックグラウンドジョブのキュー. worker が status・run_at から実行待ちのジョブを取得する"""
+    __tablename__  = "jobs"
+    mysql_charset  = ("utf8mb4",)
+    mysql_collate  = "utf8mb4_unicode_ci"
+    __table_args__ = (
+        # 実行待ちのジョブの取得 (status = 'queued' AND run_at <= ? ORDER BY run_at) に使用する
+        Index("ix_jobs_status_run_at", "status", "run_at"),
+    )
+
+    job_type: Mapped[str]                = mapped_column(String(100), nullable=False, index=True)
+    status: Mapped[str]                  = mapped_column(String(20), nullable=False, server_default="queued")
+    payload: Mapped[Any | None]          = mapped_column(JSON)
+    result: Mapped[Any | None]           = mapped_column(JSON)
+    error: Mapped[str | None]            = mapped_column(Text)
+    progress: Mapped[int]                = mapped_column(Integer, nullable=False, server_default="0")
+    attempts: Mapped[int]                = mapped_column(Integer, nullable=False, server_default="0")
+    max_attempts: Mapped[int]            = mapped_column(Integer, nullable=False, server_default="1")
+    # 定期実行等の重複登録を防ぐキー. 同一キーのジョブは1件のみ登録される
+    unique_key: Mapped[str | None]       = mapped_column(String(191), unique=True)
+    run_at: Mapped[datetime]             = mapped_column(DateTime, nullable=False)
+    locked_by: Mapped[str | None]        = mapped_column(String(100))
+    locked_at: Mapped[datetime | None]   = mapped_column(DateTime)
+    started_at: Mapped[datetime | None]  = mapped_column(DateTime)
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime)
\ No newline at end of file
@@ -1,16 +1,23 @@
-from sqlalchemy import Column, String
-from sqlalchemy.orm import Mapped, relationship
-from app.models.base import Base, ModelBaseMixin
-
-class Tag(ModelBaseMixin, Base):
-    __tablename__ = "tags"
-    mysql_charset = ("utf8mb4",)
-    mysql_collate = "utf8mb4_unicode_ci"
-
-    name: Mapped[str]   = Column(String(100), unique=True, index=True)
-    todos: Mapped[list] = relationship(
-        "Todo",
-        secondary="todos_tags",
-        back_populates="tags",
-        lazy="joined",
+from sqlalchemy import Column, Index, String
+from sqlalchemy.orm import Mapped, relationship
+from app.models.base import Base, ModelBaseMixin
+
+class Tag(ModelBaseMixin, Base):
+    __tablename__ = "tags"
+    mysql_charset = ("utf8mb4",)
+    mysql_collate = "utf8mb4_unicode_ci"
+    __table_args__ = (
+        # 論理削除の条件 (deleted_at IS NULL) での 名前順の取得 および アーカイブ対象の抽出に使用する
+        Index("ix_tags_deleted_at_name", "deleted_at", "name"),
+    )
+
+    name: Mapped[str]   = Column(String(100), unique=True, index=True)
+    # tag に紐づく todo は件数が多くなり得るため 暗黙的には取得しない. 必要な場合は loader_options で指定する
+    # todos_tags は ON DELETE CASCADE のため 削除時も読み込まない
+    todos: Mapped[list] = relationship(
+        "Todo",
+        secondary="todos_tags",
+        back_populates="tags",
+        lazy="raise",
+        passive_deletes=True,
     )
\ No newline at end of file
@@ -1,17 +1,32 @@
-from datetime import datetime
-from sqlalchemy import DateTime, String, Text
-from sqlalchemy.orm import Mapped, mapped_column, relationship
-from app.models.base import Base, ModelBaseMixin
-
-class Todo(ModelBaseMixin, Base):
-    __tablename__ = "todos"
-    mysql_charset = ("utg8mb4",)
-    mysql_collate = "utf8mb4_unicode_ci"
-
-    title: Mapped[str]             = mapped_column(String(100), index=True)
-    description: Mapped[str]       = mapped_column(Text)
-    completed_at: Mapped[datetime] = mapped_column(DateTime)
-
-    tags: Mapped[list] = relationship(
-        "Tag", secondary="todos_tags", back_populates="todos", lazy="joined",
+from datetime import datetime
+from sqlalchemy import DateTime, Index, String, Text
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+from app.models.base import Base, ModelBaseMixin
+
+class Todo(ModelBaseMixin, Base):
+    __tablename__ = "todos"
+    mysql_charset = ("utg8mb4",)
+    mysql_collate = "utf8mb4_unicode_ci"
+    __table_args__ = (
+        # q 検索用の全文検索インデックス. 日本語を扱うため ngram parser を使用する
+        Index(
+            "ft_todos_title_description",
+            "title",
+            "description",
+            mysql_prefix="FULLTEXT",
+            mysql_with_parser="ngram",
+        ),
+        # 論理削除の条件 (deleted_at IS NULL) と 既定の並び順 を1つのインデックスで解決する
+        # 保持期間を過ぎたデータのアーカイブ対象の抽出 (deleted_at < ?) にも使用する
+        Index("ix_todos_deleted_at_created_at", "deleted_at", "created_at"),
+    )
+
+    title: Mapped[str]             = mapped_column(String(100), index=True)
+    description: Mapped[str]       = mapped_column(Text)
+    completed_at: Mapped[datetime] = mapped_column(DateTime)
+
+    # todo のレスポンスには tags を含むため selectin で取得する (一覧でも IN 句の1クエリで済む)
+    # joined を使用すると Tag.todos と合わせて結果行が掛け算で増えるため使用しない
+    tags: Mapped[list] = relationship(
+        "Tag", secondary="todos_tags", back_populates="todos", lazy="selectin", passive_deletes=True,
     )
\ No newline at end of file
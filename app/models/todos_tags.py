@@ -1,19 +1,14 @@
-from sqlalchemy import ForeignKey, Integer, UniqueConstraint
-from sqlalchemy.orm import Mapped, mapped_column
-from app.models.base import Base, ModelBaseMixinWithoutDeletedAt
-
-class TodoTag(ModelBaseMixinWithoutDeletedAt, Base):
-    __tablename__  = "todos_tags"
-    mysql_charset  = ("utf8mb4",)
-    mysql_collate  = "utf8mb4_unicode_ci"
-    __table_args__ = (
-        UniqueConstraint("todo_id", "tag_id", name="ix_todos_tags_todo_id_tag_id")
-    )
-
-    name: Mapped[str]   = Column(String(100), unique=True, index=True)
-    todos: Mapped[list] = relationship(
-        "Todo",
-        secondary="todos_tags",
-        back_populates="tags",
-        lazy="joined",
-    )
\ No newline at end of file
+from sqlalchemy import ForeignKey, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+from app.models.base import Base, ModelBaseMixinWithoutDeletedAt, ULIDType
+
+class TodoTag(ModelBaseMixinWithoutDeletedAt, Base):
+    __tablename__  = "todos_tags"
+    mysql_charset  = ("utf8mb4",)
+    mysql_collate  = "utf8mb4_unicode_ci"
+    __table_args__ = (
+        UniqueConstraint("todo_id", "tag_id", name="ix_todos_tags_todo_id_tag_id"),
+    )
+
+    todo_id: Mapped[str] = mapped_column(ULIDType, ForeignKey("todos.id", ondelete="CASCADE"), nullable=False)
+    tag_id: Mapped[str]  = mapped_column(ULIDType, ForeignKey("tags.id", ondelete="CASCADE"), nullable=False)
\ No newline at end of file
@@ -1,18 +1,22 @@
-from sqlalchemy import Boolean, String, Text
-from sqlalchemy.orm import Mapped, mapped_column
-from app.models.base import Base, ModelBaseMixin
-
-class User(ModelBaseMixin, Base):
-    __tablename__ = "users"
-    mysql_charset = ("utf8mb4",)
-    mysql_collate = "utf8mb4_unicode_ci"
-
-    full_name: Mapped[str] = mapped_column(String(64), index=True)
-    email: Mapped[str]     = mapped_column(
-        String(200), unique=True, index=True, nullable=False
-    )
-    email_verified: Mapped[bool] = mapped_column(
-        Boolean, nullable=False, server_default="0",
-    )
-    hashed_password: Mapped[str] = mapped_column(Text, nullable=False)
+from sqlalchemy import Boolean, Index, String, Text
+from sqlalchemy.orm import Mapped, mapped_column
+from app.models.base import Base, ModelBaseMixin
+
+class User(ModelBaseMixin, Base):
+    __tablename__ = "users"
+    mysql_charset = ("utf8mb4",)
+    mysql_collate = "utf8mb4_unicode_ci"
+    __table_args__ = (
+        # 論理削除の条件 (deleted_at IS NULL) での 作成順の取得 および アーカイブ対象の抽出に使用する
+        Index("ix_users_deleted_at_created_at", "deleted_at", "created_at"),
+    )
+
+    full_name: Mapped[str] = mapped_column(String(64), index=True)
+    email: Mapped[str]     = mapped_column(
+        String(200), unique=True, index=True, nullable=False
+    )
+    email_verified: Mapped[bool] = mapped_column(
+        Boolean, nullable=False, server_default="0",
+    )
+    hashed_password: Mapped[str] = mapped_column(Text, nullable=False)
     scopes: Mapped[str]          = mapped_column(Text)
\ No newline at end of file
@@ -1,13 +1,33 @@
-from .core import BaseSchema, PagingMeta, PagingQueryIn, SortQueryIn
-from .language_analyzer import AnalyzedLanguage, AnalyzedLanguageToken
-from .request_info import RequestInfoResponse
-from .tag import TagCreate, TagResponse, TagsPagedResponse, TagUpdate
-from .todo import (
-    TodoCreate,
-    TodoResponse,
-    TodoSortQueryIn,
-    TodosPagedResponse,
-    TodoUpdate,
-)
-from .token import Token, TokenPayload
-from .user import UserCreate, UserResponse, UsersPagedResponse, UserUpdate
+from .bulk import BulkDeleteIn, BulkItemResult, BulkItemStatusEnum, BulkResponse
+from .core import (
+    BaseSchema,
+    CountStrategyEnum,
+    CursorPagingMeta,
+    CursorPagingQueryIn,
+    ExportFormatEnum,
+    PagingMeta,
+    PagingModeEnum,
+    PagingQueryIn,
+    SortQueryIn,
+)
+from .job import JobCreate, JobResponse, JobsPagedResponse, JobStatusEnum
+from .language_analyzer import (
+    AnalyzedLanguage,
+    AnalyzedLanguagesResponse,
+    AnalyzedLanguageToken,
+    LanguageAnalyzeIn,
+)
+from .request_info import RequestInfoResponse
+from .tag import TagCreate, TagResponse, TagsPagedResponse, TagUpdate
+from .todo import (
+    TodoBulkUpdate,
+    TodoCreate,
+    TodoResponse,
+    TodoSortFieldEnum,
+    TodoSortQueryIn,
+    TodosPagedResponse,
+    TodoTagsIn,
+    TodoUpdate,
+)
+from .token import Token, TokenPayload
+from .user import CurrentUser, UserCreate, UserResponse, UsersPagedResponse, UserUpdate
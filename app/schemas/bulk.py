@@ -0,0 +1,29 @@
+from enum import Enum
+from app.schemas.core import BaseSchema
+
+class BulkItemStatusEnum(Enum):
+    """一括処理の 1件毎の結果"""
+    created: str         = "created"
+    updated: str         = "updated"
+    unchanged: str       = "unchanged"
+    deleted: str         = "deleted"
+    not_found: str       = "not_found"
+    already_deleted: str = "already_deleted"
+    failed: str          = "failed"
+
+class BulkItemResult(BaseSchema):
+    """一括処理の 1件毎の結果を表現するクラス"""
+    index: int
+    id: str | None
+    status: BulkItemStatusEnum
+    error: str | None = None
+
+class BulkResponse(BaseSchema):
+    """一括処理のレスポンススキーマ"""
+    results: list[BulkItemResult] = []
+    succeeded: int                = 0
+    failed: int                   = 0
+
+class BulkDeleteIn(BaseSchema):
+    """一括論理削除のリクエストスキーマ"""
+    ids: list[str]
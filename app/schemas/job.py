@@ -0,0 +1,42 @@
+import datetime
+from enum import Enum
+from typing import Any
+from app.schemas.core import BaseSchema, CursorPagingMeta, PagingMeta
+
+class JobStatusEnum(Enum):
+    """ジョブの状態"""
+    queued: str    = "queued"
+    running: str   = "running"
+    succeeded: str = "succeeded"
+    failed: str    = "failed"
+
+class JobCreate(BaseSchema):
+    """ジョブの登録スキーマ. run_at 未指定時は即時実行する"""
+    job_type: str
+    payload: dict[str, Any] | None = None
+    run_at: datetime.datetime | None = None
+    max_attempts: int | None = None
+    unique_key: str | None = None
+
+class JobResponse(BaseSchema):
+    """ジョブの状態・進捗(0〜100)・結果"""
+    id: str
+    job_type: str
+    status: JobStatusEnum
+    progress: int | None
+    attempts: int | None
+    max_attempts: int | None
+    result: Any | None
+    error: str | None
+    run_at: datetime.datetime | None
+    started_at: datetime.datetime | None
+    finished_at: datetime.datetime | None
+    created_at: datetime.datetime | None
+    updated_at: datetime.datetime | None
+
+    class Config:
+        orm_mode = True
+
+class JobsPagedResponse(BaseSchema):
+    data: list[JobResponse] | None
+    meta: PagingMeta | CursorPagingMeta | None
\ No newline at end of file
@@ -1,17 +1,32 @@
-from pydamic import BaseModel, Field
-
-class AnalyzedLanguageToken(BaseModel):
-    """テキスト解析の結果を表現するクラス"""
-    surface: str               = Field(..., description="表層形式(入力文字のまま)")
-    dictionary_form: str       = Field(..., description="辞書形式")
-    reading_form: str          = Field(..., description="読みカナ")
-    normalized_form: str       = Field(..., description="正規化済の形式")
-    part_of_speech: tuple[str] = Field(..., description="品詞")
-    begin_pos: int             = Field(..., description="開始文字番号")
-    end_pos: int               = Field(..., description="終了文字番号")
-
-class AnalyzedLanguage(BaseModel):
-    raw_text: str
-    tokens: list[AnalyzedLanguageToken]         = []
-    excluded_token: list[AnalyzedLanguageToken] = []
-    during_time: float
\ No newline at end of file
+from pydantic import BaseModel, Field, root_validator
+
+class AnalyzedLanguageToken(BaseModel):
+    """テキスト解析の結果を表現するクラス"""
+    surface: str                    = Field(..., description="表層形式(入力文字のまま)")
+    dictionary_form: str            = Field(..., description="辞書形式")
+    reading_form: str               = Field(..., description="読みカナ")
+    normalized_form: str            = Field(..., description="正規化済の形式")
+    part_of_speech: tuple[str, ...] = Field(..., description="品詞")
+    begin_pos: int                  = Field(..., description="開始文字番号")
+    end_pos: int                    = Field(..., description="終了文字番号")
+
+class AnalyzedLanguage(BaseModel):
+    raw_text: str
+    tokens: list[AnalyzedLanguageToken]         = []
+    excluded_token: list[AnalyzedLanguageToken] = []
+    during_time: float                          = Field(..., description="解析の処理秒数 (キャッシュ参照時は参照にかかった秒数)")
+
+class LanguageAnalyzeIn(BaseModel):
+    """text または texts (batch) のいずれかを指定する"""
+    text: str | None        = None
+    texts: list[str] | None = None
+
+    @root_validator
+    def validate_text_or_texts(cls, values: dict) -> dict:
+        if (values.get("text") is None) == (values.get("texts") is None):
+            raise ValueError("text または texts のいずれかを指定してください")
+        return values
+
+class AnalyzedLanguagesResponse(BaseModel):
+    """解析結果. 指定した text/texts の順に返却する"""
+    data: list[AnalyzedLanguage]
\ No newline at end of file
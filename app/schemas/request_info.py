@@ -1,8 +1,8 @@
-from app.schemas.core import BaseSchema
-
-class RequestInfoResponse(BaseSchema):
-    ip_address: str | None
-    host: str | None
-
-    class Config:
+from app.schemas.core import BaseSchema
+
+class RequestInfoResponse(BaseSchema):
+    ip_address: str | None
+    host: str | None
+
+    class Config:
         orm_mode = True
\ No newline at end of file
@@ -1,40 +1,50 @@
-import datetime
-from enum import Enum
-from fastapi import Query
-from app import schemas
-from app.schemas.core import BaseSchema, PagingMeta
-from app.schemas.tag import TagResponse
-
-class TodoSortFieldEnum(Enum):
-    created_at = "created_at"
-    title      = "title"
-
-class TodoBase(BaseSchema):
-    """todo の基本スキーマを定義する"""
-    title: str | None
-    description: str | None
-    completed_at: datetime.datetime | None
-
-class TodoResponse(TodoBase):
-    id: str
-    tags: list[TagResponse] | None # Tagを保持する
-    created_at: datetime.datetime | None
-    updated_at: datetime.datetime | None
-
-    class Config:
-        orm_mode = True
-
-class TodoCreate(TodoBase):
-    title: str
-    description: str | None
-
-class TodoUpdate(TodoBase):
-    pass
-
-class TodosPagedResponse(BaseSchema):
-    data: list[TodoResponse] | None
-    meta: PagingMeta | None
-
-class TodoSortQueryIn(schemas.SortQueryIn):
-    """SortQueryIn を継承したクラス"""
+import datetime
+from enum import Enum
+from fastapi import Query
+from app import schemas
+from app.schemas.core import BaseSchema, CursorPagingMeta, PagingMeta
+from app.schemas.tag import TagCreate, TagResponse
+
+class TodoSortFieldEnum(Enum):
+    created_at = "created_at"
+    title      = "title"
+    relevance  = "relevance" # q 検索時の関連度順
+
+class TodoBase(BaseSchema):
+    """todo の基本スキーマを定義する"""
+    title: str | None
+    description: str | None
+    completed_at: datetime.datetime | None
+
+class TodoResponse(TodoBase):
+    id: str
+    tags: list[TagResponse] | None # Tagを保持する
+    created_at: datetime.datetime | None
+    updated_at: datetime.datetime | None
+
+    class Config:
+        orm_mode = True
+
+class TodoCreate(TodoBase):
+    title: str
+    description: str | None
+
+class TodoUpdate(TodoBase):
+    pass
+
+class TodoBulkUpdate(TodoUpdate):
+    """一括更新用. id 毎に更新内容を指定する"""
+    id: str
+
+class TodoTagsIn(BaseSchema):
+    """複数 todo への tag 一括付与用. todo 毎に付与する tags を指定する"""
+    todo_id: str
+    tags: list[TagCreate]
+
+class TodosPagedResponse(BaseSchema):
+    data: list[TodoResponse] | None
+    meta: PagingMeta | CursorPagingMeta | None
+
+class TodoSortQueryIn(schemas.SortQueryIn):
+    """SortQueryIn を継承したクラス"""
     sort_field: TodoSortFieldEnum | None = Query(TodoSortFieldEnum.created_at)
\ No newline at end of file
@@ -1,13 +1,13 @@
-from app.schemas.core import BaseSchema
-
-class Token(BaseSchema):
-    access_token: str
-    token_type: str
-
-    class Config:
-        orm_mode                       = True
-        alias_generator                = None
-        allow_population_by_field_name = False
-
-class TokenPayload(BaseSchema):
+from app.schemas.core import BaseSchema
+
+class Token(BaseSchema):
+    access_token: str
+    token_type: str
+
+    class Config:
+        orm_mode                       = True
+        alias_generator                = None
+        allow_population_by_field_name = False
+
+class TokenPayload(BaseSchema):
     sub: str | Non
\ No newline at end of file
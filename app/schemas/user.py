@@ -1,24 +1,34 @@
-from pydantic import EmailStr
-from app.schemas.core import BaseSchema, PagingMeta
-
-class UserBase(BaseSchema):
-    full_name: str | None = None
-
-class UserResponse(UserBase):
-    id: str
-    email: EmailStr
-    email_verified: bool
-
-    class Config:
-        orm_mode = True
-
-class UserCreate(UserBase):
-    email : EmailStr
-    password: str
-
-class UserUpdate(UserBase):
-    password: str | None = None
-
-class UsersPagedResponse(BaseSchema):
-    data: list[UserResponse] | None
-    meta: PagingMeta | None
\ No newline at end of file
+from pydantic import EmailStr
+from app.schemas.core import BaseSchema, CursorPagingMeta, PagingMeta
+
+class UserBase(BaseSchema):
+    full_name: str | None = None
+
+class UserResponse(UserBase):
+    id: str
+    email: EmailStr
+    email_verified: bool
+
+    class Config:
+        orm_mode = True
+
+class CurrentUser(UserResponse):
+    """
+    認証済ユーザ (get_current_user の返却値)
+    リクエストをまたいでキャッシュするため session に紐づかない 変更不可のスキーマとする
+    """
+    scopes: str | None = None
+
+    class Config:
+        allow_mutation = False
+
+class UserCreate(UserBase):
+    email : EmailStr
+    password: str
+
+class UserUpdate(UserBase):
+    password: str | None = None
+
+class UsersPagedResponse(BaseSchema):
+    data: list[UserResponse] | None
+    meta: PagingMeta | CursorPagingMeta | None
\ No newline at end of file
@@ -0,0 +1,82 @@
+"""
+app.main の import 時間 (Lambda コールドスタート時の初期化コスト) のベンチマーク
+python -X importtime の結果から 累計時間の大きいモジュールを表示する
+--budget-ms を超えた場合、または --forbid のモジュールが import された場合は 終了コード 1 を返却する
+
+例)
+    python -m benchmarks.bench_import_time
+    python -m benchmarks.bench_import_time --budget-ms 1500
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+# 起動時に import されてはならないモジュール (初回のDB接続・DEBUG・Sentry 設定時のみ必要)
+FORBIDDEN_MODULES = ["MySQLdb", "aiomysql", "sentry_sdk", "debug_toolbar", "mangum"]
+
+LINE_PATTERN = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+def measure(module: str) -> tuple[float, dict[str, int], set[str]]:
+    """
+    新しいプロセスで module を import し、
+    (module の累計 ms, module から直接 import されたモジュール毎の累計 us, import された全モジュール) を返却する
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"},
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr)
+
+    # 親パッケージ (app) と module (app.main) の累計を合算する
+    targets  = {".".join(module.split(".")[:i + 1]) for i in range(module.count(".") + 1)}
+    total_us = 0
+    children: dict[str, int] = {}
+    imported: set[str]       = set()
+    for line in result.stderr.splitlines():
+        matched = LINE_PATTERN.match(line)
+        if not matched:
+            continue
+        cumulative, indent, name = int(matched.group(2)), len(matched.group(3)), matched.group(4)
+        imported.add(name)
+        # インデント 1 が -c から import したもの、3 がその直下
+        if indent == 1 and name in targets:
+            total_us += cumulative
+        elif indent == 3:
+            children[name] = cumulative
+    return total_us / 1000, children, imported
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--budget-ms", type=float, default=None)
+    parser.add_argument("--forbid", nargs="*", default=FORBIDDEN_MODULES)
+    args = parser.parse_args()
+
+    runs     = [measure(args.module) for _ in range(args.repeat)]
+    total_ms = statistics.median(ms for ms, _, _ in runs)
+    _, children, imported = runs[-1]
+
+    print(f"import {args.module}: {total_ms:.1f}ms (median of {args.repeat})")
+    for name, us in sorted(children.items(), key=lambda x: -x[1])[:args.top]:
+        print(f"{us / 1000:10.1f}ms  {name}")
+
+    failed = False
+    forbidden = sorted(m for m in args.forbid if any(name == m or name.startswith(f"{m}.") for name in imported))
+    if forbidden:
+        print(f"NG: imported at startup: {', '.join(forbidden)}")
+        failed = True
+    if args.budget_ms is not None and total_ms > args.budget_ms:
+        print(f"NG: {total_ms:.1f}ms exceeds budget {args.budget_ms:.1f}ms")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+一覧レスポンスのシリアライズのベンチマーク
+crud で生成した TodosPagedResponse を JSON にするまでの 1レスポンスあたりの CPU 時間を比較する
+    before: FastAPI の response_model による再検証 + jsonable_encoder + JSONResponse
+    after:  ModelJSONResponse (alias 対応を事前算出し orjson で変換)
+どちらも crud での list_response_class の生成 (検証) を含む. DB への問い合わせは行わない
+
+例)
+    python -m benchmarks.bench_list_serialization
+    python -m benchmarks.bench_list_serialization --rows 30 100 1000 --number 200
+"""
+import argparse
+import asyncio
+import datetime
+import json
+import time
+from types import SimpleNamespace
+from typing import Any
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from app.core.serializer import ModelJSONResponse
+from app.schemas.core import CountStrategyEnum, PagingMeta
+from app.schemas.todo import TodosPagedResponse
+
+response_field = create_response_field(name="response", type_=TodosPagedResponse)
+# serialize_response は coroutine のため 同一の event loop で実行する
+loop = asyncio.new_event_loop()
+
+def make_rows(n: int) -> list[Any]:
+    """ORM の object 相当のデータを生成する. todo 毎に tag を 3件持つ"""
+    now  = datetime.datetime(2024, 1, 1, 12, 0, 0, 123456)
+    tags = [
+        SimpleNamespace(id=f"tag-{i}", name=f"tag-name-{i}", created_at=now, updated_at=now, deleted_at=None)
+        for i in range(3)
+    ]
+    return [
+        SimpleNamespace(
+            id=f"{i:026d}",
+            title=f"title-{i}",
+            description=f"description-{i} " * 5,
+            completed_at=None if i % 2 else now,
+            tags=tags,
+            created_at=now,
+            updated_at=now,
+        )
+        for i in range(n)
+    ]
+
+def make_response_model(rows: list[Any]) -> TodosPagedResponse:
+    """crud.get_paged_list と同様に list_response_class を生成する"""
+    meta = PagingMeta(
+        current_page=1,
+        total_page_count=1,
+        total_data_count=len(rows),
+        per_page=len(rows),
+        count_strategy=CountStrategyEnum.exact,
+    )
+    return TodosPagedResponse(data=rows, meta=meta)
+
+def before(rows: list[Any]) -> bytes:
+    content = loop.run_until_complete(serialize_response(field=response_field, response_content=make_response_model(rows)))
+    return JSONResponse(content).body
+
+def after(rows: list[Any]) -> bytes:
+    return ModelJSONResponse(make_response_model(rows)).body
+
+def cpu_ms(fn: Any, rows: list[Any], number: int) -> float:
+    """number 回実行した 1回あたりの CPU 時間(ms)を返却する"""
+    start = time.process_time()
+    for _ in range(number):
+        fn(rows)
+    return (time.process_time() - start) / number * 1000
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="+", default=[30, 100, 1000])
+    parser.add_argument("--number", type=int, default=100)
+    args = parser.parse_args()
+
+    print(f"{'rows':>6}{'before':>12}{'after':>12}{'speedup':>10}")
+    for n in args.rows:
+        rows = make_rows(n)
+        # 出力が同一であることを確認する
+        assert json.loads(before(rows)) == json.loads(after(rows))
+        before_ms = cpu_ms(before, rows, args.number)
+        after_ms  = cpu_ms(after, rows, args.number)
+        print(f"{n:>6}{before_ms:>10.2f}ms{after_ms:>10.2f}ms{before_ms / after_ms:>9.1f}x")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,72 @@
+"""
+MetricsMiddleware と クエリの計測 (before/after_cursor_execute) のオーバーヘッドのベンチマーク
+何もしない ASGI アプリを 直接呼び出した場合と MetricsMiddleware を経由した場合、
+SQLite の SELECT 1 を計測イベントあり/なしで実行した場合の 1回あたりの時間を比較する
+
+例)
+    python -m benchmarks.bench_metrics_middleware
+    python -m benchmarks.bench_metrics_middleware --number 100000
+"""
+import argparse
+import asyncio
+import time
+from typing import Any
+from sqlalchemy import create_engine, text
+from app.core import metrics
+
+def endpoint() -> None:
+    pass
+
+async def app(scope: dict[str, Any], receive: Any, send: Any) -> None:
+    """ルーティング済の scope に endpoint を設定し、空のレスポンスを返却する"""
+    scope["endpoint"] = endpoint
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b""})
+
+class Routes:
+    routes = [type("Route", (), {"endpoint": endpoint, "path": "/todos/{id}"})()]
+
+async def receive() -> dict[str, Any]:
+    return {"type": "http.request"}
+
+async def send(message: dict[str, Any]) -> None:
+    pass
+
+async def run_requests(asgi: Any, number: int) -> float:
+    """number 回リクエストし 1回あたりの us を返却する"""
+    start = time.perf_counter()
+    for i in range(number):
+        scope = {"type": "http", "method": "GET", "path": f"/todos/{i}", "app": Routes}
+        await asgi(scope, receive, send)
+    return (time.perf_counter() - start) / number * 1_000_000
+
+def run_queries(number: int) -> float:
+    engine = create_engine("sqlite://")
+    with engine.connect() as conn:
+        start = time.perf_counter()
+        for _ in range(number):
+            conn.execute(text("SELECT 1"))
+        return (time.perf_counter() - start) / number * 1_000_000
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--number", type=int, default=50_000)
+    parser.add_argument("--queries", type=int, default=20_000)
+    args = parser.parse_args()
+
+    for _ in range(2): # 2回目の結果を表示する (warm up)
+        plain    = asyncio.run(run_requests(app, args.number))
+        measured = asyncio.run(run_requests(metrics.MetricsMiddleware(app), args.number))
+    print(f"request  plain {plain:8.2f} us  middleware {measured:8.2f} us  overhead {measured - plain:6.2f} us/request")
+
+    without_events = run_queries(args.queries)
+    metrics.request_metrics.install()
+    with_events = run_queries(args.queries)
+    metrics.request_metrics.uninstall()
+    print(
+        f"query    plain {without_events:8.2f} us  measured   {with_events:8.2f} us  "
+        f"overhead {with_events - without_events:6.2f} us/query"
+    )
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,16 @@
+import logging
+from typing import Any
+import pytest
+from app.core.query_detector import query_budget as _query_budget
+# 初期設定
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+logger.info("root-conftest")
+
+@pytest.fixture
+def query_budget() -> Any:
+    """
+    fixture: with 内のクエリ数の上限を宣言し、超えた場合に失敗させる
+    with query_budget(max_queries=4, max_repeats=1): ...
+    """
+    return _query_budget
\ No newline at end of file
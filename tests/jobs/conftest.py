@@ -0,0 +1,22 @@
+from collections.abc import AsyncGenerator
+from typing import Any
+import pytest
+import pytest_asyncio
+from app.core import jobs
+from app.models import Job
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+@pytest_asyncio.fixture
+async def job_session_factory(tmp_path: Any, monkeypatch: pytest.MonkeyPatch) -> AsyncGenerator[sessionmaker, None]:
+    """fixture: JOB_DATABASE_URL に SQLite を指定した場合と同様に ジョブキューを SQLite のファイルに作成する"""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'jobs.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Job.__table__.create)
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine, class_=AsyncSession)
+    monkeypatch.setattr(jobs, "get_job_session_factory", lambda: session_factory)
+    # テスト用のジョブ種別のみを登録する
+    monkeypatch.setattr(jobs, "JOB_DEFINITIONS", {})
+    monkeypatch.setattr(jobs, "PERIODIC_JOBS", {})
+    yield session_factory
+    await engine.dispose()
\ No newline at end of file
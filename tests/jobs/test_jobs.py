@@ -0,0 +1,139 @@
+import datetime
+from collections.abc import Callable
+from typing import Any
+import pytest
+from app import crud
+from app.core import jobs
+from app.crud.job import utcnow
+from app.schemas.job import JobStatusEnum
+from sqlalchemy.orm import sessionmaker
+
+async def enqueue(session_factory: sessionmaker, job_type: str, **kwargs: Any) -> str:
+    async with session_factory() as db:
+        job_id = (await jobs.enqueue_job(db, job_type, **kwargs)).id
+        await db.commit()
+    return job_id
+
+async def get_job(session_factory: sessionmaker, job_id: str) -> Any:
+    async with session_factory() as db:
+        return await crud.job.get_db_obj_by_id(db, job_id)
+
+async def run_once(worker: jobs.JobWorker) -> int:
+    """1回 poll し、取得したジョブの完了を待つ"""
+    started = await worker.run_once()
+    for running in worker._running.values():
+        for task in list(running):
+            await task
+    return started
+
+@pytest.mark.asyncio
+async def test_claim(job_session_factory: sessionmaker) -> None:
+    """実行時刻を過ぎたジョブのみを run_at 順に limit 件取得し、取得済のジョブは他の worker から取得されないこと"""
+    jobs.register_job("noop")(lambda payload, report: None)
+    first  = await enqueue(job_session_factory, "noop")
+    second = await enqueue(job_session_factory, "noop")
+    await enqueue(job_session_factory, "noop", run_at=utcnow() + datetime.timedelta(hours=1))
+
+    async with job_session_factory() as db:
+        claimed = await crud.job.claim(db, "noop", "worker-1", 1)
+        assert [job.id for job in claimed] == [first]
+        assert claimed[0].status == JobStatusEnum.running.value
+        assert claimed[0].attempts == 1
+        assert claimed[0].locked_by == "worker-1"
+        await db.commit()
+
+        claimed = await crud.job.claim(db, "noop", "worker-2", 5)
+        assert [job.id for job in claimed] == [second]
+        await db.commit()
+        assert await crud.job.claim(db, "noop", "worker-3", 5) == []
+
+@pytest.mark.asyncio
+async def test_enqueue_unique_key(job_session_factory: sessionmaker) -> None:
+    """同一の unique_key のジョブは1件のみ登録されること"""
+    jobs.register_job("noop")(lambda payload, report: None)
+    job_id = await enqueue(job_session_factory, "noop", unique_key="periodic:noop:1")
+    assert await enqueue(job_session_factory, "noop", unique_key="periodic:noop:1") == job_id
+
+@pytest.mark.asyncio
+async def test_retry(job_session_factory: sessionmaker) -> None:
+    """失敗したジョブは backoff 後に再実行され、max_attempts に達した場合は failed となること"""
+    calls: list[int] = []
+
+    @jobs.register_job("flaky", max_attempts=3, backoff_seconds=0)
+    async def flaky(payload: dict[str, Any], report: Callable[[int], None]) -> dict[str, int]:
+        calls.append(payload["n"])
+        if len(calls) == 1:
+            raise RuntimeError("boom")
+        report(50)
+        return {"n": payload["n"] * 2}
+
+    @jobs.register_job("broken", executor="thread", max_attempts=2, backoff_seconds=0)
+    def broken(payload: dict[str, Any], report: Callable[[int], None]) -> None:
+        raise ValueError("broken")
+
+    flaky_id  = await enqueue(job_session_factory, "flaky", payload={"n": 21})
+    broken_id = await enqueue(job_session_factory, "broken")
+    worker    = jobs.JobWorker(worker_id="worker-1")
+
+    assert await run_once(worker) == 2
+    job = await get_job(job_session_factory, flaky_id)
+    assert (job.status, job.attempts, job.locked_by) == (JobStatusEnum.queued.value, 1, None)
+    assert "boom" in job.error
+    job = await get_job(job_session_factory, broken_id)
+    assert (job.status, job.attempts) == (JobStatusEnum.queued.value, 1)
+
+    assert await run_once(worker) == 2
+    job = await get_job(job_session_factory, flaky_id)
+    assert (job.status, job.attempts, job.progress, job.result) == (JobStatusEnum.succeeded.value, 2, 100, {"n": 42})
+    assert job.error is None
+    job = await get_job(job_session_factory, broken_id)
+    assert (job.status, job.attempts) == (JobStatusEnum.failed.value, 2)
+    assert "broken" in job.error
+    assert job.finished_at is not None
+
+    assert await run_once(worker) == 0
+    assert calls == [21, 21]
+
+def test_retry_delay() -> None:
+    """再試行の待機秒数は 失敗毎に倍となること"""
+    definition = jobs.JobDefinition("noop", lambda payload, report: None, "async", 1, max_attempts=4, backoff_seconds=5)
+    assert [definition.get_retry_delay(attempts) for attempts in (1, 2, 3)] == [5, 10, 20]
+
+@pytest.mark.asyncio
+async def test_requeue_stale(job_session_factory: sessionmaker) -> None:
+    """heartbeat の途絶えたジョブは再実行待ちに戻り、max_attempts に達している場合は failed となること"""
+    jobs.register_job("noop", max_attempts=2)(lambda payload, report: None)
+    job_id = await enqueue(job_session_factory, "noop")
+
+    async with job_session_factory() as db:
+        await crud.job.claim(db, "noop", "lost-worker", 1)
+        await db.commit()
+        # heartbeat が lock の期限内であれば回収しない
+        assert await crud.job.requeue_stale(db, utcnow() - datetime.timedelta(minutes=5)) == 0
+        assert await crud.job.requeue_stale(db, utcnow() + datetime.timedelta(seconds=1)) == 1
+        await db.commit()
+    job = await get_job(job_session_factory, job_id)
+    assert (job.status, job.attempts, job.locked_by, job.error) == (JobStatusEnum.queued.value, 1, None, "worker lost")
+
+    async with job_session_factory() as db:
+        await crud.job.claim(db, "noop", "lost-worker", 1)
+        await db.commit()
+        assert await crud.job.requeue_stale(db, utcnow() + datetime.timedelta(seconds=1)) == 1
+        await db.commit()
+    job = await get_job(job_session_factory, job_id)
+    assert (job.status, job.attempts, job.locked_by) == (JobStatusEnum.failed.value, 2, None)
+
+@pytest.mark.asyncio
+async def test_stale_result_ignored(job_session_factory: sessionmaker) -> None:
+    """回収された後に 停止していた worker から届いた結果は反映しないこと"""
+    jobs.register_job("noop")(lambda payload, report: None)
+    job_id = await enqueue(job_session_factory, "noop")
+
+    async with job_session_factory() as db:
+        await crud.job.claim(db, "noop", "lost-worker", 1)
+        await db.commit()
+        await crud.job.requeue_stale(db, utcnow() + datetime.timedelta(seconds=1))
+        await crud.job.complete(db, job_id, "lost-worker", {"late": True})
+        await db.commit()
+    job = await get_job(job_session_factory, job_id)
+    assert (job.status, job.result) == (JobStatusEnum.queued.value, None)
\ No newline at end of file
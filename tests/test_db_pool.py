@@ -0,0 +1,75 @@
+from collections.abc import Iterator
+from typing import Any
+import pytest
+from app.core import db_pool
+from app.core.config import settings
+from app.core.db_pool import TimedAsyncAdaptedQueuePool, TimedQueuePool, get_pool_options, get_pool_stats, setup_pool_events
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Engine
+
+@pytest.fixture
+def engine(tmp_path: Any, monkeypatch: pytest.MonkeyPatch) -> Iterator[Engine]:
+    """fixture: プール設定・統計情報のイベントを登録した SQLite のエンジン"""
+    monkeypatch.setattr(db_pool, "pool_metrics", {})
+    monkeypatch.setattr(db_pool, "_engines", {})
+    monkeypatch.setattr(settings, "DB_POOL_SIZE", 2)
+    monkeypatch.setattr(settings, "DB_POOL_MAX_OVERFLOW", 1)
+    engine = create_engine(f"sqlite:///{tmp_path / 'pool.db'}", **get_pool_options("test"))
+    yield engine
+    engine.dispose()
+
+def test_get_pool_options(monkeypatch: pytest.MonkeyPatch) -> None:
+    """プールのサイズ・再接続・待機時間は Settings から設定し、pre-ping はイベントで行うため無効とすること"""
+    monkeypatch.setattr(settings, "DB_POOL_SIZE", 20)
+    monkeypatch.setattr(settings, "DB_POOL_MAX_OVERFLOW", 5)
+    monkeypatch.setattr(settings, "DB_POOL_RECYCLE_SECONDS", 600)
+    monkeypatch.setattr(settings, "DB_POOL_TIMEOUT_SECONDS", 3)
+
+    options = get_pool_options("primary")
+    assert options == {
+        "poolclass": TimedQueuePool,
+        "pool_logging_name": "primary",
+        "pool_size": 20,
+        "max_overflow": 5,
+        "pool_recycle": 600,
+        "pool_timeout": 3,
+        "pool_pre_ping": False,
+    }
+    assert get_pool_options("primary", is_async=True)["poolclass"] is TimedAsyncAdaptedQueuePool
+
+def test_pool_stats_live(engine: Engine, monkeypatch: pytest.MonkeyPatch) -> None:
+    """checkout 中の接続数・checkout 件数・待機時間のヒストグラムを その時点の値で返却すること"""
+    monkeypatch.setattr(settings, "DB_POOL_PRE_PING_IDLE_SECONDS", -1)
+    setup_pool_events(engine, "test")
+
+    with engine.connect() as conn1, engine.connect() as conn2:
+        conn1.execute(text("SELECT 1"))
+        conn2.execute(text("SELECT 1"))
+        stats = get_pool_stats()["test"]
+        assert (stats["size"], stats["checked_out"], stats["overflow"]) == (2, 2, 0)
+
+    stats = get_pool_stats()["test"]
+    assert (stats["checked_out"], stats["checked_in"]) == (0, 2)
+    assert (stats["checkouts"], stats["connects"], stats["pings"]) == (2, 2, 0)
+    assert stats["checkout_wait_seconds_histogram"]["+Inf"] == 2
+    assert stats["checkout_wait_seconds_max"] >= 0
+
+def test_pre_ping_idle_connection(engine: Engine, monkeypatch: pytest.MonkeyPatch) -> None:
+    """idle 時間を超えた接続のみ pre-ping し、失敗した接続は破棄して 新しい接続を使用すること"""
+    monkeypatch.setattr(settings, "DB_POOL_PRE_PING_IDLE_SECONDS", 0)
+    setup_pool_events(engine, "test")
+
+    with engine.connect() as conn: # 新規接続は pre-ping しない
+        conn.execute(text("SELECT 1"))
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+    stats = get_pool_stats()["test"]
+    assert (stats["pings"], stats["ping_failures"], stats["connects"]) == (1, 0, 1)
+
+    def do_ping(dbapi_connection: Any) -> bool:
+        raise RuntimeError("connection lost")
+    monkeypatch.setattr(engine.dialect, "do_ping", do_ping)
+    with engine.connect() as conn: # 再接続した新規接続は pre-ping しない
+        conn.execute(text("SELECT 1"))
+    stats = get_pool_stats()["test"]
+    assert (stats["pings"], stats["ping_failures"], stats["invalidations"], stats["connects"]) == (2, 1, 1, 2)
\ No newline at end of file
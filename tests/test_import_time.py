@@ -0,0 +1,16 @@
+import statistics
+from benchmarks.bench_import_time import FORBIDDEN_MODULES, measure
+
+# app.main の import 時間の上限 (Lambda のコールドスタート時の初期化コスト). 実行環境の差を見込んで余裕を持たせる
+IMPORT_BUDGET_MS = 1500
+REPEAT           = 3
+
+def test_import_time_budget() -> None:
+    """新しいプロセスでの app.main の import が上限時間内に終わり、起動時に不要なモジュールを import しないこと"""
+    runs     = [measure("app.main") for _ in range(REPEAT)]
+    total_ms = statistics.median(ms for ms, _, _ in runs)
+    assert total_ms <= IMPORT_BUDGET_MS, f"import app.main took {total_ms:.1f}ms (budget {IMPORT_BUDGET_MS}ms)"
+
+    _, children, imported = runs[-1]
+    forbidden = sorted(m for m in FORBIDDEN_MODULES if any(name == m or name.startswith(f"{m}.") for name in imported))
+    assert forbidden == [], f"imported at startup: {forbidden}, slowest: {sorted(children.items(), key=lambda x: -x[1])[:5]}"
\ No newline at end of file
@@ -0,0 +1,73 @@
+from pathlib import Path
+import pytest
+from app.core.language_analyzer import MmapDictionary, SimpleAnalyzerBackend, build_dictionary
+
+WORDS = [
+    "# 表層形, 辞書形, 読み, 正規化形, 品詞",
+    "東京都\t東京都\tトウキョウト\t東京都\t名詞,固有名詞,地名,一般,*,*",
+    "東京\t東京\tトウキョウ\t東京\t名詞,固有名詞,地名,一般,*,*",
+    "京都\t京都\tキョウト\t京都\t名詞,固有名詞,地名,一般,*,*",
+    "に\tに\tニ\tに\t助詞,格助詞,*,*,*,*",
+    "住む\t住む\tスム\t住む\t動詞,一般,*,*,五段-マ行,終止形-一般",
+    "",
+    "apple\tapple\tアップル\tapple\t名詞,普通名詞,一般,*,*,*",
+]
+
+@pytest.fixture
+def dictionary_path(tmp_path: Path) -> str:
+    """fixture: WORDS を build_dictionary でソートした辞書"""
+    src = tmp_path / "words.tsv"
+    dst = tmp_path / "dictionary.tsv"
+    src.write_text("\n".join(WORDS) + "\n", encoding="utf-8")
+    assert build_dictionary(str(src), str(dst)) == 6
+    return str(dst)
+
+def test_build_dictionary(dictionary_path: str) -> None:
+    """表層形のバイト順にソートされ、コメント・空行は除かれること"""
+    lines    = Path(dictionary_path).read_text(encoding="utf-8").split("\n")
+    surfaces = [line.split("\t", 1)[0].encode("utf-8") for line in lines]
+    assert surfaces == sorted(surfaces)
+    assert len(lines) == 6
+
+@pytest.mark.parametrize(
+    "surface, expected",
+    [
+        ("apple", ("apple", "apple", "アップル", "apple", "名詞,普通名詞,一般,*,*,*")),
+        ("東京", ("東京", "東京", "トウキョウ", "東京", "名詞,固有名詞,地名,一般,*,*")),
+        ("東京都", ("東京都", "東京都", "トウキョウト", "東京都", "名詞,固有名詞,地名,一般,*,*")),
+        ("住む", ("住む", "住む", "スム", "住む", "動詞,一般,*,*,五段-マ行,終止形-一般")),
+        ("に", ("に", "に", "ニ", "に", "助詞,格助詞,*,*,*,*")),
+        ("app", None),    # 登録済の表層形の前方一致
+        ("東", None),
+        ("東京都庁", None),
+        ("aaa", None),    # 先頭の行より前
+        ("龍", None),     # 末尾の行より後
+        ("", None),
+    ],
+)
+def test_lookup(dictionary_path: str, surface: str, expected: tuple[str, ...] | None) -> None:
+    """表層形が完全に一致する行のみを返却すること"""
+    assert MmapDictionary(dictionary_path).lookup(surface) == expected
+
+def test_max_length(dictionary_path: str) -> None:
+    """最長の表層形の文字数 (バイト数ではない)"""
+    assert MmapDictionary(dictionary_path).max_length == 5
+
+def test_simple_backend_longest_match(dictionary_path: str) -> None:
+    """辞書の最長一致で分割し、辞書にない部分は文字種の連続で分割すること"""
+    tokens = SimpleAnalyzerBackend(dictionary_path).tokenize("東京都に住むネコ 2匹")
+    assert [(token[0], token[4][0], token[5], token[6]) for token in tokens] == [
+        ("東京都", "名詞", 0, 3),
+        ("に", "助詞", 3, 4),
+        ("住む", "動詞", 4, 6),
+        ("ネコ", "名詞", 6, 8),
+        (" ", "空白", 8, 9),
+        ("2", "名詞", 9, 10),
+        ("匹", "名詞", 10, 11),
+    ]
+    assert tokens[3][2] == "ネコ"
+
+def test_simple_backend_without_dictionary() -> None:
+    """辞書が未指定の場合は 文字種の連続のみで分割すること"""
+    tokens = SimpleAnalyzerBackend("").tokenize("すもも123")
+    assert [(token[0], token[2]) for token in tokens] == [("すもも", "スモモ"), ("123", "")]
\ No newline at end of file
@@ -0,0 +1,113 @@
+import logging
+from typing import Any
+import pytest
+from app.core.logger import pipeline
+from app.core.logger.pipeline import AccessLogRouteFilter, RateLimitFilter
+
+class FakeClock:
+    """time.monotonic の代わりに advance() で進める時刻"""
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> FakeClock:
+    clock = FakeClock()
+    monkeypatch.setattr(pipeline.time, "monotonic", clock)
+    return clock
+
+# uvicorn のアクセスログの形式
+ACCESS_LOG_FORMAT = '%s - "%s %s HTTP/%s" %d'
+
+def make_record(name: str, level: int = logging.INFO, msg: str = "message", args: Any = None) -> logging.LogRecord:
+    return logging.LogRecord(name, level, __file__, 0, msg, args, None)
+
+def apply(log_filter: logging.Filter, name: str, count: int, level: int = logging.INFO) -> list[bool]:
+    return [bool(log_filter.filter(make_record(name, level))) for _ in range(count)]
+
+def test_rate_limit_burst(clock: FakeClock) -> None:
+    """burst 件まで出力し、以降は 1秒あたり rate 件に制限して 破棄した件数を次のログの suppressed に設定すること"""
+    log_filter = RateLimitFilter({"app": 2.0}, burst=3, sample_rates={})
+    assert apply(log_filter, "app.api", 5) == [True, True, True, False, False]
+
+    clock.advance(0.5)
+    record = make_record("app.core")
+    assert log_filter.filter(record)
+    assert record.suppressed == 2
+    assert apply(log_filter, "app.api", 1) == [False]
+
+    clock.advance(1)
+    record = make_record("app.api")
+    assert log_filter.filter(record)
+    assert record.suppressed == 1
+    record = make_record("app.api")
+    assert log_filter.filter(record)
+    assert not hasattr(record, "suppressed")
+
+def test_rate_limit_refill_capped(clock: FakeClock) -> None:
+    """長時間出力がなくても burst 件を超えて出力しないこと"""
+    log_filter = RateLimitFilter({"app": 10.0}, burst=2, sample_rates={})
+    assert apply(log_filter, "app", 2) == [True, True]
+    clock.advance(60)
+    assert apply(log_filter, "app", 3) == [True, True, False]
+
+def test_rate_limit_warning(clock: FakeClock) -> None:
+    """WARNING 以上は 制限を超えても出力し、制限の件数に含めないこと"""
+    log_filter = RateLimitFilter({"app": 1.0}, burst=1, sample_rates={"app": 0.0})
+    assert apply(log_filter, "app", 1, level=logging.WARNING) == [True]
+    assert apply(log_filter, "app", 1, level=logging.ERROR) == [True]
+    log_filter = RateLimitFilter({"app": 1.0}, burst=1, sample_rates={})
+    assert apply(log_filter, "app", 2) == [True, False]
+    assert apply(log_filter, "app", 2, level=logging.WARNING) == [True, True]
+
+def test_rate_limit_logger_match(clock: FakeClock) -> None:
+    """logger 名の前方一致は . 区切りで判定し、最も長く一致する設定を使用すること"""
+    log_filter = RateLimitFilter({"app": 1.0, "app.noisy": 1.0}, burst=1, sample_rates={})
+    assert apply(log_filter, "application", 3) == [True, True, True]
+    assert apply(log_filter, "sqlalchemy", 3) == [True, True, True]
+    # app と app.noisy は別々に制限する
+    assert apply(log_filter, "app.noisy.sub", 2) == [True, False]
+    assert apply(log_filter, "app.api", 2) == [True, False]
+
+@pytest.mark.parametrize("value, expected", [(0.29, True), (0.3, False), (0.9, False)])
+def test_sampling(monkeypatch: pytest.MonkeyPatch, value: float, expected: bool) -> None:
+    """sample_rates の割合のみ出力すること"""
+    monkeypatch.setattr(pipeline.random, "random", lambda: value)
+    log_filter = RateLimitFilter({}, burst=1, sample_rates={"app.debug": 0.3})
+    assert apply(log_filter, "app.debug", 3) == [expected] * 3
+    assert apply(log_filter, "app", 1) == [True]
+
+@pytest.mark.parametrize(
+    "path, expected",
+    [
+        ("/health", False),
+        ("/health?full=1", False),
+        ("/metrics/requests", False),
+        ("/todos?page=2", True),
+        ("/users/health", True),
+    ],
+)
+def test_access_log_route_filter(path: str, expected: bool) -> None:
+    """excluded_paths に前方一致する path は出力しないこと"""
+    log_filter = AccessLogRouteFilter(["/health", "/metrics"])
+    record     = make_record("uvicorn.access", msg=ACCESS_LOG_FORMAT, args=("127.0.0.1:50000", "GET", path, "1.1", 200))
+    assert bool(log_filter.filter(record)) is expected
+
+def test_access_log_route_filter_attributes() -> None:
+    """出力するログには method・query を除いた path・status_code を設定すること"""
+    log_filter = AccessLogRouteFilter(["/health"])
+    record     = make_record("uvicorn.access", msg=ACCESS_LOG_FORMAT, args=("127.0.0.1:50000", "POST", "/todos?page=2", "1.1", 201))
+    assert log_filter.filter(record)
+    assert (record.http_method, record.path, record.status_code) == ("POST", "/todos", 201)
+    assert record.getMessage() == '127.0.0.1:50000 - "POST /todos?page=2 HTTP/1.1" 201'
+
+def test_access_log_route_filter_other_args() -> None:
+    """アクセスログの形式でない args のログは そのまま出力すること"""
+    log_filter = AccessLogRouteFilter(["/health"])
+    assert log_filter.filter(make_record("uvicorn.access"))
+    assert log_filter.filter(make_record("uvicorn.access", msg="%s", args=("/health",)))
\ No newline at end of file
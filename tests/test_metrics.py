@@ -0,0 +1,82 @@
+from collections.abc import Iterator
+from typing import Any
+import pytest
+from app.core.metrics import MetricsMiddleware, get_request_db_stats, render_metrics, request_metrics
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import Engine
+
+@pytest.fixture
+def metrics(tmp_path: Any) -> Iterator[FastAPI]:
+    """fixture: MetricsMiddleware を登録し、SQLite にクエリを実行する app"""
+    installed = request_metrics.installed
+    request_metrics.reset()
+    request_metrics.install()
+    engine = create_engine(f"sqlite:///{tmp_path / 'metrics.db'}", pool_logging_name="test")
+
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+
+    @app.get("/items/{id}")
+    def get_item(id: int) -> dict[str, Any]:
+        with engine.connect() as conn:
+            for _ in range(id):
+                conn.execute(text("SELECT 1"))
+        return {"db": get_request_db_stats()}
+
+    yield app
+    engine.dispose()
+    if not installed:
+        request_metrics.uninstall()
+    request_metrics.reset()
+
+@pytest.mark.asyncio
+async def test_metrics_middleware(metrics: FastAPI) -> None:
+    """route のテンプレート・ステータス毎に件数を記録し、リクエスト毎のクエリ数を記録すること"""
+    async with AsyncClient(transport=ASGITransport(app=metrics), base_url="http://test") as client:
+        res = await client.get("/items/2")
+        assert res.json()["db"][0] == 2 # sync の endpoint (threadpool) でもリクエストのクエリ数を取得できる
+        await client.get("/items/3")
+        await client.get("/items/x")
+        await client.get("/unknown")
+
+    assert request_metrics.requests == {
+        ("GET", "/items/{id}", 200): 2,
+        ("GET", "/items/{id}", 422): 1,
+        ("GET", "<unmatched>", 404): 1,
+    }
+    assert request_metrics.in_flight == 0
+    assert request_metrics.db_queries[("GET", "/items/{id}")].sum == 5
+    assert request_metrics.engine_queries["test"][0] == 5
+
+    content = render_metrics()
+    assert 'http_requests_total{method="GET",route="/items/{id}",status="200"} 2' in content
+    assert 'http_request_db_queries_bucket{method="GET",route="/items/{id}",le="+Inf"} 3' in content
+    assert 'db_queries_total{engine="test"} 5' in content
+
+def test_render_metrics_groups() -> None:
+    """プール・キャッシュ等の統計情報は 数値を gauge、*_histogram を histogram として出力し、それ以外は出力しないこと"""
+    stats = {
+        "primary": {"size": 5, "overflow": None, "url": "mysql://", "wait_seconds_sum": 0.5, "wait_seconds_histogram": {"0.1": 1, "+Inf": 2}},
+    }
+    lines = render_metrics([("db_pool", "pool", stats)]).splitlines()
+
+    assert 'db_pool_size{pool="primary"} 5' in lines
+    assert not any(line.startswith(("db_pool_overflow{", "db_pool_url")) for line in lines)
+    assert 'db_pool_wait_seconds_bucket{pool="primary",le="+Inf"} 2' in lines
+    assert 'db_pool_wait_seconds_sum{pool="primary"} 0.5' in lines
+    assert 'db_pool_wait_seconds_count{pool="primary"} 2' in lines
+
+def test_query_listeners_only_when_installed() -> None:
+    """install() するまで クエリの計測イベントを登録しないこと"""
+    installed = request_metrics.installed
+    request_metrics.uninstall()
+    try:
+        assert not event.contains(Engine, "before_cursor_execute", request_metrics._before_cursor_execute)
+        request_metrics.install()
+        request_metrics.install() # 2回目は登録しない
+        assert event.contains(Engine, "before_cursor_execute", request_metrics._before_cursor_execute)
+    finally:
+        if not installed:
+            request_metrics.uninstall()
\ No newline at end of file
@@ -0,0 +1,52 @@
+import asyncio
+import threading
+from collections.abc import Iterator
+import pytest
+from app.core import password_hasher as password_hasher_module
+from app.core.password_hasher import PasswordHasher
+from app.exceptions.core import APIException
+from passlib.hash import bcrypt
+
+@pytest.fixture
+def hasher() -> Iterator[PasswordHasher]:
+    """fixture: 実行中 1件・待機 1件までを受け付ける hasher"""
+    hasher = PasswordHasher("thread", workers=1, queue_limit=1)
+    yield hasher
+    hasher.shutdown()
+
+@pytest.mark.asyncio
+async def test_runs_off_event_loop(hasher: PasswordHasher) -> None:
+    """ハッシュ化は イベントループのスレッドではなく専用の executor で実行すること"""
+    thread_name = await hasher._run(lambda: threading.current_thread().name)
+    assert thread_name.startswith("password-hasher")
+    assert hasher.stats()["count"] == 1
+
+@pytest.mark.asyncio
+async def test_service_busy_when_queue_is_full(hasher: PasswordHasher) -> None:
+    """実行中 + 待機中の件数が workers + queue_limit に達した場合は 待機せず SERVICE_BUSY とすること"""
+    released = threading.Event()
+    running  = [asyncio.create_task(hasher._run(released.wait, 5)) for _ in range(2)]
+    await asyncio.sleep(0.05)
+    assert hasher.stats()["pending"] == 2
+
+    with pytest.raises(APIException) as e:
+        await hasher._run(released.wait, 5)
+    assert e.value.status_code == 503
+    assert e.value.detail["error_code"] == "SERVICE_BUSY"
+    assert hasher.stats()["rejected"] == 1
+
+    released.set()
+    assert await asyncio.gather(*running) == [True, True]
+    assert hasher.stats()["pending"] == 0
+    assert await hasher._run(released.wait, 5) # 空きができた後は受け付ける
+
+@pytest.mark.asyncio
+async def test_verify_and_update_rehashes_deprecated_hash(monkeypatch: pytest.MonkeyPatch, hasher: PasswordHasher) -> None:
+    """現在の設定と cost が異なるハッシュは 検証成功時に再ハッシュした値を返却すること"""
+    monkeypatch.setattr(password_hasher_module, "pwd_context", password_hasher_module.pwd_context.copy(bcrypt__rounds=5))
+    old_hash = bcrypt.using(rounds=4).hash("secret")
+
+    assert await hasher.verify_and_update("wrong", old_hash) == (False, None)
+    is_valid, new_hash = await hasher.verify_and_update("secret", old_hash)
+    assert is_valid and new_hash is not None and new_hash != old_hash
+    assert await hasher.verify_and_update("secret", new_hash) == (True, None)
\ No newline at end of file
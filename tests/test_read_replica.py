@@ -0,0 +1,116 @@
+from collections.abc import AsyncGenerator
+from typing import Any
+import pytest
+import pytest_asyncio
+from app.core import database
+from app.core.database import LAST_WRITE_COOKIE, LAST_WRITE_HEADER, ReadYourWritesMiddleware, ReplicaRouter, RoutingSession
+from fastapi import Depends, FastAPI
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import Column, Integer, MetaData, String, Table, insert, select
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+metadata = MetaData()
+items    = Table("items", metadata, Column("id", Integer, primary_key=True), Column("name", String(50)))
+
+async def create_engine_with_row(path: Any, name: str | None) -> AsyncEngine:
+    """items テーブルに name の 1件を登録した SQLite のエンジンを生成する. name が None の場合はテーブルを作成しない"""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    if name is not None:
+        async with engine.begin() as conn:
+            await conn.run_sync(metadata.create_all)
+            await conn.execute(insert(items).values(name=name))
+    return engine
+
+@pytest_asyncio.fixture
+async def routing(tmp_path: Any, monkeypatch: pytest.MonkeyPatch) -> AsyncGenerator[sessionmaker, None]:
+    """
+    fixture: プライマリ・レプリカを別の SQLite のファイルとし、RoutingSession の session factory を返却する
+    参照先は 取得した name ("primary" / "replica") で判別する
+    """
+    primary = await create_engine_with_row(tmp_path / "primary.db", "primary")
+    replica = await create_engine_with_row(tmp_path / "replica.db", "replica")
+    session_factory = sessionmaker(
+        autocommit=False, autoflush=False, bind=primary, class_=AsyncSession, sync_session_class=RoutingSession,
+    )
+    monkeypatch.setattr(database, "replica_router", ReplicaRouter([replica], retry_seconds=30))
+    monkeypatch.setattr(database, "get_read_only_engine", lambda: primary)
+    monkeypatch.setattr(database, "get_async_session_factory", lambda: session_factory)
+    yield session_factory
+    await primary.dispose()
+    await replica.dispose()
+
+async def get_names(db: AsyncSession) -> list[str]:
+    return list((await db.execute(select(items.c.name).order_by(items.c.id))).scalars())
+
+@pytest.mark.asyncio
+async def test_select_uses_replica(routing: sessionmaker) -> None:
+    """use_replica 指定時は SELECT をレプリカで実行し、未指定時はプライマリで実行すること"""
+    async with routing() as db:
+        db.info["use_replica"] = True
+        assert await get_names(db) == ["replica"]
+    async with routing() as db:
+        assert await get_names(db) == ["primary"]
+
+@pytest.mark.asyncio
+async def test_read_your_writes_in_session(routing: sessionmaker) -> None:
+    """書き込みを行った後の参照は レプリカではなくプライマリで実行すること"""
+    async with routing() as db:
+        db.info["use_replica"] = True
+        await db.execute(insert(items).values(name="written"))
+        assert await get_names(db) == ["primary", "written"]
+        await db.commit()
+
+@pytest.mark.asyncio
+async def test_replica_error_falls_back(tmp_path: Any, routing: sessionmaker) -> None:
+    """レプリカの実行エラー時は レプリカを除外して プライマリで 1度だけ再実行すること"""
+    broken = await create_engine_with_row(tmp_path / "broken.db", None) # items テーブルが存在しないためエラーとなる
+    database.replica_router.engines[:] = [broken]
+
+    async with routing() as db:
+        db.info["use_replica"] = True
+        assert await get_names(db) == ["primary"]
+    assert [replica["healthy"] for replica in database.replica_router.stats()] == [False]
+    await broken.dispose()
+
+def test_replica_router_skips_unhealthy() -> None:
+    """ラウンドロビンで選択し、除外中のレプリカは選択せず、全て除外中の場合は None を返却すること"""
+    engines = [create_async_engine("sqlite+aiosqlite://") for _ in range(2)]
+    router  = ReplicaRouter(engines, retry_seconds=30)
+    assert [router.choose() for _ in range(4)] == [engines[0], engines[1], engines[0], engines[1]]
+
+    router.mark_unhealthy(engines[0])
+    assert [router.choose() for _ in range(2)] == [engines[1], engines[1]]
+    router.mark_unhealthy(engines[1])
+    assert router.choose() is None
+
+@pytest.mark.asyncio
+async def test_read_your_writes_sticky(routing: sessionmaker) -> None:
+    """書き込みを行ったクライアントの参照は DB_REPLICA_STICKY_SECONDS の間 プライマリで実行すること"""
+    app = FastAPI()
+    app.add_middleware(ReadYourWritesMiddleware)
+
+    @app.post("/items")
+    async def create_item() -> None:
+        async with routing() as db:
+            await db.execute(insert(items).values(name="written"))
+            await db.commit()
+
+    @app.get("/items")
+    async def get_items(db: AsyncSession = Depends(database.get_read_db)) -> list[str]:
+        return await get_names(db)
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        res = await client.get("/items")
+        assert res.json() == ["replica"]
+        assert LAST_WRITE_HEADER not in res.headers # 参照のみの場合は 最終書き込み時刻を返却しない
+
+        res = await client.post("/items")
+        assert res.headers[LAST_WRITE_HEADER] == client.cookies[LAST_WRITE_COOKIE]
+
+        res = await client.get("/items") # cookie を送信する
+        assert res.json() == ["primary", "written"]
+
+        client.cookies.clear()
+        res = await client.get("/items", headers={LAST_WRITE_HEADER: "0"}) # 期限切れの場合はレプリカで実行する
+        assert res.json() == ["replica"]
\ No newline at end of file
@@ -0,0 +1,135 @@
+import asyncio
+import socket
+import threading
+import time
+from collections.abc import Iterator
+import pytest
+from app.core import resolver
+from app.core.cache import TTLCache
+from app.core.resolver import HostResolver
+
+class FakeDNS:
+    """gethostbyaddr の代わりに 呼び出しを記録し、release() まで応答を遅らせる"""
+    def __init__(self, hosts: dict[str, str]) -> None:
+        self.hosts    = hosts
+        self.calls: list[str] = []
+        self.released = threading.Event()
+        self.released.set()
+
+    def hold(self) -> None:
+        self.released.clear()
+
+    def release(self) -> None:
+        self.released.set()
+
+    def gethostbyaddr(self, ip_address: str) -> tuple[str, list[str], list[str]]:
+        self.calls.append(ip_address)
+        self.released.wait(timeout=5)
+        if ip_address not in self.hosts:
+            raise socket.herror(1, "Unknown host")
+        return self.hosts[ip_address], [], [ip_address]
+
+@pytest.fixture
+def dns(monkeypatch: pytest.MonkeyPatch) -> Iterator[FakeDNS]:
+    """fixture: 逆引きを FakeDNS に置き換える"""
+    dns = FakeDNS({"192.0.2.1": "host1.example.com", "192.0.2.2": "host2.example.com"})
+    monkeypatch.setattr(resolver.socket, "gethostbyaddr", dns.gethostbyaddr)
+    yield dns
+    dns.release()
+
+@pytest.fixture
+def host_resolver() -> Iterator[HostResolver]:
+    """fixture: 設定値に依存しない HostResolver"""
+    host_resolver = HostResolver(
+        timeout=1.0,
+        workers=2,
+        max_inflight=2,
+        cache=TTLCache(maxsize=100, ttl=60),
+        negative_ttl=0.1,
+    )
+    yield host_resolver
+    host_resolver.shutdown()
+
+async def wait_inflight(host_resolver: HostResolver) -> None:
+    """継続中の逆引きの完了を待つ"""
+    await asyncio.gather(*list(host_resolver._inflight.values()))
+
+@pytest.mark.asyncio
+async def test_resolve_cached(host_resolver: HostResolver, dns: FakeDNS) -> None:
+    """解決できたホスト名はキャッシュし、以降は逆引きしないこと"""
+    assert await host_resolver.resolve("192.0.2.1", budget=1) == "host1.example.com"
+    assert await host_resolver.resolve("192.0.2.1", budget=1) == "host1.example.com"
+    assert dns.calls == ["192.0.2.1"]
+    assert host_resolver.stats()["resolved"] == 1
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("ip_address", [None, "", "localhost", "999.0.0.1"])
+async def test_resolve_invalid(host_resolver: HostResolver, dns: FakeDNS, ip_address: str | None) -> None:
+    """IP アドレスでない場合は逆引きしないこと"""
+    assert await host_resolver.resolve(ip_address, budget=1) is None
+    assert dns.calls == []
+
+@pytest.mark.asyncio
+async def test_resolve_dedupe(host_resolver: HostResolver, dns: FakeDNS) -> None:
+    """同じ IP の同時の逆引きは 1回にまとめること"""
+    dns.hold()
+    waiting = asyncio.gather(*[host_resolver.resolve("192.0.2.1", budget=1) for _ in range(5)])
+    await asyncio.sleep(0.05)
+    dns.release()
+    assert await waiting == ["host1.example.com"] * 5
+    assert dns.calls == ["192.0.2.1"]
+    assert host_resolver.stats()["lookups"] == 1
+
+@pytest.mark.asyncio
+async def test_resolve_budget(host_resolver: HostResolver, dns: FakeDNS) -> None:
+    """budget 秒で待機を打ち切り、逆引きは継続して 以降の呼び出しではキャッシュを返却すること"""
+    dns.hold()
+    start = time.perf_counter()
+    assert await host_resolver.resolve("192.0.2.1", budget=0.05) is None
+    assert time.perf_counter() - start < 0.5
+    assert host_resolver.stats()["budget_exceeded"] == 1
+    assert host_resolver.stats()["inflight"] == 1
+
+    dns.release()
+    await wait_inflight(host_resolver)
+    assert await host_resolver.resolve("192.0.2.1", budget=0) == "host1.example.com"
+    assert dns.calls == ["192.0.2.1"]
+
+@pytest.mark.asyncio
+async def test_resolve_max_inflight(host_resolver: HostResolver, dns: FakeDNS) -> None:
+    """同時の逆引きが max_inflight を超える場合は 逆引きせずに None を返却すること"""
+    dns.hold()
+    assert await host_resolver.resolve("192.0.2.1", budget=0) is None
+    assert await host_resolver.resolve("192.0.2.2", budget=0) is None
+    assert await host_resolver.resolve("192.0.2.3", budget=0) is None
+    assert host_resolver.stats()["dropped"] == 1
+
+    dns.release()
+    await wait_inflight(host_resolver)
+    assert sorted(dns.calls) == ["192.0.2.1", "192.0.2.2"]
+
+@pytest.mark.asyncio
+async def test_resolve_negative_cache(host_resolver: HostResolver, dns: FakeDNS) -> None:
+    """解決できなかった IP は negative_ttl 秒の間 逆引きせずに None を返却すること"""
+    assert await host_resolver.resolve("192.0.2.9", budget=1) is None
+    assert await host_resolver.resolve("192.0.2.9", budget=1) is None
+    assert dns.calls == ["192.0.2.9"]
+    assert host_resolver.stats()["unresolved"] == 1
+
+    await asyncio.sleep(0.15)
+    assert await host_resolver.resolve("192.0.2.9", budget=1) is None
+    assert dns.calls == ["192.0.2.9", "192.0.2.9"]
+
+@pytest.mark.asyncio
+async def test_resolve_timeout(dns: FakeDNS) -> None:
+    """timeout 秒で逆引きを打ち切り、解決できなかった IP としてキャッシュすること"""
+    host_resolver = HostResolver(timeout=0.05, workers=1, max_inflight=1, cache=TTLCache(ttl=60), negative_ttl=60)
+    try:
+        dns.hold()
+        assert await host_resolver.resolve("192.0.2.1", budget=1) is None
+        assert host_resolver.stats()["timeouts"] == 1
+        dns.release()
+        assert await host_resolver.resolve("192.0.2.1", budget=1) is None
+        assert dns.calls == ["192.0.2.1"]
+    finally:
+        host_resolver.shutdown()
\ No newline at end of file
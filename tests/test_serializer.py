@@ -0,0 +1,48 @@
+import datetime
+import json
+import orjson
+import pytest
+from app import schemas
+from app.core.serializer import ModelJSONResponse, dump_model, get_field_plan
+from fastapi.encoders import jsonable_encoder
+
+NOW = datetime.datetime(2026, 10, 17, 12, 34, 56, 789012)
+
+def make_todo(i: int, tags: list[schemas.TagResponse] | None) -> schemas.TodoResponse:
+    return schemas.TodoResponse(
+        id=f"todo-{i}",
+        title=f"title-{i}",
+        description=None,
+        completed_at=NOW.replace(tzinfo=datetime.timezone.utc),
+        tags=tags,
+        created_at=NOW,
+        updated_at=NOW,
+    )
+
+@pytest.mark.parametrize("meta", [
+    schemas.PagingMeta(current_page=1, total_page_count=None, total_data_count=None, per_page=2, count_strategy="none"),
+    schemas.CursorPagingMeta(per_page=2, next_cursor="next", has_next=True),
+])
+def test_dump_model_matches_jsonable_encoder(meta: schemas.PagingMeta | schemas.CursorPagingMeta) -> None:
+    """orjson での変換結果が FastAPI の既定 (dict(by_alias=True) + jsonable_encoder) と同じであること"""
+    tags  = [schemas.TagResponse(id="tag-1", name="work", created_at=NOW, updated_at=None, deleted_at=None)]
+    model = schemas.TodosPagedResponse(data=[make_todo(1, tags), make_todo(2, None)], meta=meta)
+
+    assert json.loads(dump_model(model)) == jsonable_encoder(model.dict(by_alias=True))
+    assert json.loads(dump_model(model))["data"][0]["tags"][0]["createdAt"] == NOW.isoformat()
+
+def test_get_field_plan_cached() -> None:
+    """field 名 → alias の対応は schema 毎に 1度だけ算出し、model の field・Union の model を判別すること"""
+    plan = get_field_plan(schemas.TodosPagedResponse)
+    assert plan == (("data", "data", True), ("meta", "meta", True))
+    assert get_field_plan(schemas.TodosPagedResponse) is plan
+    assert ("completed_at", "completedAt", False) in get_field_plan(schemas.TodoResponse)
+
+def test_model_json_response() -> None:
+    """ModelJSONResponse は model を orjson で変換し、application/json で返却すること"""
+    model    = make_todo(1, [])
+    response = ModelJSONResponse(model, headers={"ETag": '"etag"'})
+
+    assert response.headers["content-type"] == "application/json"
+    assert response.headers["etag"] == '"etag"'
+    assert orjson.loads(response.body) == jsonable_encoder(model.dict(by_alias=True))
\ No newline at end of file
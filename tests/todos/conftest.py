@@ -1,24 +1,30 @@
-from __future__ import annotations
-import datetime
-import pytest_asyncio
-from app import models
-from sqlalchemy.orm import Session
-
-@pytest_asyncio.fixture
-async def data_set(db: Session) -> None:
-    await insert_todos(db)
-
-async def insert_todos(db: Session) -> None:
-    now  = datetime.datetime.now()
-    # 25 コデータを作成する
-    data = [
-        models.Todo(
-            id=str(i),
-            title=f"test-title-{i}",
-            description=f"test-description-{i}",
-            created_at=now - datetime.timedelta(day=i),
-        )
-        for i in range(1,25)
-    ]
-    db.add_all(data)
+from __future__ import annotations
+import datetime
+import pytest_asyncio
+import ulid
+from app import models
+from sqlalchemy.orm import Session
+from tests.database import client, db, db_proc, engine, mysql, user_login  # noqa: F401
+
+@pytest_asyncio.fixture
+async def data_set(db: Session) -> None:
+    await insert_todos(db)
+
+def get_todo_id(i: int) -> str:
+    """i 番目のテストデータの id (id は ULID のため 連番から生成する)"""
+    return ulid.from_int(i).str
+
+async def insert_todos(db: Session) -> None:
+    now  = datetime.datetime.now()
+    # 25 コデータを作成する
+    data = [
+        models.Todo(
+            id=get_todo_id(i),
+            title=f"test-title-{i}",
+            description=f"test-description-{i}",
+            created_at=now - datetime.timedelta(days=i),
+        )
+        for i in range(1,25)
+    ]
+    db.add_all(data)
     await db.commit()
\ No newline at end of file
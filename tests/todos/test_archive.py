@@ -0,0 +1,110 @@
+import datetime
+from typing import Any
+import pytest
+from app import crud, models
+from app.core import archive
+from app.core.config import settings
+from app.schemas.core import CountStrategyEnum, PagingQueryIn
+from app.schemas.tag import TagCreate
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+from tests.todos.conftest import get_todo_id
+
+def get_deleted_before() -> datetime.datetime:
+    """保持期間 (30日) を過ぎた論理削除の境界"""
+    return datetime.datetime.now() - datetime.timedelta(days=30)
+
+async def soft_delete_todos(db: AsyncSession, ids: list[str], days: int) -> None:
+    """ids の todo を days 日前に論理削除する. ids の順に古くする"""
+    deleted_at = datetime.datetime.now() - datetime.timedelta(days=days)
+    for i, id in enumerate(ids):
+        await db.execute(
+            update(models.Todo)
+            .where(models.Todo.id == id)
+            .values(deleted_at=deleted_at - datetime.timedelta(minutes=len(ids) - i))
+        )
+    await db.commit()
+
+async def archive_all(db: AsyncSession, batch_size: int) -> list[list[str]]:
+    """移動対象がなくなるまで archive_deleted を実行し、batch 毎の id を返却する"""
+    batches = []
+    while ids := await crud.todo.archive_deleted(db, get_deleted_before(), batch_size):
+        batches.append(ids)
+        await db.commit()
+    return batches
+
+@pytest.mark.asyncio
+async def test_archive_deleted(db: AsyncSession, data_set: None) -> None:
+    """保持期間を過ぎた論理削除のみを deleted_at 順に batch_size 件ずつ移動し、todos_tags も合わせて移動すること"""
+    await crud.todo.add_tags_to_todos(db, [(get_todo_id(1), [TagCreate(name="archive")])])
+    await db.commit()
+    expired = [get_todo_id(i) for i in (3, 1, 2)]
+    await soft_delete_todos(db, expired, days=40)
+    await soft_delete_todos(db, [get_todo_id(4)], days=1)
+
+    assert await archive_all(db, batch_size=2) == [expired[:2], expired[2:]]
+
+    live_ids = set((await db.execute(select(models.Todo.id).execution_options(include_deleted=True))).scalars())
+    assert not live_ids & set(expired)
+    assert get_todo_id(4) in live_ids
+    archived_ids = set((await db.execute(select(models.todos_archive.c.id))).scalars())
+    assert archived_ids == set(expired)
+
+    tag_links = (await db.execute(select(models.todos_tags_archive.c.todo_id))).scalars().all()
+    assert tag_links == [get_todo_id(1)]
+    live_links = (await db.execute(select(models.TodoTag.id).where(models.TodoTag.todo_id == get_todo_id(1)))).all()
+    assert live_links == []
+
+@pytest.mark.asyncio
+async def test_union_archive(db: AsyncSession, data_set: None) -> None:
+    """include_deleted の取得は アーカイブ済みのデータを含み、それ以外は含まないこと"""
+    archived = [get_todo_id(1), get_todo_id(2)]
+    await soft_delete_todos(db, archived, days=40)
+    await archive_all(db, batch_size=10)
+
+    todo = await crud.todo.get_db_obj_by_id(db, archived[0], include_deleted=True)
+    assert todo is not None
+    assert todo.title == "test-title-1"
+    assert todo.tags == [] # 紐付けは todos_tags_archive にあり 読み込まない
+    assert await crud.todo.get_db_obj_by_id(db, archived[0]) is None
+
+    paging_query_in = PagingQueryIn(page=1, per_page=30)
+    with_trashed    = await crud.todo.get_paged_list(
+        db, paging_query_in, include_deleted=True, count_strategy=CountStrategyEnum.exact,
+    )
+    assert with_trashed.meta.total_data_count == 24
+    assert set(archived) <= {todo.id for todo in with_trashed.data}
+
+    live = await crud.todo.get_paged_list(db, paging_query_in, count_strategy=CountStrategyEnum.exact)
+    assert live.meta.total_data_count == 22
+    assert not set(archived) & {todo.id for todo in live.data}
+
+@pytest.mark.asyncio
+async def test_archive_soft_deleted_batches(
+    engine: AsyncEngine,
+    db: AsyncSession,
+    data_set: None,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """batch_size 件毎に commit し、batch_size 未満となった時点で次のテーブルに進むこと"""
+    await soft_delete_todos(db, [get_todo_id(i) for i in range(1, 6)], days=40)
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine, class_=AsyncSession)
+    monkeypatch.setattr(archive, "get_async_session_factory", lambda: session_factory)
+    monkeypatch.setattr(settings, "ARCHIVE_BATCH_INTERVAL_SECONDS", 0)
+
+    batches: list[int] = []
+    archive_deleted    = crud.todo.archive_deleted
+    async def record_archive_deleted(*args: Any, **kwargs: Any) -> list[str]:
+        ids = await archive_deleted(*args, **kwargs)
+        batches.append(len(ids))
+        return ids
+    monkeypatch.setattr(crud.todo, "archive_deleted", record_archive_deleted)
+
+    results = await archive.archive_soft_deleted(retention_days=30, batch_size=2)
+
+    assert results == {"todos": 5, "tags": 0, "users": 0}
+    assert batches == [2, 2, 1]
+    async with session_factory() as other:
+        archived_ids = set((await other.execute(select(models.todos_archive.c.id))).scalars())
+    assert len(archived_ids) == 5 # batch 毎に commit されていること
\ No newline at end of file
@@ -0,0 +1,92 @@
+from typing import Any, Iterator
+from contextlib import contextmanager
+import pytest
+import ulid
+from app import crud, models
+from app.schemas.todo import TodoCreate, TodoUpdate
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from tests.todos.conftest import get_todo_id
+
+@contextmanager
+def capture_statements(engine: AsyncEngine) -> Iterator[list[str]]:
+    """実行された SQL を記録する (SAVEPOINT 等は除く)"""
+    statements: list[str] = []
+    def before_cursor_execute(conn: Any, cursor: Any, statement: str, *args: Any) -> None:
+        if statement.split(" ", 1)[0] in ("SELECT", "INSERT", "UPDATE"):
+            statements.append(statement.split(" ", 1)[0])
+
+    event.listen(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+
+@pytest.mark.asyncio
+async def test_create_many_batches(engine: AsyncEngine, db: AsyncSession) -> None:
+    """batch_size 件毎に INSERT を1回実行し、index は batch を跨いで通番とすること"""
+    with capture_statements(engine) as statements:
+        res = await crud.todo.create_many(db, [TodoCreate(title=f"bulk-{i}") for i in range(5)], batch_size=2)
+    await db.commit()
+
+    assert statements == ["INSERT"] * 3
+    assert [(r.index, r.status.value) for r in res.results] == [(i, "created") for i in range(5)]
+    assert (res.succeeded, res.failed) == (5, 0)
+    titles = (await db.execute(select(models.Todo.title).where(models.Todo.id.in_([r.id for r in res.results])))).scalars()
+    assert sorted(titles) == [f"bulk-{i}" for i in range(5)]
+
+@pytest.mark.asyncio
+async def test_create_many_failed_batch(db: AsyncSession, data_set: None, monkeypatch: pytest.MonkeyPatch) -> None:
+    """失敗した batch は全件を failed として巻き戻し、他の batch は作成すること"""
+    new_ids = [ulid.new().str, ulid.new().str, get_todo_id(1), ulid.new().str] # 3件目が既存の id と重複する
+    monkeypatch.setattr("app.crud.base.get_ulid", iter(new_ids).__next__)
+
+    res = await crud.todo.create_many(db, [TodoCreate(title=f"bulk-{i}") for i in range(4)], batch_size=2)
+    await db.commit()
+
+    assert [(r.index, r.id, r.status.value) for r in res.results] == [
+        (0, new_ids[0], "created"), (1, new_ids[1], "created"), (2, new_ids[2], "failed"), (3, new_ids[3], "failed"),
+    ]
+    assert res.results[2].error is not None
+    assert (res.succeeded, res.failed) == (2, 2)
+    assert await crud.todo.get_existing_ids(db, new_ids) == {new_ids[0], new_ids[1], get_todo_id(1)}
+
+@pytest.mark.asyncio
+async def test_update_many_batches(engine: AsyncEngine, db: AsyncSession, data_set: None) -> None:
+    """batch 毎に 存在確認の SELECT を1回実行し、更新内容が同一の id は1回の UPDATE で更新すること"""
+    items = [(get_todo_id(i), TodoUpdate(title="same")) for i in range(1, 5)] + [(get_todo_id(5), TodoUpdate(title="other"))]
+    with capture_statements(engine) as statements:
+        res = await crud.todo.update_many(db, items, batch_size=3)
+    await db.commit()
+
+    # batch 1: SELECT + UPDATE (same), batch 2: SELECT + UPDATE (same) + UPDATE (other)
+    assert statements == ["SELECT", "UPDATE", "SELECT", "UPDATE", "UPDATE"]
+    assert [(r.index, r.status.value) for r in res.results] == [(i, "updated") for i in range(5)]
+    stmt   = select(models.Todo.title).where(models.Todo.id.in_([get_todo_id(i) for i in range(1, 6)]))
+    titles = (await db.execute(stmt)).scalars().all()
+    assert sorted(titles) == ["other"] + ["same"] * 4
+
+@pytest.mark.asyncio
+async def test_delete_many_batches(engine: AsyncEngine, db: AsyncSession, data_set: None) -> None:
+    """batch を跨いで重複指定された id は already_deleted とし、削除の結果を index 順に返却すること"""
+    ids = [get_todo_id(1), get_todo_id(2), get_todo_id(1), get_todo_id(99)]
+    with capture_statements(engine) as statements:
+        res = await crud.todo.delete_many(db, ids=ids, batch_size=2)
+    await db.commit()
+
+    assert statements == ["SELECT", "UPDATE", "SELECT"] # 2つ目の batch は削除対象が無いため UPDATE しない
+    assert [(r.index, r.status.value) for r in res.results] == [
+        (0, "deleted"), (1, "deleted"), (2, "already_deleted"), (3, "not_found"),
+    ]
+    assert (res.succeeded, res.failed) == (2, 2)
+    assert await crud.todo.get_existing_ids(db, ids) == set()
+
+@pytest.mark.asyncio
+async def test_delete_many_by_conditions(db: AsyncSession, data_set: None) -> None:
+    """conditions 指定時は 条件に合致する未削除データを削除し、件数のみ返却すること"""
+    conditions = [models.Todo.title.in_(["test-title-1", "test-title-2"])]
+    res = await crud.todo.delete_many(db, conditions=conditions)
+    assert (res.succeeded, res.results) == (2, [])
+
+    res = await crud.todo.delete_many(db, conditions=conditions)
+    assert res.succeeded == 0
\ No newline at end of file
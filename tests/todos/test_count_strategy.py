@@ -0,0 +1,84 @@
+from typing import Any
+import pytest
+from app import crud, models
+from app.crud.base import count_cache
+from app.schemas.core import CountStrategyEnum, PagingQueryIn
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+async def get_page(db: AsyncSession, count_strategy: CountStrategyEnum, page: int = 1, per_page: int = 10) -> Any:
+    return await crud.todo.get_paged_list(db, PagingQueryIn(page=page, per_page=per_page), count_strategy=count_strategy)
+
+@pytest.mark.asyncio
+async def test_exact_count(db: AsyncSession, data_set: None) -> None:
+    """exact は COUNT の結果から 総件数・総ページ数・次ページ有無を返却すること"""
+    res = await get_page(db, CountStrategyEnum.exact, page=3)
+    assert (res.meta.total_data_count, res.meta.total_page_count, res.meta.has_next) == (24, 3, False)
+    assert res.meta.count_strategy == CountStrategyEnum.exact
+    assert len(res.data) == 4
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("page, count, has_next", [(2, 10, True), (3, 4, False)])
+async def test_none_count(
+    engine: AsyncEngine,
+    db: AsyncSession,
+    data_set: None,
+    page: int,
+    count: int,
+    has_next: bool,
+) -> None:
+    """none は COUNT を実行せず、1件多く取得して次ページ有無を判定すること"""
+    statements: list[str] = []
+    def before_cursor_execute(conn: Any, cursor: Any, statement: str, *args: Any) -> None:
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        res = await get_page(db, CountStrategyEnum.none, page=page)
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+
+    assert not any("count(" in statement.lower() for statement in statements), statements
+    assert (res.meta.total_data_count, res.meta.total_page_count) == (None, None)
+    assert (len(res.data), res.meta.has_next) == (count, has_next)
+
+@pytest.mark.asyncio
+async def test_cached_count(db: AsyncSession, data_set: None) -> None:
+    """cached は 有効期限内は COUNT の結果を再利用し、キャッシュを破棄すると再取得すること"""
+    count_cache.clear()
+    assert (await get_page(db, CountStrategyEnum.cached)).meta.total_data_count == 24
+
+    db.add(models.Todo(title="added", description="added"))
+    await db.commit()
+    res = await get_page(db, CountStrategyEnum.cached)
+    assert res.meta.total_data_count == 24
+    assert res.meta.count_strategy == CountStrategyEnum.cached
+
+    count_cache.clear()
+    assert (await get_page(db, CountStrategyEnum.cached)).meta.total_data_count == 25
+
+@pytest.mark.asyncio
+async def test_estimated_count_falls_back_to_exact(
+    db: AsyncSession,
+    data_set: None,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """推定行数を取得できない場合は exact で取得し、使用した strategy を返却すること"""
+    async def fail(*args: Any) -> int:
+        raise RuntimeError("EXPLAIN is not supported")
+    monkeypatch.setattr(crud.todo, "_get_estimated_count", fail)
+
+    res = await get_page(db, CountStrategyEnum.estimated)
+    assert res.meta.total_data_count == 24
+    assert res.meta.count_strategy == CountStrategyEnum.exact
+
+@pytest.mark.asyncio
+async def test_estimated_count(db: AsyncSession, data_set: None, monkeypatch: pytest.MonkeyPatch) -> None:
+    """estimated は 推定行数を総件数とし、COUNT を実行しないこと"""
+    async def estimate(*args: Any) -> int:
+        return 1000
+    monkeypatch.setattr(crud.todo, "_get_estimated_count", estimate)
+
+    res = await get_page(db, CountStrategyEnum.estimated)
+    assert (res.meta.total_data_count, res.meta.total_page_count, res.meta.has_next) == (1000, 100, True)
+    assert res.meta.count_strategy == CountStrategyEnum.estimated
\ No newline at end of file
@@ -0,0 +1,95 @@
+import datetime
+from typing import Any
+import pytest
+from app import crud, models
+from app.core.utils import encode_cursor
+from app.schemas.core import CursorPagingQueryIn, PagingModeEnum, SortDirectionEnum, SortQueryIn
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+from tests.todos.conftest import get_todo_id
+
+PER_PAGE = 5
+
+async def set_completed_at(db: AsyncSession) -> dict[str, datetime.datetime | None]:
+    """completed_at を 3件に1件 NULL、それ以外は 4種類の値 (同値を含む) に更新する"""
+    base   = datetime.datetime(2026, 10, 1)
+    values = {get_todo_id(i): None if i % 3 == 0 else base + datetime.timedelta(days=i % 4) for i in range(1, 25)}
+    for id, value in values.items():
+        await db.execute(update(models.Todo).where(models.Todo.id == id).values(completed_at=value))
+    await db.commit()
+    return values
+
+def expected_ids(values: dict[str, Any], is_desc: bool) -> list[str]:
+    """NULL を最小値として (値, id) で並べた id (MySQL の並び順)"""
+    ids = sorted(values, key=lambda id: (values[id] is not None, values[id] or datetime.datetime.min, id))
+    return list(reversed(ids)) if is_desc else ids
+
+async def get_page(db: AsyncSession, sort_query_in: SortQueryIn, **cursor: str) -> Any:
+    paging_query_in = CursorPagingQueryIn(paging_mode=PagingModeEnum.cursor, per_page=PER_PAGE, **cursor)
+    return await crud.todo.get_cursor_paged_list(db, paging_query_in, sort_query_in=sort_query_in)
+
+async def walk_pages(db: AsyncSession, sort_query_in: SortQueryIn) -> list[str]:
+    """next_cursor で末尾まで進んだ後、prev_cursor で先頭まで戻り、取得した id の並びが一致することを確認する"""
+    pages = [await get_page(db, sort_query_in)]
+    assert not pages[0].meta.has_prev and pages[0].meta.prev_cursor is None
+    while pages[-1].meta.has_next:
+        pages.append(await get_page(db, sort_query_in, after=pages[-1].meta.next_cursor))
+    assert pages[-1].meta.next_cursor is None
+    assert all(page.meta.has_prev for page in pages[1:])
+
+    backward = [pages[-1]]
+    while backward[-1].meta.has_prev:
+        backward.append(await get_page(db, sort_query_in, before=backward[-1].meta.prev_cursor))
+        assert backward[-1].meta.has_next
+    assert backward[-1].meta.prev_cursor is None
+
+    forward_ids  = [[todo.id for todo in page.data] for page in pages]
+    backward_ids = [[todo.id for todo in page.data] for page in reversed(backward)]
+    assert forward_ids == backward_ids
+    return [id for ids in forward_ids for id in ids]
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("direction", [SortDirectionEnum.asc, SortDirectionEnum.desc])
+async def test_cursor_paging_round_trip_with_nulls(
+    db: AsyncSession,
+    data_set: None,
+    direction: SortDirectionEnum,
+) -> None:
+    """NULL・同値を含むカラムの並び順で 前後のページを行き来しても 欠落・重複なく同じ並びになること"""
+    values        = await set_completed_at(db)
+    sort_query_in = SortQueryIn(sort_field="completed_at", direction=direction)
+    assert await walk_pages(db, sort_query_in) == expected_ids(values, direction == SortDirectionEnum.desc)
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("direction", [SortDirectionEnum.asc, SortDirectionEnum.desc])
+async def test_cursor_paging_round_trip_by_id(db: AsyncSession, data_set: None, direction: SortDirectionEnum) -> None:
+    """id の並び順でも 前後のページを行き来できること"""
+    ids = [get_todo_id(i) for i in range(1, 25)]
+    sort_query_in = SortQueryIn(sort_field="id", direction=direction)
+    assert await walk_pages(db, sort_query_in) == (list(reversed(ids)) if direction == SortDirectionEnum.desc else ids)
+
+def make_id_cursor(i: int) -> str:
+    """id の並び順で i 番目のテストデータを指すカーソル"""
+    return encode_cursor({"field": "id", "value": get_todo_id(i), "id": get_todo_id(i)})
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("cursor, expected, has_next, has_prev", [
+    ({"before": make_id_cursor(6)}, range(1, 6), True, False),
+    ({"before": make_id_cursor(1)}, [], True, False),
+    ({"after": make_id_cursor(19)}, range(20, 25), False, True),
+    ({"after": make_id_cursor(24)}, [], False, True),
+    # カーソルのデータが存在しない場合も カーソルより先のデータの有無で判定する
+    ({"before": make_id_cursor(25)}, range(20, 25), False, True),
+])
+async def test_cursor_paging_flags_at_both_ends(
+    db: AsyncSession,
+    data_set: None,
+    cursor: dict[str, str],
+    expected: Any,
+    has_next: bool,
+    has_prev: bool,
+) -> None:
+    """先頭・末尾のページでは カーソルの前後のデータの有無から has_next / has_prev を返却すること"""
+    res = await get_page(db, SortQueryIn(sort_field="id"), **cursor)
+    assert [todo.id for todo in res.data] == [get_todo_id(i) for i in expected]
+    assert (res.meta.has_next, res.meta.has_prev) == (has_next, has_prev)
\ No newline at end of file
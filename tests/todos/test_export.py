@@ -0,0 +1,97 @@
+import csv
+import io
+import json
+from typing import Any
+import pytest
+from app import crud
+from app.core.config import settings
+from app.core.export import iter_csv, iter_ndjson
+from app.schemas.core import SortDirectionEnum, to_camel
+from app.schemas.todo import TodoSortFieldEnum, TodoSortQueryIn
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+from starlette import status
+from tests.todos.conftest import get_todo_id
+
+@pytest.fixture
+def export_session(engine: AsyncEngine, monkeypatch: pytest.MonkeyPatch) -> None:
+    """export API は依存関係ではなく session factory から session を生成するため テスト用の engine を使用させる"""
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine, class_=AsyncSession)
+    monkeypatch.setattr("app.api.endpoints.todos.get_async_session_factory", lambda: session_factory)
+
+async def collect(chunks: Any) -> list[Any]:
+    return [chunk async for chunk in chunks]
+
+@pytest.mark.asyncio
+async def test_stream_list_partitions(db: AsyncSession, data_set: None) -> None:
+    """全データを chunk_size 件毎に 並び順を保って返却すること"""
+    sort_query_in = TodoSortQueryIn(sort_field=TodoSortFieldEnum.created_at, direction=SortDirectionEnum.desc)
+    chunks = await collect(crud.todo.stream_list(db, sort_query_in=sort_query_in, chunk_size=10))
+
+    assert [len(rows) for rows in chunks] == [10, 10, 4]
+    assert [row.id for rows in chunks for row in rows] == [get_todo_id(i) for i in range(1, 25)]
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("include_deleted, count", [(False, 22), (True, 24)])
+async def test_stream_list_deleted(db: AsyncSession, data_set: None, include_deleted: bool, count: int) -> None:
+    """論理削除済みのデータは include_deleted 指定時のみ返却すること"""
+    await crud.todo.delete_many(db, ids=[get_todo_id(1), get_todo_id(2)])
+    await db.commit()
+
+    chunks = await collect(crud.todo.stream_list(db, include_deleted=include_deleted))
+    assert sum(len(rows) for rows in chunks) == count
+
+@pytest.mark.asyncio
+async def test_iter_ndjson(db: AsyncSession, data_set: None) -> None:
+    """1行1データ・camelCase の key で出力すること"""
+    lines = "".join(await collect(iter_ndjson(crud.todo.stream_list(db, chunk_size=5)))).splitlines()
+
+    assert len(lines) == 24
+    row = json.loads(lines[0])
+    assert {"id", "title", "createdAt", "updatedAt", "completedAt"} <= row.keys()
+
+@pytest.mark.asyncio
+async def test_iter_csv_header_only(db: AsyncSession) -> None:
+    """データが 0件の場合も ヘッダ行を出力すること"""
+    columns = [column.key for column in crud.todo._select_columns]
+    body    = "".join(await collect(iter_csv(crud.todo.stream_list(db), columns)))
+
+    assert list(csv.reader(io.StringIO(body))) == [[to_camel(column) for column in columns]]
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("format, media_type, lines", [
+    ("ndjson", "application/x-ndjson", 24),
+    ("csv", "text/csv; charset=utf-8", 25), # ヘッダ行 + 24件
+])
+async def test_export_todos(
+    client: AsyncClient,
+    data_set: None,
+    export_session: None,
+    monkeypatch: pytest.MonkeyPatch,
+    format: str,
+    media_type: str,
+    lines: int,
+) -> None:
+    """export API は chunk_size によらず全件を 指定された形式で出力すること"""
+    monkeypatch.setattr(settings, "EXPORT_CHUNK_SIZE", 5)
+    res = await client.get("/todos/export", params={"format": format})
+
+    assert res.status_code == status.HTTP_200_OK
+    assert res.headers["content-type"] == media_type
+    assert res.headers["content-disposition"] == f'attachment; filename="todos.{format}"'
+    assert len(res.text.splitlines()) == lines
+
+@pytest.mark.asyncio
+async def test_get_paged_todos_per_page_limit(
+    client: AsyncClient,
+    data_set: None,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """一覧 API の per_page が上限を超える場合は エラーとし、全件取得は export API を使用させること"""
+    monkeypatch.setattr(settings, "PAGING_MAX_PER_PAGE", 10)
+    res = await client.get("/todos", params={"page": 1, "perPage": 10})
+    assert res.status_code == status.HTTP_200_OK
+
+    res = await client.get("/todos", params={"page": 1, "perPage": 11})
+    assert res.json()["detail"]["error_code"] == "PER_PAGE_LIMIT_EXCEEDED"
\ No newline at end of file
@@ -0,0 +1,87 @@
+import pytest
+from app import crud, models
+from app.core.search import FullTextSearchBackend, InvertedIndexSearchBackend, LikeSearchBackend, tokenize_ngram
+from app.schemas.core import PagingQueryIn
+from app.schemas.todo import TodoCreate, TodoUpdate
+from sqlalchemy.dialects import mysql
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import select
+from tests.todos.conftest import get_todo_id
+
+FIELDS = ("title", "description")
+
+async def search_titles(db: AsyncSession, q: str) -> list[str]:
+    res = await crud.todo.get_paged_list(db, PagingQueryIn(page=1, per_page=100), q=q)
+    return sorted(todo.title for todo in res.data)
+
+@pytest.mark.asyncio
+async def test_like_search(db: AsyncSession, data_set: None, monkeypatch: pytest.MonkeyPatch) -> None:
+    """LIKE は title・description のいずれかの部分一致で検索すること"""
+    monkeypatch.setattr(crud.todo, "search_backend", LikeSearchBackend(FIELDS))
+    assert await search_titles(db, "title-12") == ["test-title-12"]
+    assert await search_titles(db, "description-2") == ["test-title-2", *[f"test-title-{i}" for i in range(20, 25)]]
+    assert await search_titles(db, "not-found") == []
+
+def test_fulltext_search_sql() -> None:
+    """FULLTEXT は ft_todos_title_description と同じカラムの MATCH ... AGAINST で検索・関連度順に並び替えること"""
+    backend = FullTextSearchBackend(FIELDS)
+    stmt    = select(models.Todo.id) \
+        .where(*backend.get_conditions(models.Todo)) \
+        .order_by(*backend.get_relevance_order_by(models.Todo))
+    compiled = stmt.compile(dialect=mysql.dialect())
+    sql      = str(compiled)
+    assert compiled.construct_params(backend.get_params("買い物")) == {"search_q": "買い物"}
+
+    match = "MATCH (todos.title, todos.description) AGAINST (%s IN NATURAL LANGUAGE MODE)"
+    assert f"WHERE {match}" in sql
+    assert f"ORDER BY {match} DESC" in sql
+    index = next(i for i in models.Todo.__table__.indexes if i.name == "ft_todos_title_description")
+    assert [c.name for c in index.columns] == list(FIELDS)
+    assert index.dialect_options["mysql"]["with_parser"] == "ngram"
+
+def test_tokenize_ngram() -> None:
+    """NFKC 正規化・小文字化した unigram + bigram に分割すること"""
+    assert tokenize_ngram("ＡBc") == {"a", "b", "c", "ab", "bc"}
+
+@pytest.mark.asyncio
+async def test_inverted_index_search(db: AsyncSession, data_set: None, monkeypatch: pytest.MonkeyPatch) -> None:
+    """転置インデックスは DB から構築し、LIKE と同じ結果を返却すること"""
+    monkeypatch.setattr(crud.todo, "search_backend", InvertedIndexSearchBackend(FIELDS))
+    assert await search_titles(db, "TITLE-12") == ["test-title-12"]
+    assert await search_titles(db, "description-2") == ["test-title-2", *[f"test-title-{i}" for i in range(20, 25)]]
+    assert await search_titles(db, "1") == sorted(f"test-title-{i}" for i in range(1, 25) if "1" in str(i))
+    assert await search_titles(db, "not-found") == []
+
+@pytest.mark.asyncio
+async def test_inverted_index_applied_after_commit(
+    db: AsyncSession,
+    data_set: None,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """作成・更新・削除は commit 後にインデックスへ反映し、rollback した変更は反映しないこと"""
+    backend = InvertedIndexSearchBackend(FIELDS)
+    monkeypatch.setattr(crud.todo, "search_backend", backend)
+    await backend.build(db, models.Todo)
+
+    todo    = await crud.todo.create(db, TodoCreate(title="買い物", description="牛乳"))
+    todo_id = todo.id # commit で expire されるため 先に取得する
+    assert backend.search("買い物") == set()
+    await db.commit()
+    assert backend.search("買い物") == {todo_id}
+
+    todo = await crud.todo.get_db_obj_by_id(db, id=todo_id)
+    await crud.todo.update(db, db_obj=todo, update_schema=TodoUpdate(title="掃除"))
+    await db.rollback()
+    assert backend.search("買い物") == {todo_id}
+
+    todo = await crud.todo.get_db_obj_by_id(db, id=todo_id)
+    await crud.todo.update(db, db_obj=todo, update_schema=TodoUpdate(title="掃除"))
+    await db.commit()
+    assert backend.search("買い物") == set()
+    assert backend.search("掃除") == {todo_id}
+
+    todo = await crud.todo.get_db_obj_by_id(db, id=get_todo_id(1))
+    await crud.todo.hard_delete(db, todo)
+    assert backend.search("title-1") != set()
+    await db.commit()
+    assert get_todo_id(1) not in backend.search("title-1")
\ No newline at end of file
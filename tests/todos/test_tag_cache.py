@@ -0,0 +1,84 @@
+from typing import Any, Iterator
+import pytest
+import ulid
+from app import crud
+from app.crud.tag import get_unverified_tag_ids, tag_id_cache
+from app.schemas.tag import TagCreate
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from tests.todos.conftest import get_todo_id
+
+@pytest.fixture(autouse=True)
+def clear_tag_id_cache() -> Iterator[None]:
+    """テスト毎に tag名 → id のキャッシュを破棄する (DB はテスト毎に作り直すため)"""
+    tag_id_cache.clear()
+    yield
+    tag_id_cache.clear()
+
+async def count_queries(engine: AsyncEngine, db: AsyncSession, names: list[str]) -> tuple[dict[str, str], int]:
+    """upsert_tags を実行し、結果と実行したクエリ数を返却する"""
+    statements: list[str] = []
+    def before_cursor_execute(conn: Any, cursor: Any, statement: str, *args: Any) -> None:
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        tag_ids = await crud.tag.upsert_tags(db, [TagCreate(name=name) for name in names])
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    return tag_ids, len(statements)
+
+@pytest.mark.asyncio
+async def test_upsert_tags_cached_after_commit(engine: AsyncEngine, db: AsyncSession) -> None:
+    """commit 後は upsert した tag の id をキャッシュし、2回目以降は DB へ問い合わせないこと"""
+    tag_ids, count = await count_queries(engine, db, ["work", "home"])
+    assert count == 2 # upsert 1回 + id 取得 1回
+    assert tag_id_cache.get("work") is None # commit 前はキャッシュに登録しない
+    await db.commit()
+
+    assert tag_id_cache.get("work") == tag_ids["work"]
+    cached_ids, count = await count_queries(engine, db, ["Work ", "home"]) # 照合順序で同一となる名前もキャッシュを使用する
+    assert count == 0
+    assert cached_ids == {"Work ": tag_ids["work"], "home": tag_ids["home"]}
+
+@pytest.mark.asyncio
+async def test_upsert_tags_discarded_on_rollback(db: AsyncSession) -> None:
+    """rollback した transaction で upsert した tag の id はキャッシュしないこと"""
+    await crud.tag.upsert_tags(db, [TagCreate(name="work")])
+    await db.rollback()
+    assert tag_id_cache.get("work") is None
+
+@pytest.mark.asyncio
+async def test_get_unverified_tag_ids(db: AsyncSession) -> None:
+    """キャッシュから取得した id は この transaction で存在を確認するまで未確認とすること"""
+    tag_ids = await crud.tag.upsert_tags(db, [TagCreate(name="work")])
+    assert get_unverified_tag_ids(db, {tag_ids["work"]}) == set()
+    await db.commit()
+
+    tag_ids = await crud.tag.upsert_tags(db, [TagCreate(name="work")])
+    assert get_unverified_tag_ids(db, {tag_ids["work"]}) == {tag_ids["work"]}
+
+@pytest.mark.asyncio
+async def test_delete_tag_invalidates_cache(db: AsyncSession) -> None:
+    """tag を削除した場合は キャッシュを破棄すること"""
+    tag_ids = await crud.tag.upsert_tags(db, [TagCreate(name="work"), TagCreate(name="home")])
+    await db.commit()
+
+    tag = await crud.tag.get_db_obj_by_id(db, tag_ids["work"])
+    await crud.tag.delete(db, tag)
+    await db.commit()
+    assert tag_id_cache.get("work") is None
+    assert tag_id_cache.get("home") == tag_ids["home"]
+
+@pytest.mark.asyncio
+async def test_add_tags_to_todos_retries_stale_cache(db: AsyncSession, data_set: None) -> None:
+    """キャッシュの id が他プロセスで削除済みの場合は キャッシュを破棄して tag を upsert し直すこと"""
+    stale_id = ulid.new().str
+    tag_id_cache.set("work", stale_id)
+
+    todos  = await crud.todo.add_tags_to_todos(db, [(get_todo_id(1), [TagCreate(name="work")])])
+    tag_id = todos[0].tags[0].id
+    assert [tag.name for tag in todos[0].tags] == ["work"]
+    assert tag_id != stale_id
+    await db.commit()
+    assert tag_id_cache.get("work") == tag_id
\ No newline at end of file
@@ -1,7 +1,223 @@
-from typing import Any
-import pytest
-from app.schemas.core import PagingMeta
-from app.schemas.todo import TodoCreate, TodoUpdate
-from httpx import AsyncClient
-from starlette import status
-from tests.base import assert_create, assert_get_by_id, assert_get_paged_list, assert_update
\ No newline at end of file
+from typing import Any
+import pytest
+import ulid
+from app import crud
+from app.core.config import settings
+from app.core.search import LikeSearchBackend
+from app.crud.base import count_cache
+from app.crud.tag import tag_id_cache
+from app.models.base import ULIDType
+from app.schemas.core import CountStrategyEnum, PagingQueryIn
+from app.schemas.tag import TagCreate
+from httpx import AsyncClient
+from sqlalchemy import event
+from sqlalchemy.dialects import mysql
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from starlette import status
+from tests.todos.conftest import get_todo_id
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("per_page", [5, 20])
+async def test_get_paged_list_query_count(
+    engine: AsyncEngine,
+    db: AsyncSession,
+    data_set: None,
+    per_page: int,
+) -> None:
+    """一覧取得のクエリ数が ページの件数によらず 3回 (count・一覧・tags の IN 句) であること"""
+    await crud.todo.add_tags_to_todos(db, [(get_todo_id(i), [TagCreate(name=f"tag-{i % 3}")]) for i in range(1, 25)])
+    await db.commit()
+    db.expunge_all() # 取得済みの tags を使用しないよう session から外す
+
+    statements: list[str] = []
+    def before_cursor_execute(conn: Any, cursor: Any, statement: str, *args: Any) -> None:
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        res = await crud.todo.get_paged_list(
+            db,
+            PagingQueryIn(page=1, per_page=per_page),
+            count_strategy=CountStrategyEnum.exact,
+        )
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+
+    assert len(statements) == 3, statements
+    assert len(res.data) == per_page
+    assert all(len(todo.tags) == 1 for todo in res.data)
+
+@pytest.mark.asyncio
+async def test_get_paged_list_reuses_cached_statements(
+    db: AsyncSession,
+    data_set: None,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """検索語が異なっても 構築済みの statement を再利用し、検索語は bind パラメータとして渡すこと"""
+    monkeypatch.setattr(crud.todo, "search_backend", LikeSearchBackend(("title", "description")))
+    monkeypatch.setattr(crud.todo, "_statement_cache", {})
+    paging_query_in = PagingQueryIn(page=1, per_page=30)
+
+    res = await crud.todo.get_paged_list(db, paging_query_in, q="title-1", count_strategy=CountStrategyEnum.cached)
+    assert res.meta.total_data_count == 11
+    cached = dict(crud.todo._statement_cache)
+
+    res = await crud.todo.get_paged_list(db, paging_query_in, q="title-2", count_strategy=CountStrategyEnum.cached)
+    assert res.meta.total_data_count == 6
+    assert crud.todo._statement_cache.keys() == cached.keys()
+    assert all(crud.todo._statement_cache[key] is stmt for key, stmt in cached.items())
+
+    # COUNT のキャッシュキーは statement を compile せず 条件の識別子と bind パラメータの値から生成する
+    key = ("todos", ("search", "like", ""), (("search_pattern", "%title-2%"),), False)
+    assert count_cache.get(key) == 6
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("per_page", [5, 20])
+async def test_get_paged_todos_query_budget(
+    client: AsyncClient,
+    data_set: None,
+    query_budget: Any,
+    per_page: int,
+) -> None:
+    """一覧 API のクエリ数が ページの件数によらず 4回 (ETag・count・一覧・tags) で、同一のクエリを繰り返さないこと"""
+    with query_budget(max_queries=4, max_repeats=1):
+        res = await client.get("/todos", params={"page": 1, "perPage": per_page})
+    assert res.status_code == status.HTTP_200_OK
+    assert len(res.json()["data"]) == per_page
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("uri", [f"/todos/{get_todo_id(1)}", "/todos?page=1&perPage=5"])
+async def test_get_todos_not_modified(
+    client: AsyncClient,
+    data_set: None,
+    query_budget: Any,
+    uri: str,
+) -> None:
+    """If-None-Match が ETag に一致する場合は ETag 用の集計クエリのみで 304 を返却すること"""
+    res = await client.get(uri)
+    assert res.status_code == status.HTTP_200_OK
+    etag = res.headers["ETag"]
+
+    with query_budget(max_queries=1):
+        res = await client.get(uri, headers={"If-None-Match": etag})
+    assert res.status_code == status.HTTP_304_NOT_MODIFIED
+    assert res.headers["ETag"] == etag
+    assert res.content == b""
+
+@pytest.mark.asyncio
+async def test_get_todos_etag_changes_within_same_second(client: AsyncClient, data_set: None) -> None:
+    """同一秒内に更新した場合も ETag が変わること (updated_at はマイクロ秒まで保持する)"""
+    uri  = f"/todos/{get_todo_id(1)}"
+    etag = (await client.get(uri)).headers["ETag"]
+    list_etag = (await client.get("/todos")).headers["ETag"]
+
+    for title in ["first", "second"]:
+        assert (await client.patch(uri, json={"title": title})).status_code == status.HTTP_200_OK
+        res = await client.get(uri, headers={"If-None-Match": etag})
+        assert res.status_code == status.HTTP_200_OK
+        assert res.json()["title"] == title
+        assert res.headers["ETag"] != etag
+        etag = res.headers["ETag"]
+
+    assert (await client.get("/todos", headers={"If-None-Match": list_etag})).status_code == status.HTTP_200_OK
+
+@pytest.mark.asyncio
+async def test_get_todos_etag_changes_with_tags(client: AsyncClient, data_set: None) -> None:
+    """tag の付与は todo の updated_at を更新しないが、ETag には反映されること"""
+    uri       = f"/todos/{get_todo_id(1)}"
+    etag      = (await client.get(uri)).headers["ETag"]
+    list_etag = (await client.get("/todos")).headers["ETag"]
+
+    res = await client.post(f"{uri}/tags", json=[{"name": "work"}])
+    assert res.status_code == status.HTTP_200_OK
+
+    res = await client.get(uri, headers={"If-None-Match": etag})
+    assert res.status_code == status.HTTP_200_OK
+    assert [tag["name"] for tag in res.json()["tags"]] == ["work"]
+    assert (await client.get("/todos", headers={"If-None-Match": list_etag})).status_code == status.HTTP_200_OK
+
+@pytest.mark.asyncio
+async def test_add_tags_to_todos_case_insensitive_duplicates(db: AsyncSession, data_set: None) -> None:
+    """照合順序で同一となる tag 名 (大文字・小文字・末尾の空白) は 1件の tag にまとめ、既存の tag 名を変更しないこと"""
+    todos = await crud.todo.add_tags_to_todos(
+        db, [(get_todo_id(1), [TagCreate(name="Work"), TagCreate(name="work"), TagCreate(name="WORK ")])],
+    )
+    assert [tag.name for tag in todos[0].tags] == ["Work"]
+    await db.commit()
+
+    tag_id_cache.clear() # キャッシュを使用せず 既存の tag の upsert を確認する
+    todos = await crud.todo.add_tags_to_todos(
+        db, [(get_todo_id(1), [TagCreate(name="wORK")]), (get_todo_id(2), [TagCreate(name="work"), TagCreate(name="Home")])],
+    )
+    assert [sorted(tag.name for tag in todo.tags) for todo in todos] == [["Work"], ["Home", "Work"]]
+
+@pytest.mark.asyncio
+async def test_update_todos_bulk_unchanged(client: AsyncClient, data_set: None) -> None:
+    """更新するカラムが指定されていない todo は unchanged とし、存在しない id は not_found とすること"""
+    res = await client.patch("/todos/bulk", json=[
+        {"id": get_todo_id(1), "title": "updated"},
+        {"id": get_todo_id(2)},
+        {"id": get_todo_id(99), "title": "updated"},
+    ])
+    assert res.status_code == status.HTTP_200_OK
+    assert [r["status"] for r in res.json()["results"]] == ["updated", "unchanged", "not_found"]
+    assert res.json()["succeeded"] == 2
+
+@pytest.mark.asyncio
+async def test_bulk_normalizes_ulid(client: AsyncClient, data_set: None) -> None:
+    """小文字の ULID は大文字に正規化して処理し、ULID として不正な id は not_found とすること"""
+    res = await client.patch("/todos/bulk", json=[
+        {"id": get_todo_id(1).lower(), "title": "updated"},
+        {"id": "not-a-ulid", "title": "updated"},
+    ])
+    assert res.status_code == status.HTTP_200_OK
+    assert [(r["id"], r["status"]) for r in res.json()["results"]] == [(get_todo_id(1), "updated"), ("not-a-ulid", "not_found")]
+
+    res = await client.request("DELETE", "/todos/bulk", json={"ids": [get_todo_id(1).lower(), get_todo_id(1), "not-a-ulid"]})
+    assert res.status_code == status.HTTP_200_OK
+    assert [(r["id"], r["status"]) for r in res.json()["results"]] == [
+        (get_todo_id(1), "deleted"), (get_todo_id(1), "already_deleted"), ("not-a-ulid", "not_found"),
+    ]
+
+    res = await client.post("/todos/tags", json=[{"todoId": get_todo_id(2).lower(), "tags": [{"name": "work"}]}])
+    assert res.status_code == status.HTTP_200_OK
+    assert [todo["id"] for todo in res.json()] == [get_todo_id(2)]
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("id, status_code", [
+    ("not-a-ulid", status.HTTP_404_NOT_FOUND),
+    (get_todo_id(1).lower(), status.HTTP_200_OK),
+])
+async def test_get_todo_by_non_canonical_id(client: AsyncClient, data_set: None, id: str, status_code: int) -> None:
+    """ULID として不正な id は 404 とし、小文字の ULID は取得できること"""
+    res = await client.get(f"/todos/{id}")
+    assert res.status_code == status_code
+    if status_code == status.HTTP_200_OK:
+        assert res.json()["id"] == get_todo_id(1)
+
+def test_ulid_type_rejects_invalid_value() -> None:
+    """ULIDType は ULID として不正な値を NULL として bind せず ValueError とすること"""
+    with pytest.raises(ValueError):
+        ULIDType().process_bind_param("not-a-ulid", mysql.dialect())
+    assert ULIDType().process_bind_param(get_todo_id(1).lower(), mysql.dialect()) == ulid.from_int(1).bytes
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("method, uri, data_in", [
+    ("POST", "/todos/bulk", [{"title": f"bulk-{i}"} for i in range(3)]),
+    ("PATCH", "/todos/bulk", [{"id": get_todo_id(i), "title": "bulk"} for i in range(1, 4)]),
+    ("DELETE", "/todos/bulk", {"ids": [get_todo_id(i) for i in range(1, 4)]}),
+    ("POST", "/todos/tags", [{"todoId": get_todo_id(i), "tags": [{"name": "bulk"}]} for i in range(1, 4)]),
+])
+async def test_bulk_limit_exceeded(
+    client: AsyncClient,
+    data_set: None,
+    monkeypatch: pytest.MonkeyPatch,
+    method: str,
+    uri: str,
+    data_in: Any,
+) -> None:
+    """一括処理の件数が上限を超える場合は 400 とし、更新しないこと"""
+    monkeypatch.setattr(settings, "BULK_MAX_ITEMS", 2)
+    res = await client.request(method, uri, json=data_in)
+    assert res.status_code == status.HTTP_400_BAD_REQUEST
+    assert res.json()["detail"]["error_code"] == "BULK_LIMIT_EXCEEDED"
\ No newline at end of file
@@ -0,0 +1,13 @@
+import pytest_asyncio
+from app import models
+from sqlalchemy.ext.asyncio import AsyncSession
+from tests.database import client, db, db_proc, engine, mysql, user_login  # noqa: F401
+
+@pytest_asyncio.fixture
+async def test_user(db: AsyncSession) -> models.User:
+    """fixture: 認証に使用するユーザ (パスワードは使用しないため ハッシュ化しない)"""
+    user = models.User(email="principal@example.com", hashed_password="-", full_name="before", scopes="member")
+    db.add(user)
+    await db.commit()
+    await db.refresh(user)
+    return user
\ No newline at end of file
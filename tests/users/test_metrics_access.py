@@ -0,0 +1,40 @@
+import pytest
+from app import models
+from app.core import auth
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette import status
+
+@pytest.fixture(autouse=True)
+def clear_principal_cache() -> None:
+    auth.principal_cache.clear()
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("uri", ["/metrics", "/metrics/pool"])
+async def test_metrics_requires_admin(client: AsyncClient, db: AsyncSession, test_user: models.User, uri: str) -> None:
+    """metrics は admin の token のみ取得でき、token なし・admin 以外は取得できないこと"""
+    res = await client.get(uri)
+    assert res.json()["detail"]["error_code"] == "CouldNotValidateCredentials"
+
+    token = auth.create_access_token(test_user.id)
+    res   = await client.get(uri, headers={"Authorization": f"Bearer {token}"})
+    assert res.json()["detail"]["error_code"] == "PERMISSION_ERROR"
+
+    test_user.scopes = "member,admin"
+    await db.commit()
+    auth.principal_cache.clear()
+    res = await client.get(uri, headers={"Authorization": f"Bearer {token}"})
+    assert res.status_code == status.HTTP_200_OK
+
+@pytest.mark.asyncio
+async def test_metrics_prometheus_format(client: AsyncClient, db: AsyncSession, test_user: models.User) -> None:
+    """Prometheus のテキスト形式で リクエスト・コンポーネントの統計情報を返却すること"""
+    test_user.scopes = "admin"
+    token = auth.create_access_token(test_user.id)
+    await db.commit()
+
+    res = await client.get("/metrics", headers={"Authorization": f"Bearer {token}"})
+    assert res.status_code == status.HTTP_200_OK
+    assert res.headers["content-type"] == "text/plain; version=0.0.4; charset=utf-8"
+    assert "# TYPE http_requests_total counter" in res.text
+    assert 'app_component_hits{component="principal_cache"}' in res.text
\ No newline at end of file
@@ -0,0 +1,104 @@
+from typing import Any
+import pytest
+from app import crud, models, schemas
+from app.core import auth
+from app.core.config import settings
+from app.exceptions.core import APIException
+from fastapi.security import SecurityScopes
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+class StatementCounter:
+    """with 内で実行したクエリ数を数える"""
+    def __init__(self, engine: AsyncEngine) -> None:
+        self.engine = engine
+        self.count  = 0
+
+    def _count(self, *args: Any) -> None:
+        self.count += 1
+
+    def __enter__(self) -> "StatementCounter":
+        event.listen(self.engine.sync_engine, "before_cursor_execute", self._count)
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        event.remove(self.engine.sync_engine, "before_cursor_execute", self._count)
+
+async def get_current_user(db: AsyncSession, token: str, scopes: list[str] | None = None) -> schemas.CurrentUser:
+    return await auth.get_current_user(SecurityScopes(scopes or []), db=db, token=token)
+
+@pytest.fixture(autouse=True)
+def clear_principal_cache() -> None:
+    auth.principal_cache.clear()
+
+@pytest.mark.asyncio
+async def test_principal_cache_hit(engine: AsyncEngine, db: AsyncSession, test_user: models.User) -> None:
+    """2回目以降は DB に問い合わせず キャッシュした変更不可のユーザを返却すること"""
+    token = auth.create_access_token(test_user.id)
+    with StatementCounter(engine) as counter:
+        first = await get_current_user(db, token)
+    assert counter.count == 1
+    assert first.full_name == "before"
+
+    with StatementCounter(engine) as counter:
+        second = await get_current_user(db, token)
+    assert counter.count == 0
+    assert second is first
+
+    with pytest.raises(TypeError):
+        second.full_name = "changed"
+
+@pytest.mark.asyncio
+async def test_principal_cache_invalidated_after_commit(db: AsyncSession, test_user: models.User) -> None:
+    """ユーザ更新時は commit 後にキャッシュを破棄し、rollback した場合は破棄しないこと"""
+    user_id = test_user.id # rollback で expire されるため 先に取得する
+    token   = auth.create_access_token(user_id)
+    await get_current_user(db, token)
+
+    user = await crud.user.get_db_obj_by_id(db, id=user_id)
+    await crud.user.update(db, db_obj=user, obj_in=schemas.UserUpdate(full_name="rolled back"))
+    assert (await get_current_user(db, token)).full_name == "before" # commit 前はキャッシュを使用する
+    await db.rollback()
+    assert len(auth.principal_cache) == 1
+
+    user = await crud.user.get_db_obj_by_id(db, id=user_id)
+    await crud.user.update(db, db_obj=user, obj_in=schemas.UserUpdate(full_name="after"))
+    await db.commit()
+    assert len(auth.principal_cache) == 0
+    assert (await get_current_user(db, token)).full_name == "after"
+
+@pytest.mark.asyncio
+async def test_principal_cache_invalidated_on_delete(db: AsyncSession, test_user: models.User) -> None:
+    """論理削除したユーザは キャッシュを破棄し 認証できないこと"""
+    token = auth.create_access_token(test_user.id)
+    await get_current_user(db, token)
+
+    await crud.user.delete(db, await crud.user.get_db_obj_by_id(db, id=test_user.id))
+    await db.commit()
+    with pytest.raises(APIException):
+        await get_current_user(db, token)
+
+@pytest.mark.asyncio
+async def test_principal_cache_disabled(
+    engine: AsyncEngine,
+    db: AsyncSession,
+    test_user: models.User,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """PRINCIPAL_CACHE_TTL_SECONDS が 0 の場合は キャッシュしないこと"""
+    monkeypatch.setattr(settings, "PRINCIPAL_CACHE_TTL_SECONDS", 0)
+    token = auth.create_access_token(test_user.id)
+    await get_current_user(db, token)
+    with StatementCounter(engine) as counter:
+        await get_current_user(db, token)
+    assert counter.count == 1
+    assert len(auth.principal_cache) == 0
+
+@pytest.mark.asyncio
+async def test_principal_scopes_checked_on_cache_hit(db: AsyncSession, test_user: models.User) -> None:
+    """キャッシュしたユーザも 要求された scopes を持たない場合は PERMISSION_ERROR とすること"""
+    token = auth.create_access_token(test_user.id)
+    assert (await get_current_user(db, token, ["member"])).id == test_user.id
+    with pytest.raises(APIException) as e:
+        await get_current_user(db, token, ["admin"])
+    assert e.value.detail["error_code"] == "PERMISSION_ERROR"
\ No newline at end of file